@@ -0,0 +1,112 @@
+# Adaptive batch sizing with retry and exponential backoff for database loads
+
+import random
+import time
+from collections import deque
+from typing import Callable, Tuple, Type
+
+import pandas as pd
+
+# Batches remembered when computing the recent error rate
+ERROR_WINDOW = 20
+
+class BatchLoadError(Exception):
+    """
+    A batch still failed after all retries. The first rows_written rows
+    (every earlier batch) are already committed.
+    """
+    def __init__(self, message: str, rows_written: int):
+        super().__init__(message)
+        self.rows_written = rows_written
+
+class AdaptiveBatchSizer:
+    """
+    Picks the next batch size from the latency and error rate of recent batches:
+    doubles while batches finish in under half of target_seconds without errors,
+    scales down towards target_seconds when they run long and halves on failure.
+    """
+    def __init__(self, initial: int = 1000, min_size: int = 100, max_size: int = 20_000,
+                 target_seconds: float = 2.0, max_error_rate: float = 0.05):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_seconds = target_seconds
+        self.max_error_rate = max_error_rate
+        self.size = self._clamp(initial)
+        self.recent = deque(maxlen=ERROR_WINDOW)   # True = batch failed
+
+    def _clamp(self, size: int) -> int:
+        return max(self.min_size, min(self.max_size, int(size)))
+
+    @property
+    def error_rate(self) -> float:
+        return sum(self.recent) / len(self.recent) if self.recent else 0.0
+
+    def record_success(self, rows: int, elapsed: float) -> None:
+        self.recent.append(False)
+        if elapsed > self.target_seconds:
+            # -- Size that would have taken target_seconds at the observed rate
+            self.size = self._clamp(rows * self.target_seconds / elapsed)
+        elif elapsed < self.target_seconds / 2 and rows >= self.size and self.error_rate <= self.max_error_rate:
+            self.size = self._clamp(self.size * 2)
+
+    def record_failure(self) -> None:
+        self.recent.append(True)
+        self.size = self._clamp(self.size // 2)
+
+def backoff_delay(attempt: int, base_delay: float = 0.5, max_delay: float = 30.0) -> float:
+    # Exponential backoff with jitter, so parallel loaders do not retry in lockstep
+    return min(max_delay, base_delay * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+def retry_with_backoff(func: Callable, retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+                       max_retries: int = 5, base_delay: float = 0.5, label: str = "operation"):
+    """
+    Calls func() and retries it on the retry_on exceptions with exponential backoff.
+    func must be safe to repeat (e.g. an idempotent upsert).
+    """
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except retry_on as e:
+            attempt += 1
+            if attempt > max_retries:
+                raise
+            delay = backoff_delay(attempt, base_delay)
+            print(f"     {label} failed ({e}); retry {attempt}/{max_retries} in {delay:.1f} s")
+            time.sleep(delay)
+
+def load_in_batches(df: pd.DataFrame, write_batch: Callable[[pd.DataFrame], None], sizer: AdaptiveBatchSizer,
+                    retry_on: Tuple[Type[BaseException], ...] = (Exception,), max_retries: int = 5,
+                    base_delay: float = 0.5, label: str = "batch") -> int:
+    """
+    Writes df through write_batch(chunk) in batches sized by sizer. write_batch must
+    commit its own batch, so a failed batch is retried (smaller, after a backoff)
+    from the last committed row instead of from the start. Returns the rows written;
+    raises BatchLoadError once a batch has failed max_retries times in a row, or
+    on an error that is not in retry_on.
+    """
+    offset = 0
+    attempt = 0
+
+    while offset < len(df):
+        chunk = df.iloc[offset:offset + sizer.size]
+        start_time = time.perf_counter()
+        try:
+            write_batch(chunk)
+        except Exception as e:
+            sizer.record_failure()
+            attempt += 1
+            if not isinstance(e, retry_on) or attempt > max_retries:
+                raise BatchLoadError(f"{label}: batch at row {offset} failed: {e}", offset) from e
+
+            delay = backoff_delay(attempt, base_delay)
+            print(f"     {label}: batch of {len(chunk)} rows at row {offset} failed ({e}); "
+                  f"retry {attempt}/{max_retries} in {delay:.1f} s with {sizer.size} rows")
+            time.sleep(delay)
+            continue
+
+        sizer.record_success(len(chunk), time.perf_counter() - start_time)
+        offset += len(chunk)
+        attempt = 0
+
+    return offset
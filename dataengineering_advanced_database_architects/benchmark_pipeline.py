@@ -0,0 +1,211 @@
+# End-to-end throughput benchmark of steps 1-3 on synthetic MeetingBank data
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import psutil
+
+from generate_synthetic_meetingbank import DEFAULT_CITIES, write_synthetic_meetingbank
+
+# Pathlib configuration
+BASE_DIR = Path(__file__).resolve().parent
+RESULTS_PATH = BASE_DIR / "Processed_Data" / "benchmarks" / "pipeline_benchmark.json"
+
+# Cities kept by steps 1-2: only their meetings count as processed rows
+TARGET_CITIES = {"LongBeachCC", "SeattleCityCouncil"}
+
+# Benchmarked steps: script + extra arguments
+STEPS = {
+    "metadata": ["step1_process_metadata.py"],
+    "transcripts": ["step2_process_transcripts.py"],
+    "extract": ["step1_2_extract_meetings.py", "--full-refresh"],
+    "load": ["step3_database_loading.py"],
+}
+
+# Seconds between peak-RSS samples
+SAMPLE_INTERVAL = 0.05
+
+# Runs a step script; with mongomock the shared Mongo client is replaced before the step starts.
+# pymongo 4.9+ passes sort= to the bulk builder for UpdateOne / ReplaceOne, which mongomock 4.3
+# does not accept; the load step never sorts, so the argument is dropped
+RUNNER = """
+import runpy, sys
+if sys.argv[1] == "mongomock":
+    import mongomock, mongomock.collection, connections
+
+    def _without_sort(add):
+        def wrapper(self, *args, sort=None, **kwargs):
+            return add(self, *args, **kwargs)
+        return wrapper
+
+    builder = mongomock.collection.BulkOperationBuilder
+    builder.add_update = _without_sort(builder.add_update)
+    builder.add_replace = _without_sort(builder.add_replace)
+    connections._MONGO_CLIENT = mongomock.MongoClient()
+sys.argv = sys.argv[2:]
+runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+
+def prepare_workspace(run_dir: Path) -> None:
+    """
+    Copies the pipeline modules into run_dir, so every run reads and writes its own
+    Data/ and Processed_Data/ instead of the real ones.
+    """
+    run_dir.mkdir(parents=True, exist_ok=True)
+    for module in BASE_DIR.glob("*.py"):
+        shutil.copy2(module, run_dir / module.name)
+
+def tree_rss(process: psutil.Process) -> int:
+    # Process pools (--workers) run in children, so they count towards the peak
+    total = 0
+    for proc in [process] + process.children(recursive=True):
+        try:
+            total += proc.memory_info().rss
+        except psutil.Error:
+            pass
+    return total
+
+def run_step(run_dir: Path, step: str, env: Dict[str, str], mongo: str, extra_args: List[str]) -> Dict[str, Any]:
+    """
+    Runs one step in a subprocess and samples its wall time and peak RSS.
+    """
+    command = [sys.executable, "-c", RUNNER, mongo] + STEPS[step] + extra_args
+    start_time = time.perf_counter()
+
+    with open(run_dir / f"{step}.log", "w", encoding="utf-8") as log:
+        popen = subprocess.Popen(command, cwd=run_dir, env=env, stdout=log, stderr=subprocess.STDOUT)
+        process = psutil.Process(popen.pid)
+        peak_rss = 0
+
+        while popen.poll() is None:
+            try:
+                peak_rss = max(peak_rss, tree_rss(process))
+            except psutil.Error:
+                pass
+            time.sleep(SAMPLE_INTERVAL)
+
+    return {
+        "wall_s": time.perf_counter() - start_time,
+        "peak_rss_mb": peak_rss / 1e6,
+        "returncode": popen.returncode
+    }
+
+def benchmark_scale(scale: int, args: argparse.Namespace, work_dir: Path) -> List[Dict[str, Any]]:
+    """
+    Runs the steps at one scale. A failed step is returned with its returncode only, and the
+    steps after it are skipped (they would run on missing inputs).
+    """
+    run_dir = work_dir / f"scale_{scale}x"
+    if run_dir.exists():
+        shutil.rmtree(run_dir)
+    prepare_workspace(run_dir)
+
+    meetings = args.base_meetings * scale
+    print(f"\n=== {scale}x: generating {meetings} meetings ===")
+    per_city = write_synthetic_meetingbank(
+        run_dir / "Data" / "MeetingBank.json", meetings, args.items, args.segments, cities=args.cities, seed=args.seed
+    )
+    rows = sum(count for city, count in per_city.items() if city in TARGET_CITIES)
+    json_mb = (run_dir / "Data" / "MeetingBank.json").stat().st_size / 1e6
+
+    env = dict(os.environ)
+    env.update({
+        "SQL_URL": args.sql_url or f"sqlite:///{(run_dir / 'bench.db').as_posix()}",
+        "MONGO_DB_NAME": "meetingbank_bench",
+        "MONGO_COLLECTION_NAME": "transcripts",
+        "PYTHONUNBUFFERED": "1"
+    })
+    if args.mongo_uri:
+        env["MONGO_URI"] = args.mongo_uri
+    mongo = "server" if args.mongo_uri else "mongomock"
+
+    results = []
+    for step in args.steps:
+        extra_args = ["--workers", str(args.workers)] if step in ("transcripts", "extract") else []
+        result = run_step(run_dir, step, env, mongo, extra_args)
+        if result["returncode"] != 0:
+            print(f"  {step:<12} FAILED with exit code {result['returncode']} (see {run_dir / (step + '.log')}); "
+                  f"skipping the remaining steps at {scale}x")
+            results.append({"scale": scale, "step": step, "returncode": result["returncode"]})
+            break
+
+        result.update({
+            "scale": scale,
+            "step": step,
+            "meetings": meetings,
+            "rows": rows,
+            "json_mb": json_mb,
+            "rows_per_s": rows / max(result["wall_s"], 1e-9)
+        })
+        print(f"  {step:<12} {result['wall_s']:8.2f} s  {result['rows_per_s']:10,.1f} rows/s  "
+              f"{result['peak_rss_mb']:8.1f} MB peak RSS")
+        results.append(result)
+    return results
+
+def print_scaling(results: List[Dict[str, Any]]) -> None:
+    """
+    Time and memory of every step relative to its smallest scale (linear scaling = same ratio as the scale).
+    """
+    print("\n--- Scaling relative to the smallest scale ---")
+    print(f"  {'step':<12} {'scale':>6} {'time x':>8} {'rss x':>8}")
+    for step in dict.fromkeys(r["step"] for r in results):
+        runs = sorted((r for r in results if r["step"] == step), key=lambda r: r["scale"])
+        base = runs[0]
+        for run in runs:
+            time_ratio = run["wall_s"] / base["wall_s"] if base["wall_s"] else float("nan")
+            rss_ratio = run["peak_rss_mb"] / base["peak_rss_mb"] if base["peak_rss_mb"] else float("nan")
+            print(f"  {step:<12} {run['scale']:>5}x {time_ratio:8.2f} {rss_ratio:8.2f}")
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark steps 1-3 on synthetic MeetingBank data.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100], help="Multiples of --base-meetings")
+    parser.add_argument("--base-meetings", type=int, default=60, help="Meetings at scale 1x")
+    parser.add_argument("--items", type=int, default=8, help="Average agenda items per meeting")
+    parser.add_argument("--segments", type=int, default=30, help="Average transcript segments per item")
+    parser.add_argument("--cities", nargs="+", default=DEFAULT_CITIES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--steps", nargs="+", choices=list(STEPS), default=["extract", "load"])
+    parser.add_argument("--workers", type=int, default=1, help="--workers passed to the extraction steps")
+    parser.add_argument("--sql-url", default=None,
+                        help="SQLAlchemy URL of a local MySQL container (default: a SQLite file per run)")
+    parser.add_argument("--mongo-uri", default=None,
+                        help="URI of a local MongoDB container (default: in-process mongomock)")
+    parser.add_argument("--work-dir", type=Path, default=None, help="Where runs are kept (default: a temporary directory)")
+    parser.add_argument("--output", type=Path, default=RESULTS_PATH)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    work_dir = args.work_dir or Path(tempfile.mkdtemp(prefix="meetingbank_bench_"))
+    print(f"Benchmark workspace: {work_dir}")
+
+    runs = []
+    for scale in sorted(args.scales):
+        runs.extend(benchmark_scale(scale, args, work_dir))
+
+    # -- Failed runs have no meaningful timings: they are listed, not measured
+    results = [run for run in runs if run["returncode"] == 0]
+    failed = [run for run in runs if run["returncode"] != 0]
+    if results:
+        print_scaling(results)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "args": {k: str(v) for k, v in vars(args).items()},
+                   "results": results, "failed": failed}, f, indent=2)
+    print(f"\nResults saved at: {args.output}")
+
+    if args.work_dir is None and not failed:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    if failed:
+        sys.exit(f"{len(failed)} step run(s) failed; logs kept in {work_dir}")
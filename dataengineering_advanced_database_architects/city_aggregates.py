@@ -0,0 +1,203 @@
+# Incrementally maintained per-city aggregates (count, sum, sum of squares)
+
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+from dotenv import load_dotenv
+from sqlalchemy import inspect, text
+
+# Loading variables from env file
+load_dotenv()
+
+CITY_AGGREGATES_TABLE = "city_aggregates"
+MONGO_AGGREGATES_COLLECTION = os.getenv("MONGO_AGGREGATES_COLLECTION", "city_aggregates")
+
+# Aggregated metric -> source column; every metric keeps <name>_n, <name>_sum and <name>_sumsq
+SQL_METRICS = {"duration": "video_duration_sec", "segments": "segment_count", "items": "item_count"}
+MONGO_METRICS = {"words": "transcript_word_count", "speakers": "speaker_count"}
+
+def _aggregate_columns(metrics: Dict[str, str]) -> List[str]:
+    return [f"{name}_{stat}" for name in metrics for stat in ("n", "sum", "sumsq")]
+
+SQL_AGGREGATE_COLUMNS = ["meeting_count"] + _aggregate_columns(SQL_METRICS)
+
+# Mean and population standard deviation from the running sums; O(number of cities)
+CITY_AVERAGES_QUERY = "SELECT city, meeting_count, " + ", ".join(
+    f"{name}_sum / NULLIF({name}_n, 0) AS avg_{name}, "
+    f"SQRT(GREATEST({name}_sumsq / NULLIF({name}_n, 0) - "
+    f"({name}_sum / NULLIF({name}_n, 0)) * ({name}_sum / NULLIF({name}_n, 0)), 0)) AS std_{name}"
+    for name in SQL_METRICS
+) + f" FROM {CITY_AGGREGATES_TABLE}"
+
+# Same columns computed on the fly, for the DuckDB view over meeting_summary
+CITY_AGGREGATES_VIEW_QUERY = "SELECT city_id, city, COUNT(*) AS meeting_count, " + ", ".join(
+    f"COUNT({column}) AS {name}_n, COALESCE(SUM({column}), 0) AS {name}_sum, "
+    f"COALESCE(SUM({column} * {column}), 0) AS {name}_sumsq"
+    for name, column in SQL_METRICS.items()
+) + " FROM meeting_summary GROUP BY city_id, city"
+
+# --- SQL: city_aggregates table ---
+
+def ensure_city_aggregates_table(engine) -> bool:
+    """
+    Creates the SQL aggregates table if needed. Returns True when it was just created.
+    """
+    if inspect(engine).has_table(CITY_AGGREGATES_TABLE):
+        return False
+
+    stat_columns = ", ".join(
+        f"{column} BIGINT NOT NULL DEFAULT 0" if column.endswith("_n") or column == "meeting_count"
+        else f"{column} DOUBLE NOT NULL DEFAULT 0"
+        for column in SQL_AGGREGATE_COLUMNS
+    )
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {CITY_AGGREGATES_TABLE} "
+            f"(city_id BIGINT PRIMARY KEY, city VARCHAR(255), {stat_columns})"
+        ))
+    return True
+
+def city_deltas(rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-city count / sum / sum of squares of newly inserted meeting_metrics rows
+    (rows need city_id and city next to the metric columns). Nulls are not counted.
+    """
+    frame = rows[["city_id", "city"]].copy()
+    frame["meeting_count"] = 1
+    for name, column in SQL_METRICS.items():
+        values = rows[column].astype("float64")
+        frame[f"{name}_n"] = values.notna().astype("int64")
+        frame[f"{name}_sum"] = values.fillna(0)
+        frame[f"{name}_sumsq"] = (values * values).fillna(0)
+    return frame.groupby(["city_id", "city"], as_index=False, observed=True).sum()
+
+def apply_city_deltas(conn, deltas: pd.DataFrame) -> None:
+    """
+    Adds the deltas to city_aggregates inside the caller's transaction.
+    """
+    if deltas.empty:
+        return
+
+    columns = ["city_id", "city"] + SQL_AGGREGATE_COLUMNS
+    values = ", ".join(f":{column}" for column in columns)
+    params = [
+        {column: (value.item() if hasattr(value, "item") else value) for column, value in row.items()}
+        for row in deltas[columns].to_dict("records")
+    ]
+    conn.execute(text(f"INSERT INTO {CITY_AGGREGATES_TABLE} ({', '.join(columns)}) VALUES ({values}) "
+                      f"{_add_on_conflict(conn)}"), params)
+
+def _add_on_conflict(conn) -> str:
+    if conn.dialect.name == "mysql":
+        updates = ", ".join(f"{column} = {column} + VALUES({column})" for column in SQL_AGGREGATE_COLUMNS)
+        return f"ON DUPLICATE KEY UPDATE {updates}"
+    updates = ", ".join(f"{column} = {column} + excluded.{column}" for column in SQL_AGGREGATE_COLUMNS)
+    return f"ON CONFLICT (city_id) DO UPDATE SET {updates}"
+
+def _city_stats(sign: int = 1) -> str:
+    return f"{sign} * COUNT(*), " + ", ".join(
+        f"{sign} * COUNT(mm.{column}), {sign} * COALESCE(SUM(mm.{column}), 0), "
+        f"{sign} * COALESCE(SUM(mm.{column} * mm.{column}), 0)"
+        for column in SQL_METRICS.values()
+    )
+
+def apply_staged_city_deltas(conn, staging_table: str, sign: int = 1) -> None:
+    """
+    Adds (sign=1) or subtracts (sign=-1) the meeting_metrics rows whose metric_id is in
+    staging_table, with one server-side GROUP BY over the staged keys. Subtracting before
+    a staging merge and adding after it moves the aggregates by exactly what the merge
+    inserted or updated, without reading the rest of the table.
+    """
+    conn.execute(text(
+        f"INSERT INTO {CITY_AGGREGATES_TABLE} (city_id, city, {', '.join(SQL_AGGREGATE_COLUMNS)}) "
+        f"SELECT c.city_id, c.city, {_city_stats(sign)} "
+        "FROM cities c "
+        "JOIN meetings m ON c.city_id = m.city_id "
+        "JOIN meeting_metrics mm ON m.pk_id = mm.pk_id "
+        f"WHERE mm.metric_id IN (SELECT metric_id FROM `{staging_table}`) "
+        f"GROUP BY c.city_id, c.city {_add_on_conflict(conn)}"
+    ))
+
+def rebuild_city_aggregates(conn) -> None:
+    """
+    Recomputes city_aggregates from the loaded tables with one server-side GROUP BY
+    (used when rows may have been updated in place, or to repair drift).
+    """
+    conn.execute(text(f"DELETE FROM {CITY_AGGREGATES_TABLE}"))
+    conn.execute(text(
+        f"INSERT INTO {CITY_AGGREGATES_TABLE} (city_id, city, {', '.join(SQL_AGGREGATE_COLUMNS)}) "
+        f"SELECT c.city_id, c.city, {_city_stats()} "
+        "FROM cities c "
+        "JOIN meetings m ON c.city_id = m.city_id "
+        "JOIN meeting_metrics mm ON m.pk_id = mm.pk_id "
+        "GROUP BY c.city_id, c.city"
+    ))
+
+# --- MongoDB: city_aggregates collection (words and speakers live with the transcripts) ---
+
+def mongo_city_increments(records: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """
+    $inc documents per city for newly inserted transcript records.
+    """
+    increments: Dict[str, Dict[str, float]] = {}
+    for record in records:
+        inc = increments.setdefault(record["city"], {"meeting_count": 0})
+        inc["meeting_count"] += 1
+        for name, field in MONGO_METRICS.items():
+            value = record.get(field)
+            if value is None:
+                continue
+            inc[f"{name}_n"] = inc.get(f"{name}_n", 0) + 1
+            inc[f"{name}_sum"] = inc.get(f"{name}_sum", 0) + value
+            inc[f"{name}_sumsq"] = inc.get(f"{name}_sumsq", 0) + value * value
+    return increments
+
+def apply_mongo_increments(aggregates, increments: Dict[str, Dict[str, float]]) -> None:
+    from pymongo import UpdateOne
+
+    if increments:
+        aggregates.bulk_write(
+            [UpdateOne({"_id": city}, {"$inc": inc}, upsert=True) for city, inc in increments.items()],
+            ordered=False
+        )
+
+def rebuild_mongo_city_aggregates(transcripts, aggregates, cities: Optional[Iterable[str]] = None) -> None:
+    """
+    Recomputes the aggregates of the given cities (all when None) with one $group pipeline.
+    """
+    group: Dict[str, Any] = {"_id": "$city", "meeting_count": {"$sum": 1}}
+    for name, field in MONGO_METRICS.items():
+        group[f"{name}_n"] = {"$sum": {"$cond": [{"$isNumber": f"${field}"}, 1, 0]}}
+        group[f"{name}_sum"] = {"$sum": f"${field}"}
+        group[f"{name}_sumsq"] = {"$sum": {"$multiply": [f"${field}", f"${field}"]}}
+
+    pipeline = [{"$group": group}]
+    gone: Dict[str, Any] = {}
+    if cities is not None:
+        cities = list(cities)
+        pipeline.insert(0, {"$match": {"city": {"$in": cities}}})
+        gone["$in"] = cities
+
+    # -- Replaced in place, so readers never see a city missing mid-rebuild; only cities
+    # -- left without any transcripts are deleted, after the replacements
+    rebuilt = []
+    for doc in transcripts.aggregate(pipeline):
+        aggregates.replace_one({"_id": doc["_id"]}, doc, upsert=True)
+        rebuilt.append(doc["_id"])
+    gone["$nin"] = rebuilt
+    aggregates.delete_many({"_id": gone})
+
+
+if __name__ == "__main__":
+    # Full recompute of both stores (e.g. after manual edits or an interrupted load)
+    from connections import get_sql_engine, get_mongo_collection
+
+    engine = get_sql_engine()
+    ensure_city_aggregates_table(engine)
+    with engine.begin() as conn:
+        rebuild_city_aggregates(conn)
+    print(f"Rebuilt SQL table {CITY_AGGREGATES_TABLE}.")
+
+    rebuild_mongo_city_aggregates(get_mongo_collection(), get_mongo_collection(MONGO_AGGREGATES_COLLECTION))
+    print(f"Rebuilt Mongo collection {MONGO_AGGREGATES_COLLECTION}.")
@@ -0,0 +1,102 @@
+# Shared, lazily created database connections for all pipeline steps
+
+import os
+import threading
+from dotenv import load_dotenv
+
+# Loading variables from env file
+load_dotenv()
+
+# SQL POOL CONFIGURATION
+# -- pool_size connections stay open; up to max_overflow more are opened under load
+SQL_POOL_SIZE = int(os.getenv("SQL_POOL_SIZE", "5"))
+SQL_MAX_OVERFLOW = int(os.getenv("SQL_MAX_OVERFLOW", "10"))
+# -- Seconds to wait for a free pooled connection before failing
+SQL_POOL_TIMEOUT = int(os.getenv("SQL_POOL_TIMEOUT", "30"))
+# -- Connections older than this many seconds are replaced (below the server's wait_timeout)
+SQL_POOL_RECYCLE = int(os.getenv("SQL_POOL_RECYCLE", "1800"))
+SQL_CONNECT_TIMEOUT = int(os.getenv("SQL_CONNECT_TIMEOUT", "10"))
+
+# MONGO POOL CONFIGURATION
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "10000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "30000"))
+
+# One engine per option set and one Mongo client per process; steps run by main.py
+# share the same interpreter and therefore the same pools
+_ENGINES = {}
+_MONGO_CLIENT = None
+_LOCK = threading.Lock()
+
+def get_sql_engine(local_infile: bool = False, database: str = None):
+    """
+    The shared SQLAlchemy engine for SQL_URL, created on first use. local_infile=True
+    returns a separate engine whose driver may send LOAD DATA LOCAL INFILE files;
+    database selects another schema on the same server (e.g. the index advisor's sandbox).
+    """
+    with _LOCK:
+        engine = _ENGINES.get((local_infile, database))
+        if engine is None:
+            from sqlalchemy import create_engine
+            from sqlalchemy.engine import make_url
+
+            url = os.getenv("SQL_URL")
+            if database is not None:
+                url = make_url(url).set(database=database)
+            connect_args = {}
+            # TLS and driver options only apply to MySQL (a local SQLite URL is used for benchmarks)
+            if str(url).startswith("mysql"):
+                connect_args = {"ssl": {"fake_flag_to_enable_tls": True}, "connect_timeout": SQL_CONNECT_TIMEOUT}
+                if local_infile:
+                    connect_args["local_infile"] = True
+
+            engine = create_engine(
+                url,
+                connect_args=connect_args,
+                pool_pre_ping=True,
+                pool_size=SQL_POOL_SIZE,
+                max_overflow=SQL_MAX_OVERFLOW,
+                pool_timeout=SQL_POOL_TIMEOUT,
+                pool_recycle=SQL_POOL_RECYCLE
+            )
+            _ENGINES[(local_infile, database)] = engine
+        return engine
+
+def get_mongo_client():
+    """
+    The shared MongoClient for MONGO_URI, created on first use.
+    """
+    global _MONGO_CLIENT
+    with _LOCK:
+        if _MONGO_CLIENT is None:
+            import certifi
+            from pymongo import MongoClient
+
+            _MONGO_CLIENT = MongoClient(
+                os.getenv("MONGO_URI"),
+                tlsCAFile=certifi.where(),
+                maxPoolSize=MONGO_MAX_POOL_SIZE,
+                connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+                serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS
+            )
+        return _MONGO_CLIENT
+
+def get_mongo_collection(name: str = None):
+    """
+    A collection of MONGO_DB_NAME (MONGO_COLLECTION_NAME unless name is given).
+    """
+    database = get_mongo_client()[os.getenv("MONGO_DB_NAME")]
+    return database[name or os.getenv("MONGO_COLLECTION_NAME")]
+
+def dispose_all() -> None:
+    """
+    Closes every pooled connection (end of a pipeline run).
+    """
+    global _MONGO_CLIENT
+    with _LOCK:
+        for engine in _ENGINES.values():
+            engine.dispose()
+        _ENGINES.clear()
+        if _MONGO_CLIENT is not None:
+            _MONGO_CLIENT.close()
+            _MONGO_CLIENT = None
@@ -0,0 +1,92 @@
+# Embedded DuckDB analytics over the Processed_Data Parquet outputs (no network needed)
+
+import threading
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+
+from city_aggregates import CITY_AGGREGATES_VIEW_QUERY
+
+# Pathlib configuration
+BASE_DIR = Path(__file__).resolve().parent
+PROCESSED_DIR = BASE_DIR / "Processed_Data"
+
+# Views over the Parquet outputs (partitioned datasets or single files)
+PARQUET_VIEWS = {
+    "meeting_summary": PROCESSED_DIR / "meeting_summary.parquet",
+    "meeting_transcripts": PROCESSED_DIR / "meeting_transcripts.parquet",
+    "completedata": PROCESSED_DIR / "completedata.parquet",
+}
+
+# The MySQL schema from step3/step4 as views, so the same SQL runs on both backends
+SCHEMA_VIEWS = {
+    "cities": "SELECT DISTINCT city_id, city FROM meeting_summary",
+    "meetings": "SELECT pk_id, city_id, meeting_id FROM meeting_summary",
+    "meeting_metrics": "SELECT metric_id, pk_id, video_duration_sec, item_count, segment_count FROM meeting_summary",
+    "denormalized_table": (
+        "SELECT metric_id, city_id, city, pk_id, meeting_id, video_duration_sec, item_count, segment_count "
+        "FROM meeting_summary"
+    ),
+    "city_aggregates": CITY_AGGREGATES_VIEW_QUERY,
+}
+
+_CONNECTION = None
+_LOCK = threading.Lock()
+
+def _parquet_source(path: Path) -> str:
+    location = path.as_posix().replace("'", "''")
+    if path.is_dir():
+        # Hive-partitioned dataset written by parquet_io: city comes from the directory names
+        return f"read_parquet('{location}/**/*.parquet', hive_partitioning = true)"
+    return f"read_parquet('{location}')"
+
+def register_views(connection) -> List[str]:
+    """
+    (Re)creates the Parquet and schema views; outputs that do not exist yet are skipped.
+    Returns the names of the registered views.
+    """
+    registered = []
+    for name, path in PARQUET_VIEWS.items():
+        if path.exists():
+            connection.execute(f"CREATE OR REPLACE VIEW {name} AS SELECT * FROM {_parquet_source(path)}")
+            registered.append(name)
+
+    if "meeting_summary" in registered:
+        for name, query in SCHEMA_VIEWS.items():
+            connection.execute(f"CREATE OR REPLACE VIEW {name} AS {query}")
+            registered.append(name)
+    return registered
+
+def get_duckdb():
+    """
+    The shared in-memory DuckDB connection with all views registered, created on first use.
+    """
+    global _CONNECTION
+    with _LOCK:
+        if _CONNECTION is None:
+            import duckdb
+
+            _CONNECTION = duckdb.connect(":memory:")
+            register_views(_CONNECTION)
+        return _CONNECTION
+
+def query_df(query: str) -> pd.DataFrame:
+    # DuckDB connections are not thread-safe; each caller gets its own cursor
+    return get_duckdb().cursor().execute(query).df()
+
+def explain_text(statement: str) -> str:
+    """
+    Runs an EXPLAIN / EXPLAIN ANALYZE statement and returns the plan as text
+    (DuckDB returns it in the second column).
+    """
+    rows = get_duckdb().cursor().execute(statement).fetchall()
+    return "\n".join(row[1] for row in rows)
+
+
+if __name__ == "__main__":
+    views = register_views(get_duckdb())
+    print(f"Registered DuckDB views: {', '.join(views) if views else 'none (run step1/step2 first)'}")
+    for view in views:
+        count = query_df(f"SELECT COUNT(*) AS n FROM {view}")["n"].iloc[0]
+        print(f"  {view:<20} {count} rows")
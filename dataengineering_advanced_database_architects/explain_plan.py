@@ -0,0 +1,347 @@
+# MySQL EXPLAIN ANALYZE parsing (tree and JSON formats) with per-query plan history
+
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from dotenv import load_dotenv
+
+# Loading variables from env file
+load_dotenv()
+
+# Pathlib configuration
+BASE_DIR = Path(__file__).resolve().parent
+PLAN_HISTORY_PATH = BASE_DIR / "Processed_Data" / "benchmarks" / "plan_history.json"
+
+# Regression thresholds
+# -- estimated vs actual rows of one access differing by more than this factor (either way)
+PLAN_ROW_DRIFT_FACTOR = float(os.getenv("PLAN_ROW_DRIFT_FACTOR", "10"))
+# -- total plan time growing by more than this factor over the previous run
+PLAN_SLOWDOWN_FACTOR = float(os.getenv("PLAN_SLOWDOWN_FACTOR", "2"))
+# Plans kept per query fingerprint
+PLAN_HISTORY_LIMIT = 20
+
+# A single number; cost ranges ("cost=2.5..2.5") are two of them around ".."
+_NUMBER = r"\d+(?:\.\d+)?(?:e[+-]?\d+)?"
+
+# One line of the tree format, e.g.
+# -> Index lookup on mm using PRIMARY (pk_id=m.pk_id)  (cost=0.25 rows=1) (actual time=0.002..0.002 rows=1 loops=120)
+TREE_LINE = re.compile(
+    r"^(?P<indent>\s*)-> (?P<operation>.*?)"
+    rf"(?:\s+\(cost=(?P<cost>{_NUMBER})(?:\.\.(?P<total_cost>{_NUMBER}))? rows=(?P<estimated_rows>{_NUMBER})\))?"
+    rf"(?:\s+\(actual time=(?P<first_ms>{_NUMBER})\.\.(?P<last_ms>{_NUMBER}) rows=(?P<actual_rows>{_NUMBER}) loops=(?P<loops>\d+)\)"
+    r"|\s+\((?P<never>never executed)\))?\s*$"
+)
+
+# Operation text -> access type (same wording in the tree and JSON formats)
+ACCESS_PATTERNS = [
+    (re.compile(r"^Table scan on (?P<table>\S+)"), "full_scan"),
+    (re.compile(r"^Covering index scan on (?P<table>\S+) using (?P<index>\S+)"), "covering_index_scan"),
+    (re.compile(r"^Index scan on (?P<table>\S+) using (?P<index>\S+)"), "index_scan"),
+    (re.compile(r"^(?:Covering )?[Ii]ndex range scan on (?P<table>\S+) using (?P<index>\S+)"), "range"),
+    (re.compile(r"^Single-row (?:covering )?index lookup on (?P<table>\S+) using (?P<index>\S+)"), "eq_ref"),
+    (re.compile(r"^(?:Covering )?[Ii]ndex lookup on (?P<table>\S+) using (?P<index>\S+)"), "ref"),
+    (re.compile(r"^Full-text index search on (?P<table>\S+) using (?P<index>\S+)"), "fulltext"),
+    (re.compile(r"^Constant row from (?P<table>\S+)"), "const"),
+]
+
+# access_type of the classic EXPLAIN FORMAT=JSON -> the names above
+CLASSIC_ACCESS_TYPES = {
+    "ALL": "full_scan", "index": "index_scan", "range": "range", "ref": "ref",
+    "eq_ref": "eq_ref", "const": "const", "system": "const", "fulltext": "fulltext"
+}
+
+def _number(value) -> Optional[float]:
+    return float(value) if value is not None else None
+
+class PlanNode:
+    """
+    One iterator of an EXPLAIN ANALYZE plan. Timings are in milliseconds; estimated_rows
+    and actual_rows are per loop, as MySQL reports them.
+    """
+    def __init__(self, operation: str, estimated_rows: Optional[float] = None, estimated_cost: Optional[float] = None,
+                 actual_first_ms: Optional[float] = None, actual_last_ms: Optional[float] = None,
+                 actual_rows: Optional[float] = None, loops: Optional[int] = None, never_executed: bool = False):
+        self.operation = operation
+        self.estimated_rows = estimated_rows
+        self.estimated_cost = estimated_cost
+        self.actual_first_ms = actual_first_ms
+        self.actual_last_ms = actual_last_ms
+        self.actual_rows = actual_rows
+        self.loops = loops
+        self.never_executed = never_executed
+        self.children: List["PlanNode"] = []
+
+        self.access_type = self.table = self.index = None
+        for pattern, access_type in ACCESS_PATTERNS:
+            match = pattern.match(operation)
+            if match:
+                self.access_type = access_type
+                self.table = match.group("table")
+                self.index = match.groupdict().get("index")
+                break
+
+    def walk(self) -> Iterator["PlanNode"]:
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    @property
+    def reads_base_table(self) -> bool:
+        """
+        Whether this access reads a stored table. Scans of <temporary> tables belong to grouping
+        and sorting, and derived tables / CTEs (e.g. "Table scan on sub") sit on top of the
+        Materialize node that fills them; base table accesses are always leaves.
+        """
+        return self.access_type is not None and not (self.table or "").startswith("<") and not self.children
+
+    @property
+    def is_full_scan(self) -> bool:
+        return self.access_type == "full_scan" and self.reads_base_table
+
+    @property
+    def total_rows(self) -> Optional[float]:
+        # Rows over all loops (actual_rows is an average per loop)
+        if self.actual_rows is None:
+            return None
+        return self.actual_rows * (self.loops or 1)
+
+    @property
+    def row_drift(self) -> Optional[float]:
+        """
+        How far the estimate missed, as a factor >= 1 (None without both numbers).
+        """
+        if self.estimated_rows is None or self.actual_rows is None:
+            return None
+        estimated, actual = max(self.estimated_rows, 1.0), max(self.actual_rows, 1.0)
+        return max(estimated, actual) / min(estimated, actual)
+
+    def to_dict(self) -> Dict[str, Any]:
+        fields = ("operation", "access_type", "table", "index", "estimated_rows", "estimated_cost",
+                  "actual_first_ms", "actual_last_ms", "actual_rows", "loops", "never_executed")
+        node = {field: getattr(self, field) for field in fields}
+        node["children"] = [child.to_dict() for child in self.children]
+        return node
+
+    @classmethod
+    def from_dict(cls, node: Dict[str, Any]) -> "PlanNode":
+        plan = cls(node["operation"], node.get("estimated_rows"), node.get("estimated_cost"),
+                   node.get("actual_first_ms"), node.get("actual_last_ms"), node.get("actual_rows"),
+                   node.get("loops"), node.get("never_executed", False))
+        # -- Classic JSON plans set these explicitly rather than through the operation text
+        plan.access_type = node.get("access_type", plan.access_type)
+        plan.table = node.get("table", plan.table)
+        plan.index = node.get("index", plan.index)
+        plan.children = [cls.from_dict(child) for child in node.get("children", [])]
+        return plan
+
+# --- Parsing ---
+
+def parse_tree(plan_text: str) -> Optional[PlanNode]:
+    """
+    Builds the node tree of EXPLAIN ANALYZE / EXPLAIN FORMAT=TREE output from the
+    "->" indentation. Several top-level nodes are put under one "Plan" root.
+    """
+    roots: List[PlanNode] = []
+    stack: List[tuple] = []   # (indent, node)
+
+    for line in plan_text.splitlines():
+        match = TREE_LINE.match(line)
+        if not match:
+            continue
+
+        node = PlanNode(
+            match.group("operation").strip(),
+            estimated_rows=_number(match.group("estimated_rows")),
+            estimated_cost=_number(match.group("total_cost") or match.group("cost")),
+            actual_first_ms=_number(match.group("first_ms")),
+            actual_last_ms=_number(match.group("last_ms")),
+            actual_rows=_number(match.group("actual_rows")),
+            loops=int(match.group("loops")) if match.group("loops") else None,
+            never_executed=match.group("never") is not None
+        )
+        indent = len(match.group("indent"))
+
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        if stack:
+            stack[-1][1].children.append(node)
+        else:
+            roots.append(node)
+        stack.append((indent, node))
+
+    if not roots:
+        return None
+    if len(roots) == 1:
+        return roots[0]
+    root = PlanNode("Plan")
+    root.children = roots
+    return root
+
+def _parse_iterator_json(node: Dict[str, Any]) -> PlanNode:
+    # EXPLAIN ANALYZE FORMAT=JSON (MySQL 8.3+, explain_json_format_version=2)
+    plan = PlanNode(
+        node.get("operation", "?"),
+        estimated_rows=node.get("estimated_rows"),
+        estimated_cost=node.get("estimated_total_cost"),
+        actual_first_ms=node.get("actual_first_row_ms"),
+        actual_last_ms=node.get("actual_last_row_ms"),
+        actual_rows=node.get("actual_rows"),
+        loops=node.get("actual_loops"),
+        never_executed=node.get("actual_loops") == 0
+    )
+    plan.children = [_parse_iterator_json(child) for child in node.get("inputs", [])]
+    return plan
+
+def _classic_tables(block: Any) -> Iterator[Dict[str, Any]]:
+    # Every table object (the dicts with an access_type) of a classic FORMAT=JSON plan, in plan order
+    if isinstance(block, dict):
+        if "access_type" in block:
+            yield block
+        for value in block.values():
+            yield from _classic_tables(value)
+    elif isinstance(block, list):
+        for item in block:
+            yield from _classic_tables(item)
+
+def _parse_classic_json(document: Dict[str, Any]) -> PlanNode:
+    """
+    Classic EXPLAIN FORMAT=JSON has no actuals and no iterator tree: the accessed
+    tables become the children of one query_block node.
+    """
+    root = PlanNode("Query block", estimated_cost=_number(document["query_block"].get("cost_info", {}).get("query_cost")))
+    for table in _classic_tables(document["query_block"]):
+        # -- Derived tables are filled by their nested query block, whose tables are listed too
+        if "materialized_from_subquery" in table:
+            continue
+        node = PlanNode(f"{table['access_type']} on {table.get('table_name', '?')}",
+                        estimated_rows=_number(table.get("rows_examined_per_scan")))
+        node.access_type = CLASSIC_ACCESS_TYPES.get(table["access_type"], table["access_type"])
+        if node.access_type == "index_scan" and table.get("using_index"):
+            node.access_type = "covering_index_scan"
+        node.table = table.get("table_name", "?")
+        node.index = table.get("key")
+        root.children.append(node)
+    return root
+
+def parse_plan(plan_text: str) -> Optional[PlanNode]:
+    """
+    Parses MySQL EXPLAIN output in tree or JSON format; None when nothing was recognised
+    (e.g. DuckDB's box-drawn plans).
+    """
+    plan_text = plan_text.strip()
+    if not plan_text.startswith("{"):
+        return parse_tree(plan_text)
+
+    document = json.loads(plan_text)
+    if "query_block" in document:
+        return _parse_classic_json(document)
+    return _parse_iterator_json(document.get("query_plan", document))
+
+# --- Reporting ---
+
+def format_plan(root: PlanNode) -> str:
+    """
+    The node tree with access type, per-loop estimated vs actual rows, loops and last-row time.
+    """
+    lines = []
+
+    def add(node: PlanNode, depth: int) -> None:
+        details = []
+        if node.access_type:
+            details.append(node.access_type)
+        if node.estimated_rows is not None or node.actual_rows is not None:
+            details.append(f"rows est {node.estimated_rows if node.estimated_rows is not None else '?'} "
+                           f"/ actual {node.actual_rows if node.actual_rows is not None else '?'}")
+        if node.loops is not None:
+            details.append(f"loops {node.loops}")
+        if node.actual_last_ms is not None:
+            details.append(f"{node.actual_last_ms:.3f} ms")
+        if node.never_executed:
+            details.append("never executed")
+        lines.append(f"{'  ' * depth}{node.operation}" + (f"  [{', '.join(details)}]" if details else ""))
+        for child in node.children:
+            add(child, depth + 1)
+
+    add(root, 0)
+    return "\n".join(lines)
+
+def plan_summary(root: PlanNode) -> Dict[str, Any]:
+    """
+    Total time (root's last row), rows read by the table accesses, full scans and the
+    worst row estimate of the plan.
+    """
+    accesses = [node for node in root.walk() if node.reads_base_table]
+    drifting = [node for node in accesses if node.row_drift is not None]
+    worst = max(drifting, key=lambda node: node.row_drift, default=None)
+    return {
+        "total_ms": root.actual_last_ms,
+        "rows_read": sum(node.total_rows or 0 for node in accesses),
+        "accesses": [(node.table, node.access_type, node.index) for node in accesses],
+        "full_scans": sorted({node.table for node in accesses if node.is_full_scan}),
+        "worst_drift": (worst.table, worst.row_drift) if worst else None
+    }
+
+# --- History and regressions ---
+
+def fingerprint(query: str) -> str:
+    """
+    Hash of the query with EXPLAIN prefixes, literals, case and whitespace normalised away.
+    """
+    normalized = re.sub(r"^\s*explain(\s+analyze)?(\s+format\s*=\s*\w+)?\s+", "", query, flags=re.IGNORECASE)
+    normalized = re.sub(r"'(?:[^'\\]|\\.)*'", "?", normalized)
+    normalized = re.sub(r"\b\d+(?:\.\d+)?\b", "?", normalized)
+    normalized = re.sub(r"\s+", " ", normalized).strip().rstrip(";").strip().lower()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+def detect_regressions(previous: PlanNode, current: PlanNode) -> List[str]:
+    """
+    New full table scans, row estimates that started missing by more than
+    PLAN_ROW_DRIFT_FACTOR, and total time growing by more than PLAN_SLOWDOWN_FACTOR.
+    """
+    before, after = plan_summary(previous), plan_summary(current)
+    flags = [f"new full table scan on {table}" for table in after["full_scans"] if table not in before["full_scans"]]
+
+    previous_drift = {node.table: node.row_drift for node in previous.walk() if node.row_drift is not None}
+    for node in current.walk():
+        drift = node.row_drift
+        if drift is None or drift <= PLAN_ROW_DRIFT_FACTOR or not node.reads_base_table:
+            continue
+        if previous_drift.get(node.table, 1.0) <= PLAN_ROW_DRIFT_FACTOR:
+            flags.append(f"row estimate drift on {node.table}: estimated {node.estimated_rows:g}, "
+                         f"actual {node.actual_rows:g} per loop ({drift:.1f}x)")
+
+    if before["total_ms"] and after["total_ms"] and after["total_ms"] > before["total_ms"] * PLAN_SLOWDOWN_FACTOR:
+        flags.append(f"total time {before['total_ms']:.3f} -> {after['total_ms']:.3f} ms")
+    return flags
+
+def _load_history(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def record_plan(query: str, plan_text: str, path: Path = PLAN_HISTORY_PATH) -> List[str]:
+    """
+    Stores the parsed plan under the query's fingerprint and returns the regressions
+    against the previously stored plan (nothing is stored for unparseable plans).
+    """
+    root = parse_plan(plan_text)
+    if root is None:
+        return []
+
+    history = _load_history(path)
+    entry = history.setdefault(fingerprint(query), {"query": re.sub(r"\s+", " ", query).strip(), "plans": []})
+    flags = detect_regressions(PlanNode.from_dict(entry["plans"][-1]["plan"]), root) if entry["plans"] else []
+
+    entry["plans"].append({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "plan": root.to_dict(), "regressions": flags})
+    entry["plans"] = entry["plans"][-PLAN_HISTORY_LIMIT:]
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2)
+    return flags
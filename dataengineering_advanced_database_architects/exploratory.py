@@ -1,6 +1,8 @@
-import json
 from pathlib import Path
 
+from meetingbank_stream import iter_meetings
+from meetingbank_cache import cache_is_fresh, iter_cached_meetings
+
 # Pathlib
 ROOT_PATH = Path(__file__).resolve().parent
 SOURCE_FILE = ROOT_PATH / "Data" / "MeetingBank.json"
@@ -13,11 +15,20 @@ def process_meeting_data(file_path):
     if not file_path.exists():
         raise FileNotFoundError(f"Could not locate data at: {file_path}")
 
-    with open(file_path, "r", encoding="utf-8") as source:
-        raw_dataset = json.load(source)
+    # A fresh Arrow cache is memory-mapped instead of parsing the JSON
+    if cache_is_fresh(file_path):
+        for row in iter_cached_meetings(file_path):
+            yield {
+                "id": row["meeting_id"],
+                "municipality": row["city"],
+                "duration": row["video_duration_sec"],
+                "agenda_count": row["item_count"],
+                "speech_segments": row["segment_count"]
+            }
+        return
 
-    # Iterate directly over items
-    for unique_id, details in raw_dataset.items():
+    # Iterate over meetings as they are parsed, one at a time
+    for unique_id, details in iter_meetings(file_path):
         
         # .get() ensures no crash if key is missing
         agenda_items = details.get("itemInfo", {})
@@ -35,11 +46,18 @@ def process_meeting_data(file_path):
         }
 
 if __name__ == "__main__":
-    all_records = list(process_meeting_data(SOURCE_FILE))
+    # Counting while streaming keeps only the preview records in memory
+    preview_records = []
+    dataset_size = 0
+
+    for record in process_meeting_data(SOURCE_FILE):
+        dataset_size += 1
+        if len(preview_records) < 5:
+            preview_records.append(record)
 
-    print(f"Dataset Size: {len(all_records)}")
+    print(f"Dataset Size: {dataset_size}")
     print("\nPreview of extracted data:")
     
-    for idx, record in enumerate(all_records[:5], 1):
+    for idx, record in enumerate(preview_records, 1):
         print(f"{idx}. {record}")
         
\ No newline at end of file
@@ -0,0 +1,106 @@
+# Synthetic MeetingBank.json generator for scaling benchmarks
+
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Pathlib configuration
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = BASE_DIR / "Data"
+
+# Default output: never overwrites the real MeetingBank.json
+DEFAULT_OUTPUT_PATH = DATA_DIR / "MeetingBank.synthetic.json"
+
+# The two target cities of steps 1-2 plus other MeetingBank cities that get filtered out
+DEFAULT_CITIES = ["LongBeachCC", "SeattleCityCouncil", "AlamedaCC", "BostonCC", "DenverCityCouncil", "KingCountyCC"]
+
+# Transcript vocabulary; 'budget' and 'housing' keep the step5 text search meaningful
+VOCABULARY = (
+    "the council motion second vote item public comment budget housing city staff report "
+    "resolution ordinance approve amend member chair thank you please next agenda hearing "
+    "district street park transit zoning permit contract fiscal year funding program"
+).split()
+
+def _around(rng: random.Random, mean: int) -> int:
+    # Uniform spread around the mean (at least 1) so meetings differ in size
+    return rng.randint(max(1, mean // 2), max(1, mean + mean // 2))
+
+def synthetic_meeting(rng: random.Random, items: int, segments: int, speakers: int, words: int) -> Dict[str, Any]:
+    """
+    One meeting in the MeetingBank layout: VideoDuration plus itemInfo -> transcripts segments.
+    """
+    item_info = {}
+    total_words = 0
+
+    for item_index in range(_around(rng, items)):
+        transcripts = []
+        for _ in range(_around(rng, segments)):
+            text = " ".join(rng.choices(VOCABULARY, k=_around(rng, words)))
+            total_words += text.count(" ") + 1
+            transcripts.append({"speaker": f"SPEAKER_{rng.randrange(speakers)}", "text": text})
+
+        item_info[str(item_index)] = {
+            "Summary": " ".join(rng.choices(VOCABULARY, k=12)),
+            "transcripts": transcripts
+        }
+
+    # Roughly 150 spoken words per minute
+    return {"VideoDuration": max(60, int(total_words / 2.5)), "itemInfo": item_info}
+
+def write_synthetic_meetingbank(
+    path: Path,
+    meetings: int,
+    items: int = 8,
+    segments: int = 30,
+    speakers: int = 12,
+    words: int = 40,
+    cities: List[str] = DEFAULT_CITIES,
+    seed: int = 0
+) -> Dict[str, int]:
+    """
+    Streams a schema-compatible MeetingBank JSON object of 'meetings' meetings to path
+    (one meeting in memory at a time) and returns the number of meetings per city.
+    """
+    rng = random.Random(seed)
+    per_city = {city: 0 for city in cities}
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{")
+        for index in range(meetings):
+            city = cities[index % len(cities)]
+            per_city[city] += 1
+            meeting_id = f"{city}_{per_city[city]}"
+
+            if index:
+                f.write(",")
+            f.write(f"\n{json.dumps(meeting_id)}: ")
+            json.dump(synthetic_meeting(rng, items, segments, speakers, words), f)
+        f.write("\n}\n")
+
+    return per_city
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate a synthetic MeetingBank JSON file.")
+    parser.add_argument("--meetings", type=int, default=1000, help="Number of meetings (spread evenly over the cities)")
+    parser.add_argument("--items", type=int, default=8, help="Average agenda items per meeting")
+    parser.add_argument("--segments", type=int, default=30, help="Average transcript segments per item")
+    parser.add_argument("--speakers", type=int, default=12, help="Distinct speakers per meeting")
+    parser.add_argument("--words", type=int, default=40, help="Average words per segment")
+    parser.add_argument("--cities", nargs="+", default=DEFAULT_CITIES, help="City prefixes of the meeting ids")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT_PATH)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    per_city = write_synthetic_meetingbank(
+        args.output, args.meetings, args.items, args.segments, args.speakers, args.words, args.cities, args.seed
+    )
+    size_mb = args.output.stat().st_size / 1e6
+    print(f"Wrote {args.meetings} meetings ({size_mb:.1f} MB) to {args.output}")
+    for city, count in per_city.items():
+        print(f"  {city:<24} {count}")
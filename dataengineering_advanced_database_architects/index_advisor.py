@@ -0,0 +1,359 @@
+# Workload-driven index advisor: composite / covering index proposals measured in a sandbox schema
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import inspect, text
+
+from connections import get_sql_engine
+from explain_plan import parse_plan
+from query_benchmark import benchmark_queries
+
+# Loading variables from env file
+load_dotenv()
+
+# Pathlib configuration
+BASE_DIR = Path(__file__).resolve().parent
+ADVICE_PATH = BASE_DIR / "Processed_Data" / "benchmarks" / "index_advice.json"
+
+# Schema the tables are copied into before any index is created
+INDEX_SANDBOX_SCHEMA = os.getenv("INDEX_SANDBOX_SCHEMA", "meetingbank_index_sandbox")
+
+# Wider indexes cost more on every step3 insert than they save here
+MAX_INDEX_COLUMNS = 4
+
+# The analytical queries of step4 and step6
+WORKLOAD = {
+    "denormalized_inefficient": """
+        SELECT city, AVG(video_duration_sec) AS avg_duration
+        FROM denormalized_table
+        GROUP BY city
+    """,
+    "optimized_efficient": """
+        SELECT c.city, sub.avg_duration
+        FROM cities c
+        JOIN (
+            SELECT m.city_id, AVG(mm.video_duration_sec) AS avg_duration
+            FROM meetings m
+            JOIN meeting_metrics mm ON m.pk_id = mm.pk_id
+            GROUP BY m.city_id
+        ) sub ON c.city_id = sub.city_id
+    """,
+    "avg_segment_count_cte": """
+        WITH city_segments AS (
+            SELECT m.city_id, AVG(mm.segment_count) AS avg_segments
+            FROM meetings m
+            JOIN meeting_metrics mm ON m.pk_id = mm.pk_id
+            GROUP BY m.city_id
+        )
+        SELECT c.city, cs.avg_segments
+        FROM cities c
+        JOIN city_segments cs ON c.city_id = cs.city_id
+    """,
+    "window_function_ranking": """
+        SELECT pk_id, video_duration_sec, item_count,
+               RANK() OVER (ORDER BY video_duration_sec DESC) AS duration_rank
+        FROM meeting_metrics
+    """,
+    "analytical_top_meetings": """
+        SELECT c.city, m.meeting_id, mm.video_duration_sec, mm.item_count
+        FROM cities c
+        JOIN meetings m ON c.city_id = m.city_id
+        JOIN meeting_metrics mm ON m.pk_id = mm.pk_id
+        ORDER BY mm.item_count DESC
+        LIMIT 10
+    """,
+    "step6_denormalized_read": "SELECT * FROM denormalized_table",
+}
+
+WORKLOAD_TABLES = ["cities", "meetings", "meeting_metrics", "denormalized_table"]
+
+_SQL_WORDS = {"on", "join", "where", "group", "order", "limit", "inner", "left", "right", "cross", "as", "having"}
+TABLE_REF = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+JOIN_CONDITION = re.compile(r"\bON\s+(\w+)\.(\w+)\s*=\s*(\w+)\.(\w+)", re.IGNORECASE)
+CLAUSE_END = r"(?=\)|\bHAVING\b|\bORDER\s+BY\b|\bLIMIT\b|;|$)"
+
+# --- Workload analysis ---
+
+def column_usage(query: str, schema: Dict[str, List[str]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Per table of the query (keyed by table name and alias): join, group-by and order-by
+    columns plus every column used. Qualified columns are resolved through the aliases;
+    unqualified ones only when a single table of the query has that column.
+    """
+    aliases = {}
+    for table, alias in TABLE_REF.findall(query):
+        if table in schema:
+            aliases[table] = table
+            if alias and alias.lower() not in _SQL_WORDS:
+                aliases[alias] = table
+
+    tables = sorted(set(aliases.values()))
+    usage = {table: {"table": table, "join": [], "group": [], "order": [], "used": set()} for table in tables}
+
+    def resolve(fragment: str) -> List[tuple]:
+        found = []
+        for qualifier, column in re.findall(r"\b(?:(\w+)\.)?(\w+)\b", fragment):
+            if qualifier:
+                table = aliases.get(qualifier)
+                if table and column in schema[table]:
+                    found.append((table, column))
+            else:
+                owners = [table for table in tables if column in schema[table]]
+                if len(owners) == 1:
+                    found.append((owners[0], column))
+        return found
+
+    for table, column in resolve(query):
+        usage[table]["used"].add(column)
+
+    for left_alias, left_col, right_alias, right_col in JOIN_CONDITION.findall(query):
+        for alias, column in ((left_alias, left_col), (right_alias, right_col)):
+            table = aliases.get(alias)
+            if table and column in schema[table] and column not in usage[table]["join"]:
+                usage[table]["join"].append(column)
+
+    for role, pattern in (("group", r"\bGROUP\s+BY\s+(.*?)"), ("order", r"\bORDER\s+BY\s+(.*?)")):
+        for clause in re.findall(pattern + CLAUSE_END, query, flags=re.IGNORECASE | re.DOTALL):
+            for table, column in resolve(re.sub(r"\b(?:ASC|DESC)\b", "", clause, flags=re.IGNORECASE)):
+                if column not in usage[table][role]:
+                    usage[table][role].append(column)
+
+    # -- Plans name tables by their alias
+    return {alias: usage[table] for alias, table in aliases.items()}
+
+def existing_indexes(engine, table: str) -> List[List[str]]:
+    inspector = inspect(engine)
+    indexes = [index["column_names"] for index in inspector.get_indexes(table)]
+    primary_key = inspector.get_pk_constraint(table).get("constrained_columns")
+    if primary_key:
+        indexes.append(primary_key)
+    return indexes
+
+def propose_index(node, table_usage: Dict[str, Any], has_limit: bool) -> Optional[List[str]]:
+    """
+    Index columns for one table access of a plan, or None when it is already served well:
+    -- lookups (inner side of a join): join columns first, then the other columns read
+    -- scans: GROUP BY (or ORDER BY under a LIMIT) columns first, then join and read columns,
+       so the scan can run on the index alone in key order; a scanned join input gets its
+       join columns first, which turns a hash join into index lookups
+    """
+    if node.operation.startswith("Covering") or node.access_type in ("covering_index_scan", "const", "fulltext"):
+        return None
+    # -- InnoDB rows live in the primary key, so primary key lookups never need the table twice
+    if node.access_type in ("ref", "eq_ref", "range") and node.index == "PRIMARY":
+        return None
+
+    if node.access_type in ("ref", "eq_ref", "range"):
+        # -- The columns of the lookup condition, e.g. "(pk_id=m.pk_id)", lead the key
+        condition = node.operation.split(" using ", 1)[-1]
+        key = [column for column in re.findall(r"(\w+)\s*=", condition) if column in table_usage["used"]]
+        key += [column for column in table_usage["join"] if column not in key]
+    elif has_limit and table_usage["order"]:
+        key = list(table_usage["order"])
+    else:
+        key = list(table_usage["group"]) or list(table_usage["order"]) or list(table_usage["join"])
+    if not key:
+        return None
+
+    columns = key + [column for column in table_usage["join"] if column not in key]
+    columns += sorted(column for column in table_usage["used"] if column not in columns)
+    return columns[:MAX_INDEX_COLUMNS]
+
+def explain_workload(engine, workload: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Parsed EXPLAIN ANALYZE plan per query; None for a plan that cannot be parsed, so one
+    unexpected plan shape only drops that query from the advice.
+    """
+    plans = {}
+    with engine.connect() as conn:
+        for name, query in workload.items():
+            plan_text = conn.execute(text(f"EXPLAIN ANALYZE {query}")).fetchone()[0]
+            try:
+                plans[name] = parse_plan(plan_text)
+            except ValueError as e:
+                print(f"  Could not parse the plan of {name}, skipping it: {e}")
+                plans[name] = None
+    return plans
+
+def advise(engine, workload: Dict[str, str] = WORKLOAD) -> List[Dict[str, Any]]:
+    """
+    Proposes composite / covering indexes from the EXPLAIN ANALYZE plans of the workload.
+    A proposal already served by a prefix of an existing index is dropped, and one that is
+    a prefix of another proposal on the same table is merged into it.
+    """
+    inspector = inspect(engine)
+    schema = {
+        table: [column["name"] for column in inspector.get_columns(table)]
+        for table in WORKLOAD_TABLES if inspector.has_table(table)
+    }
+    plans = explain_workload(engine, workload)
+
+    proposals: Dict[tuple, Dict[str, Any]] = {}
+    for name, query in workload.items():
+        plan = plans[name]
+        if plan is None:
+            continue
+        usage = column_usage(query, schema)
+        has_limit = re.search(r"\bLIMIT\s+\d+", query, flags=re.IGNORECASE) is not None
+
+        for node in plan.walk():
+            if node.table not in usage:
+                continue
+            table = usage[node.table]["table"]
+            columns = propose_index(node, usage[node.table], has_limit)
+            if columns is None:
+                continue
+            if any(index[:len(columns)] == columns for index in existing_indexes(engine, table)):
+                continue
+
+            proposal = proposals.setdefault((table, tuple(columns)), {
+                "table": table, "columns": columns, "queries": [], "evidence": []
+            })
+            if name not in proposal["queries"]:
+                proposal["queries"].append(name)
+            proposal["evidence"].append(
+                f"{name}: {node.access_type} on {table}"
+                + (f" using {node.index}" if node.index else "")
+                + (f", {node.total_rows:,.0f} rows" if node.total_rows is not None else "")
+            )
+
+    # -- A proposal that is a prefix of a wider one on the same table is served by the wider one;
+    # -- it merges into the widest, which is never itself a prefix of another proposal
+    merged = []
+    for (table, columns), proposal in proposals.items():
+        wider = [other for (other_table, other_columns), other in proposals.items()
+                 if other_table == table and len(other_columns) > len(columns) and other_columns[:len(columns)] == columns]
+        if wider:
+            widest = max(wider, key=lambda other: len(other["columns"]))
+            widest["queries"].extend(q for q in proposal["queries"] if q not in widest["queries"])
+            widest["evidence"].extend(proposal["evidence"])
+        else:
+            merged.append(proposal)
+
+    for proposal in merged:
+        proposal["name"] = index_name(proposal["table"], proposal["columns"])
+        proposal["ddl"] = f"CREATE INDEX {proposal['name']} ON {proposal['table']} ({', '.join(proposal['columns'])})"
+    return merged
+
+def index_name(table: str, columns: List[str]) -> str:
+    """
+    adv_<table>_<columns>; names over MySQL's 64 characters are cut and get a hash of
+    the full name, so two long proposals never share a name.
+    """
+    name = f"adv_{table}_{'_'.join(columns)}"
+    if len(name) <= 64:
+        return name
+    return f"{name[:55]}_{hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]}"
+
+# --- Sandbox measurement ---
+
+def create_sandbox(engine, sandbox: str = INDEX_SANDBOX_SCHEMA) -> None:
+    """
+    Copies the workload tables with their current indexes (CREATE TABLE ... LIKE) and rows
+    into the sandbox schema, so proposals never touch the live tables.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE DATABASE IF NOT EXISTS {sandbox}"))
+        for table in WORKLOAD_TABLES:
+            if not inspector.has_table(table):
+                continue
+            conn.execute(text(f"DROP TABLE IF EXISTS {sandbox}.{table}"))
+            conn.execute(text(f"CREATE TABLE {sandbox}.{table} LIKE {table}"))
+            conn.execute(text(f"INSERT INTO {sandbox}.{table} SELECT * FROM {table}"))
+
+def p50_by_query(results: Dict[str, Dict[str, Any]]) -> Dict[str, float]:
+    return {name: result["warm"]["total_ms"]["p50"] for name, result in results.items() if result["warm"].get("runs")}
+
+def measure_proposals(proposals: List[Dict[str, Any]], sandbox: str = INDEX_SANDBOX_SCHEMA,
+                      workload: Dict[str, str] = WORKLOAD) -> Dict[str, Any]:
+    """
+    Benchmarks the workload in the sandbox before any proposal, with each proposal on its
+    own (only the queries it targets), and with all of them together.
+    """
+    engine = get_sql_engine(database=sandbox)
+    baseline = p50_by_query(benchmark_queries(workload, engine=engine))
+
+    def create(proposal):
+        with engine.begin() as conn:
+            conn.execute(text(proposal["ddl"]))
+            conn.execute(text(f"ANALYZE TABLE {proposal['table']}"))
+
+    for proposal in proposals:
+        create(proposal)
+        targeted = {name: workload[name] for name in proposal["queries"]}
+        after = p50_by_query(benchmark_queries(targeted, engine=engine))
+        proposal["p50_ms"] = {name: {"before": baseline[name], "after": after[name]} for name in after}
+        plans = explain_workload(engine, targeted)
+        proposal["used_by"] = [name for name, plan in plans.items()
+                               if plan is not None and any(node.index == proposal["name"] for node in plan.walk())]
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP INDEX {proposal['name']} ON {proposal['table']}"))
+
+    for proposal in proposals:
+        create(proposal)
+    combined = p50_by_query(benchmark_queries(workload, engine=engine))
+    return {"baseline_p50_ms": baseline, "combined_p50_ms": combined}
+
+def print_advice(proposals: List[Dict[str, Any]], measurement: Optional[Dict[str, Any]] = None) -> None:
+    if not proposals:
+        print("No index proposals: every workload access is already covered or served by the primary key.")
+    for proposal in proposals:
+        print(f"\n{proposal['ddl']};")
+        for evidence in proposal["evidence"]:
+            print(f"  evidence: {evidence}")
+        for name, p50 in proposal.get("p50_ms", {}).items():
+            speedup = p50["before"] / p50["after"] if p50["after"] else float("inf")
+            used = "used" if name in proposal.get("used_by", []) else "NOT used by the plan"
+            print(f"  {name}: p50 {p50['before']:.2f} -> {p50['after']:.2f} ms ({speedup:.2f}x, {used})")
+
+    if measurement:
+        print("\n--- Whole workload with all proposals (sandbox) ---")
+        for name, before in measurement["baseline_p50_ms"].items():
+            after = measurement["combined_p50_ms"].get(name)
+            if after is not None:
+                print(f"  {name:<26} p50 {before:8.2f} -> {after:8.2f} ms ({before / max(after, 1e-9):.2f}x)")
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Propose and measure indexes for the step4/step6 workload (MySQL).")
+    parser.add_argument("--measure", action="store_true",
+                        help="Copy the tables into the sandbox schema and benchmark every proposal there")
+    parser.add_argument("--sandbox", default=INDEX_SANDBOX_SCHEMA, help="Sandbox schema name")
+    parser.add_argument("--keep-sandbox", action="store_true", help="Do not drop the sandbox schema afterwards")
+    parser.add_argument("--output", type=Path, default=ADVICE_PATH)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    engine = get_sql_engine()
+
+    print("Explaining the step4/step6 workload...")
+    proposals = advise(engine)
+
+    measurement = None
+    if args.measure and proposals:
+        print(f"Copying {', '.join(WORKLOAD_TABLES)} into sandbox schema {args.sandbox}...")
+        create_sandbox(engine, args.sandbox)
+        try:
+            measurement = measure_proposals(proposals, args.sandbox)
+        finally:
+            if not args.keep_sandbox:
+                with engine.begin() as conn:
+                    conn.execute(text(f"DROP DATABASE IF EXISTS {args.sandbox}"))
+
+    print_advice(proposals, measurement)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "proposals": proposals, "measurement": measurement},
+                  f, indent=2)
+    print(f"\nAdvice saved at: {args.output}")
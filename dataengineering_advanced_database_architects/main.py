@@ -1,27 +1,210 @@
-import subprocess
+import argparse
+import runpy
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from typing import Dict, List
 
-def run_script(script_name):
-    print(f"--- Starting: {script_name} ---")
+# Pathlib configuration
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = BASE_DIR / "Data"
+OUTPUT_DIR = BASE_DIR / "Processed_Data"
+
+# Stamp files record the last successful run of steps whose outputs live in a database
+STAMP_DIR = OUTPUT_DIR / ".pipeline"
+
+MEETINGBANK_JSON = DATA_DIR / "MeetingBank.json"
+SUMMARY_PARQUET = OUTPUT_DIR / "meeting_summary.parquet"
+TRANSCRIPT_PARQUET = OUTPUT_DIR / "meeting_transcripts.parquet"
+COMPLETE_PARQUET = OUTPUT_DIR / "completedata.parquet"
+
+# Downstream steps shared by both extraction variants (ignoring notebooks and .js files)
+LOAD_AND_ANALYSE = {
+    "load": {
+        "script": "step3_database_loading.py",
+        "deps": ["extract"],
+        "inputs": [SUMMARY_PARQUET, TRANSCRIPT_PARQUET],
+        "outputs": []
+    },
+    "optimize": {
+        "script": "step4_sql_optimization.py",
+        "deps": ["load"],
+        "inputs": [],
+        "outputs": []
+    },
+    "merge": {
+        "script": "step6_sql_nosql_merge_and_visualization.py",
+        "deps": ["optimize"],
+        "inputs": [],
+        "outputs": [COMPLETE_PARQUET],
+        # plt.show() needs the main thread with GUI backends (TkAgg, macosx)
+        "main_thread": True
+    }
+}
+
+# Default: steps 1 and 2 share a single pass over MeetingBank.json
+PIPELINE = {
+    "extract": {
+        "script": "step1_2_extract_meetings.py",
+        "deps": [],
+        "inputs": [MEETINGBANK_JSON],
+        "outputs": [SUMMARY_PARQUET, TRANSCRIPT_PARQUET]
+    },
+    **LOAD_AND_ANALYSE
+}
+
+# --split-extraction: steps 1 and 2 as independent nodes that run concurrently
+SPLIT_PIPELINE = {
+    "metadata": {
+        "script": "step1_process_metadata.py",
+        "deps": [],
+        "inputs": [MEETINGBANK_JSON],
+        "outputs": [SUMMARY_PARQUET]
+    },
+    "transcripts": {
+        "script": "step2_process_transcripts.py",
+        "deps": [],
+        "inputs": [MEETINGBANK_JSON],
+        "outputs": [TRANSCRIPT_PARQUET]
+    },
+    **LOAD_AND_ANALYSE,
+    "load": {**LOAD_AND_ANALYSE["load"], "deps": ["metadata", "transcripts"]}
+}
+
+def stamp_path(name: str) -> Path:
+    return STAMP_DIR / f"{name}.done"
+
+def newest_mtime(path: Path) -> float:
+    # Partitioned datasets are directories: use their most recently written file
+    if path.is_dir():
+        return max((f.stat().st_mtime for f in path.rglob("*") if f.is_file()), default=0.0)
+    return path.stat().st_mtime
+
+def is_up_to_date(name: str, step: Dict) -> bool:
+    """
+    A step is up to date when its outputs (and stamp) exist and are newer than its inputs.
+    """
+    outputs = step["outputs"] + [stamp_path(name)]
+    if not all(path.exists() for path in outputs):
+        return False
+
+    inputs = [path for path in step["inputs"] if path.exists()]
+    if not inputs:
+        return True
+
+    return min(newest_mtime(path) for path in outputs) >= max(newest_mtime(path) for path in inputs)
+
+def run_step(name: str, step: Dict) -> float:
+    """
+    Runs a step script inside this interpreter, so imports (pandas, pyarrow,
+    sqlalchemy, pymongo) are paid once for the whole pipeline.
+    """
+    print(f"--- Starting: {step['script']} ---")
+    start_time = time.perf_counter()
+
+    runpy.run_path(str(BASE_DIR / step["script"]), run_name="__main__")
+
+    STAMP_DIR.mkdir(parents=True, exist_ok=True)
+    stamp_path(name).touch()
+
+    elapsed = time.perf_counter() - start_time
+    print(f"--- Finished: {step['script']} successfully ({elapsed:.2f} s) ---\n")
+    return elapsed
+
+def run_pipeline(pipeline: Dict[str, Dict], max_workers: int = 2, force: bool = False) -> bool:
+    """
+    Runs the steps in dependency order; independent steps run concurrently.
+    A step that is ready on its own, or is marked main_thread, runs on the main thread
+    once nothing else is running. A step is skipped when it is up to date and none of
+    its dependencies ran. Returns False if any step failed.
+    """
+    finished: Dict[str, str] = {}   # name -> "ran" / "skipped"
+    running = {}
+    failed: List[str] = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while len(finished) < len(pipeline) and not failed:
+            skipped_any = False
+            ready = []
+            for name, step in pipeline.items():
+                if name in finished or name in running:
+                    continue
+                if not all(dep in finished for dep in step["deps"]):
+                    continue
+
+                deps_ran = any(finished[dep] == "ran" for dep in step["deps"])
+                if not force and not deps_ran and is_up_to_date(name, step):
+                    print(f"--- Skipping: {step['script']} (outputs are up to date) ---\n")
+                    finished[name] = "skipped"
+                    skipped_any = True
+                    continue
+                ready.append(name)
+
+            if skipped_any:
+                # -- Skips may have unblocked more steps; look again before running anything
+                continue
+
+            pooled = [name for name in ready if not pipeline[name].get("main_thread")]
+            if not running and len(ready) == 1:
+                pooled = []
+            for name in pooled:
+                running[name] = executor.submit(run_step, name, pipeline[name])
+
+            if not running:
+                if not ready:
+                    waiting = [name for name in pipeline if name not in finished]
+                    raise RuntimeError(f"Pipeline stalled: {', '.join(waiting)} wait on missing or cyclic dependencies")
+                name = ready[0]
+                try:
+                    run_step(name, pipeline[name])
+                    finished[name] = "ran"
+                except BaseException as e:
+                    print(f"Error occurred while running {pipeline[name]['script']}: {e!r}")
+                    failed.append(name)
+                continue
+
+            done, _ = wait(running.values(), return_when=FIRST_COMPLETED)
+            for name in [name for name, future in running.items() if future in done]:
+                future = running.pop(name)
+                try:
+                    future.result()
+                    finished[name] = "ran"
+                except BaseException as e:
+                    # 'SystemExit' included: a step calling sys.exit must not end the runner silently
+                    print(f"Error occurred while running {pipeline[name]['script']}: {e!r}")
+                    failed.append(name)
+
+        # Let steps that were already running finish before reporting
+        wait(running.values())
+
+    return not failed
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the MeetingBank pipeline.")
+    parser.add_argument("--force", action="store_true",
+                        help="Run every step even if its outputs are up to date")
+    parser.add_argument("--split-extraction", action="store_true",
+                        help="Run step1 and step2 as separate, concurrent steps instead of the single-pass extraction")
+    parser.add_argument("--max-workers", type=int, default=2,
+                        help="Maximum number of steps running at the same time")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    # Step scripts parse their own (default) arguments from sys.argv
+    sys.argv = [sys.argv[0]]
+
+    pipeline = SPLIT_PIPELINE if args.split_extraction else PIPELINE
     try:
-        # 'check=True' ensures the main script stops if a sub-script fails
-        subprocess.run([sys.executable, script_name], check=True)
-        print(f"--- Finished: {script_name} successfully ---\n")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred while running {script_name}: {e}")
+        succeeded = run_pipeline(pipeline, max_workers=args.max_workers, force=args.force)
+    finally:
+        # Steps share the pooled connections from connections.py; close them once at the end
+        from connections import dispose_all
+        dispose_all()
+
+    if not succeeded:
         sys.exit(1)  # Stop the entire pipeline if a step fails
 
-if __name__ == "__main__":
-    # Defining sequence (ignoring notebooks and .js files)
-    scripts_to_run = [
-        "step1_process_metadata.py",
-        "step2_process_transcripts.py",
-        "step3_database_loading.py",
-        "step4_sql_optimization.py",
-        "step6_sql_nosql_merge_and_visualization.py"
-    ]
-
-    for script in scripts_to_run:
-        run_script(script)
-    
-    print("Pipeline complete!")
\ No newline at end of file
+    print("Pipeline complete!")
@@ -0,0 +1,230 @@
+# Memory-mapped Arrow IPC cache of the parsed MeetingBank dataset
+
+import json
+import pyarrow as pa
+import pyarrow.compute as pc
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from meetingbank_stream import iter_meetings
+
+# Pathlib configuration
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = BASE_DIR / "Data"
+
+# File Paths
+MEETINGBANK_JSON_PATH = DATA_DIR / "MeetingBank.json"
+MEETINGS_CACHE_PATH = DATA_DIR / "MeetingBank.meetings.arrow"
+SEGMENTS_CACHE_PATH = DATA_DIR / "MeetingBank.segments.arrow"
+CACHE_INFO_PATH = DATA_DIR / "MeetingBank.cache.json"
+
+# Bump when the cache layout changes so old caches are rebuilt
+CACHE_VERSION = 2
+
+# Meetings per record batch written to the cache
+CACHE_BATCH_MEETINGS = 512
+
+# One row per meeting (all cities), with the same fields as the step1 summary rows
+MEETING_SCHEMA = pa.schema([
+    ("meeting_id", pa.string()),
+    ("city", pa.string()),
+    ("video_duration_sec", pa.float64()),
+    ("item_count", pa.int64()),
+    ("segment_count", pa.int64())
+])
+
+# One row per transcript segment, text stripped like in step2
+SEGMENT_SCHEMA = pa.schema([
+    ("meeting_id", pa.string()),
+    ("item_key", pa.string()),
+    ("segment_index", pa.int32()),
+    ("speaker", pa.string()),
+    ("text", pa.string())
+])
+
+def _source_info(source: Path) -> Dict[str, Any]:
+    stat = source.stat()
+    return {
+        "version": CACHE_VERSION,
+        "source": str(source.resolve()),
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns
+    }
+
+def cache_is_fresh(source: Path = MEETINGBANK_JSON_PATH) -> bool:
+    """
+    True when the cache exists and was built from this source file (same path, size and mtime).
+    """
+    if not (source.exists() and CACHE_INFO_PATH.exists() and MEETINGS_CACHE_PATH.exists() and SEGMENTS_CACHE_PATH.exists()):
+        return False
+
+    with open(CACHE_INFO_PATH, "r", encoding="utf-8") as f:
+        return json.load(f) == _source_info(source)
+
+def _flatten_meeting(meeting_id: str, meeting_data: Dict[str, Any], meetings: Dict[str, list], segments: Dict[str, list]) -> None:
+    item_info = meeting_data.get("itemInfo", {})
+    segment_count = 0
+
+    for item_key, item in item_info.items():
+        for segment_index, segment in enumerate(item.get("transcripts", [])):
+            speaker = segment.get("speaker")
+
+            segments["meeting_id"].append(meeting_id)
+            segments["item_key"].append(item_key)
+            segments["segment_index"].append(segment_index)
+            segments["speaker"].append(None if speaker is None else str(speaker))
+            segments["text"].append(segment.get("text", "").strip())
+            segment_count += 1
+
+    duration = meeting_data.get("VideoDuration")
+
+    meetings["meeting_id"].append(meeting_id)
+    meetings["city"].append(meeting_id.split("_")[0])
+    meetings["video_duration_sec"].append(None if duration is None else float(duration))
+    meetings["item_count"].append(len(item_info))
+    meetings["segment_count"].append(segment_count)
+
+def build_cache(source: Path = MEETINGBANK_JSON_PATH) -> None:
+    """
+    Converts MeetingBank JSON into the two Arrow IPC cache files in one streaming pass.
+    """
+    info = _source_info(source)
+    temp_meetings = MEETINGS_CACHE_PATH.with_suffix(".tmp")
+    temp_segments = SEGMENTS_CACHE_PATH.with_suffix(".tmp")
+
+    print(f"Building Arrow cache from {source.name}...")
+
+    # Invalidate first so a failed build never leaves a cache marked as fresh
+    CACHE_INFO_PATH.unlink(missing_ok=True)
+
+    with pa.ipc.new_file(str(temp_meetings), MEETING_SCHEMA) as meeting_writer, \
+         pa.ipc.new_file(str(temp_segments), SEGMENT_SCHEMA) as segment_writer:
+
+        def empty_columns(schema: pa.Schema) -> Dict[str, list]:
+            return {name: [] for name in schema.names}
+
+        def flush(meetings: Dict[str, list], segments: Dict[str, list]) -> None:
+            meeting_writer.write_table(pa.table(meetings, schema=MEETING_SCHEMA))
+            segment_writer.write_table(pa.table(segments, schema=SEGMENT_SCHEMA))
+
+        meetings = empty_columns(MEETING_SCHEMA)
+        segments = empty_columns(SEGMENT_SCHEMA)
+
+        for meeting_id, meeting_data in iter_meetings(source):
+            _flatten_meeting(meeting_id, meeting_data, meetings, segments)
+
+            # Flushing in batches keeps memory flat while the cache is built
+            if len(meetings["meeting_id"]) >= CACHE_BATCH_MEETINGS:
+                flush(meetings, segments)
+                meetings = empty_columns(MEETING_SCHEMA)
+                segments = empty_columns(SEGMENT_SCHEMA)
+
+        flush(meetings, segments)
+
+    temp_meetings.replace(MEETINGS_CACHE_PATH)
+    temp_segments.replace(SEGMENTS_CACHE_PATH)
+
+    # Written last: the cache only counts as fresh once both files are in place
+    with open(CACHE_INFO_PATH, "w", encoding="utf-8") as f:
+        json.dump(info, f)
+
+    print(f"Cache saved at: {MEETINGS_CACHE_PATH} and {SEGMENTS_CACHE_PATH}")
+
+def _read_mapped(path: Path) -> pa.Table:
+    # Zero-copy: the table's buffers point straight into the mapped file
+    return pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+
+def open_cache(source: Path = MEETINGBANK_JSON_PATH) -> Optional[Tuple[pa.Table, pa.Table]]:
+    """
+    Returns the memory-mapped (meetings, segments) tables, or None when the cache is stale.
+    """
+    if not cache_is_fresh(source):
+        return None
+    return _read_mapped(MEETINGS_CACHE_PATH), _read_mapped(SEGMENTS_CACHE_PATH)
+
+def _duration(value: Optional[float]) -> Optional[float]:
+    # Durations are stored as float64; whole seconds go back to int like in the JSON
+    return int(value) if value is not None and value.is_integer() else value
+
+def cached_summary_rows(cities: Optional[Iterable[str]] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    step1 summary rows read from the cache (None when the cache is stale).
+    """
+    cache = open_cache()
+    if cache is None:
+        return None
+
+    meetings = cache[0]
+    if cities is not None:
+        meetings = meetings.filter(pc.is_in(meetings["city"], value_set=pa.array(list(cities), pa.string())))
+
+    rows = meetings.to_pylist()
+    for row in rows:
+        row["video_duration_sec"] = _duration(row["video_duration_sec"])
+    return rows
+
+def _per_meeting_lists(meeting_ids: pa.ChunkedArray, segments: pa.Table, column: str) -> pa.ChunkedArray:
+    """
+    Collects 'column' of the segments into one list per meeting, aligned to meeting_ids
+    (null where a meeting has no segments). Segment order is kept.
+    """
+    grouped = segments.group_by("meeting_id", use_threads=False).aggregate([(column, "list")])
+    positions = pc.index_in(meeting_ids, value_set=grouped["meeting_id"].combine_chunks())
+    return pc.take(grouped[f"{column}_list"], positions)
+
+def cached_transcript_rows(cities: Optional[Iterable[str]] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    step2 transcript rows (meeting_id, city, full_transcript_text, speakers) built
+    column-wise from the cached segments (None when the cache is stale).
+    """
+    cache = open_cache()
+    if cache is None:
+        return None
+
+    meetings, segments = cache
+    # -- Keys without a 'City_Number' format are skipped, like is_target_meeting does on the JSON path
+    meetings = meetings.filter(pc.match_substring(meetings["meeting_id"], "_"))
+    if cities is not None:
+        meetings = meetings.filter(pc.is_in(meetings["city"], value_set=pa.array(list(cities), pa.string())))
+        segments = segments.filter(pc.is_in(segments["meeting_id"], value_set=meetings["meeting_id"].combine_chunks()))
+
+    meeting_ids = meetings["meeting_id"]
+
+    # Same rules as step2: join non-empty texts with a space, count non-null speakers
+    texts = _per_meeting_lists(meeting_ids, segments.filter(pc.greater(pc.utf8_length(segments["text"]), 0)), "text")
+    speakers = _per_meeting_lists(meeting_ids, segments.filter(pc.is_valid(segments["speaker"])), "speaker")
+
+    table = pa.table({
+        "meeting_id": pc.list_element(pc.split_pattern(meeting_ids, "_"), 1),
+        "city": meetings["city"],
+        "full_transcript_text": pc.fill_null(pc.binary_join(texts, " "), ""),
+        "speakers": speakers
+    })
+
+    rows = table.to_pylist()
+    for row in rows:
+        row["speakers"] = row["speakers"] or []
+    return rows
+
+def iter_cached_meetings(source: Path = MEETINGBANK_JSON_PATH, batch_size: int = CACHE_BATCH_MEETINGS):
+    """
+    Yields the cached meeting rows (all cities) batch by batch, or nothing when the
+    cache is stale or was built from another source file.
+    """
+    cache = open_cache(source)
+    if cache is None:
+        return
+
+    for batch in cache[0].to_batches(max_chunksize=batch_size):
+        for row in batch.to_pylist():
+            row["video_duration_sec"] = _duration(row["video_duration_sec"])
+            yield row
+
+
+if __name__ == "__main__":
+    if not MEETINGBANK_JSON_PATH.exists():
+        print(f"Error: Could not find {MEETINGBANK_JSON_PATH}")
+    elif cache_is_fresh():
+        print("Arrow cache is up to date.")
+    else:
+        build_cache()
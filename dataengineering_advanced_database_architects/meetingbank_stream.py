@@ -0,0 +1,254 @@
+# Incremental MeetingBank.json reader
+
+import json
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# The source is scanned as UTF-8 bytes: every structural character is ASCII and
+# never occurs inside a multi-byte sequence, so only kept meetings get decoded.
+# Bytes that change the nesting state outside / inside a JSON string
+_STRUCTURAL = re.compile(rb'[{}\[\]"]')
+_STRING_SPECIAL = re.compile(rb'["\\]')
+_KEY = re.compile(rb'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_SCALAR = re.compile(rb'[^,}\]\s]+')
+_WHITESPACE = b" \t\n\r"
+
+# Bytes read from disk per refill
+CHUNK_SIZE = 1 << 20
+
+# Meetings sent to a worker process per task
+SHARD_SIZE = 64
+
+
+class _Buffer:
+    """
+    Sliding byte window over the source file.
+    Consumed bytes are dropped so at most the current meeting stays in memory.
+    """
+
+    def __init__(self, source, chunk_size: int):
+        self.source = source
+        self.chunk_size = chunk_size
+        self.text = b""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        # Drop everything already consumed before appending the next chunk
+        if self.pos:
+            self.text = self.text[self.pos:]
+            self.pos = 0
+
+        chunk = self.source.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+
+        self.text += chunk
+        return True
+
+    def skip_whitespace(self) -> None:
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text) or not self.fill():
+                return
+
+    def peek(self) -> bytes:
+        self.skip_whitespace()
+        if self.pos >= len(self.text):
+            raise ValueError("Unexpected end of MeetingBank JSON")
+        return self.text[self.pos:self.pos + 1]
+
+    def expect(self, char: bytes) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in MeetingBank JSON, found {found!r}")
+        self.pos += 1
+
+    def read_key(self) -> str:
+        while True:
+            match = _KEY.match(self.text, self.pos)
+            if match:
+                self.pos = match.end()
+                return json.loads(match.group())
+            if not self.fill():
+                raise ValueError("Unterminated key in MeetingBank JSON")
+
+    def read_value(self, discard: bool = False) -> bytes:
+        """
+        Returns the raw JSON bytes of the value starting at the cursor.
+        Containers are scanned for their matching bracket so the decoder
+        only ever sees one complete value.
+        With discard=True the scanned bytes are dropped on every refill instead,
+        so skipping a meeting costs a byte scan and constant memory.
+        """
+        start = self.pos
+        if self.text[start:start + 1] not in (b"{", b"["):
+            return self._read_scalar()
+
+        # Offsets are kept relative to 'start' because fill() may shift the buffer
+        offset = 0
+        depth = 0
+        in_string = False
+
+        while True:
+            scan_from = start + offset
+            if in_string:
+                match = _STRING_SPECIAL.search(self.text, scan_from)
+            else:
+                match = _STRUCTURAL.search(self.text, scan_from)
+
+            if match is None:
+                offset = len(self.text) - start
+                start, offset = self._refill(start, offset, discard)
+                continue
+
+            index = match.start()
+            char = self.text[index:index + 1]
+
+            if in_string:
+                if char == b"\\":
+                    # An escape needs its next byte in the buffer as well
+                    if index + 1 >= len(self.text):
+                        offset = index - start
+                        start, offset = self._refill(start, offset, discard)
+                        continue
+                    offset = index + 2 - start
+                    continue
+                in_string = False
+            elif char == b'"':
+                in_string = True
+            elif char in (b"{", b"["):
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    self.pos = index + 1
+                    return b"" if discard else self.text[start:self.pos]
+
+            offset = index + 1 - start
+
+    def _read_scalar(self) -> bytes:
+        # Strings end at their closing quote, numbers and literals at a delimiter
+        pattern = _KEY if self.text[self.pos:self.pos + 1] == b'"' else _SCALAR
+        while True:
+            match = pattern.match(self.text, self.pos)
+            if match and (match.end() < len(self.text) or self.eof):
+                self.pos = match.end()
+                return match.group()
+            if not self.fill() and not match:
+                raise ValueError("Malformed value in MeetingBank JSON")
+
+    def _refill(self, start: int, offset: int, discard: bool) -> Tuple[int, int]:
+        # Keep the value being scanned (or, when discarding, only its unscanned tail)
+        # and return its new start and scan offset
+        if discard:
+            start, offset = start + offset, 0
+        self.pos = start
+        if not self.fill():
+            raise ValueError("Unterminated value in MeetingBank JSON")
+        return self.pos, offset
+
+
+def iter_meetings(
+    file_path: Path,
+    chunk_size: int = CHUNK_SIZE,
+    raw: bool = False,
+    keep: Optional[Callable[[str], bool]] = None
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Yields (meeting_id, meeting_data) pairs from the top-level MeetingBank object.
+    Only one meeting is held in memory at a time, unlike json.load.
+    With raw=True the meeting is yielded as undecoded UTF-8 JSON bytes.
+    keep(meeting_id) is decided from the key alone; rejected meetings are
+    skipped as raw bytes without being decoded or buffered.
+    """
+    if not file_path.exists():
+        raise FileNotFoundError(f"Source file not found at: {file_path}")
+
+    with open(file_path, "rb") as source:
+        buffer = _Buffer(source, chunk_size)
+        buffer.expect(b"{")
+
+        if buffer.peek() == b"}":
+            return
+
+        while True:
+            buffer.skip_whitespace()
+            meeting_id = buffer.read_key()
+            buffer.expect(b":")
+            buffer.skip_whitespace()
+
+            if keep is None or keep(meeting_id):
+                value = buffer.read_value()
+                yield meeting_id, (value if raw else json.loads(value))
+            else:
+                buffer.read_value(discard=True)
+
+            if buffer.peek() == b"}":
+                return
+            buffer.expect(b",")
+
+
+def _process_shard(func: Callable, shard: List[Tuple[str, bytes]]) -> List[Any]:
+    # Runs inside a worker: decoding happens here so it is parallelised as well
+    return [func(meeting_id, json.loads(raw_meeting)) for meeting_id, raw_meeting in shard]
+
+
+def map_meetings(
+    func: Callable[[str, Dict[str, Any]], Any],
+    file_path: Path,
+    keep: Optional[Callable[[str], bool]] = None,
+    workers: int = 1,
+    shard_size: int = SHARD_SIZE,
+    select: Optional[Callable[[str, bytes], bool]] = None,
+) -> Iterator[Any]:
+    """
+    Applies func(meeting_id, meeting_data) to every kept meeting and yields the results
+    in file order. With workers > 1 meetings are sharded across a process pool;
+    func must then be a module-level (picklable) function.
+    workers=0 uses every available core.
+    keep(meeting_id) filters on the key (rejected meetings are skipped unparsed),
+    select(meeting_id, raw_json) on the undecoded meeting bytes; both run in this
+    process and rejected meetings are never decoded.
+    """
+    if workers == 0:
+        workers = os.cpu_count() or 1
+
+    def selected() -> Iterator[Tuple[str, bytes]]:
+        for meeting_id, raw_meeting in iter_meetings(file_path, raw=True, keep=keep):
+            if select is not None and not select(meeting_id, raw_meeting):
+                continue
+            yield meeting_id, raw_meeting
+
+    if workers <= 1:
+        for meeting_id, raw_meeting in selected():
+            yield func(meeting_id, json.loads(raw_meeting))
+        return
+
+    def shards() -> Iterator[List[Tuple[str, bytes]]]:
+        shard = []
+        for meeting in selected():
+            shard.append(meeting)
+            if len(shard) >= shard_size:
+                yield shard
+                shard = []
+        if shard:
+            yield shard
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # A bounded window of in-flight shards keeps memory flat while the
+        # FIFO order of the window keeps the output deterministic
+        pending = deque()
+        for shard in shards():
+            pending.append(executor.submit(_process_shard, func, shard))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+
+        while pending:
+            yield from pending.popleft().result()
@@ -0,0 +1,135 @@
+# Partitioned Parquet datasets for the Processed_Data outputs
+
+import shutil
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+# Datasets are Hive-partitioned on city: Processed_Data/<name>.parquet/city=<City>/part-0.parquet
+PARTITION_COLUMN = "city"
+
+# Row-group sizing: small enough for useful min/max statistics, large enough for efficient scans
+ROW_GROUP_SIZE = 64_000
+MIN_ROW_GROUP_SIZE = 8_000
+
+# Codec for every column unless overridden below
+DEFAULT_COMPRESSION = "snappy"
+
+# Long free-text columns compress far better with zstd
+COLUMN_COMPRESSION = {
+    "full_transcript_text": "zstd",
+    "text": "zstd",
+}
+
+def _partitioning() -> ds.Partitioning:
+    return ds.partitioning(pa.schema([(PARTITION_COLUMN, pa.string())]), flavor="hive")
+
+def write_partitioned(
+    df: pd.DataFrame,
+    path: Path,
+    compression: str = DEFAULT_COMPRESSION,
+    column_compression: Optional[Dict[str, str]] = None,
+    row_group_size: int = ROW_GROUP_SIZE
+) -> None:
+    """
+    Writes df as a city-partitioned Parquet dataset, replacing whatever is at path.
+    Every column gets 'compression' unless column_compression names another codec.
+    """
+    # The partition key must be a plain string (categoricals come back from read_partitioned)
+    df = df.assign(**{PARTITION_COLUMN: df[PARTITION_COLUMN].astype(str)})
+    write_table_partitioned(
+        pa.Table.from_pandas(df, preserve_index=False),
+        path,
+        compression=compression,
+        column_compression=column_compression,
+        row_group_size=row_group_size
+    )
+
+def write_table_partitioned(
+    table: pa.Table,
+    path: Path,
+    compression: str = DEFAULT_COMPRESSION,
+    column_compression: Optional[Dict[str, str]] = None,
+    row_group_size: int = ROW_GROUP_SIZE
+) -> None:
+    """
+    Arrow-table variant of write_partitioned; dictionary-encoded columns keep
+    their encoding in the files. The dataset is written to a sibling directory
+    and renamed into place, so a failed write leaves the previous dataset intact.
+    """
+    temp_path = path.with_name(f"{path.name}.tmp")
+    old_path = path.with_name(f"{path.name}.old")
+    for leftover in (temp_path, old_path):
+        _remove(leftover)
+
+    # A codec dict leaves unlisted columns uncompressed, so list every column
+    overrides = COLUMN_COMPRESSION if column_compression is None else column_compression
+    codecs = {name: overrides.get(name, compression) for name in table.column_names}
+
+    file_format = ds.ParquetFileFormat()
+    file_options = file_format.make_write_options(
+        compression=codecs,
+        use_dictionary=True,
+        write_statistics=True
+    )
+
+    ds.write_dataset(
+        table,
+        temp_path,
+        format=file_format,
+        file_options=file_options,
+        partitioning=_partitioning(),
+        basename_template="part-{i}.parquet",
+        max_rows_per_group=row_group_size,
+        min_rows_per_group=min(MIN_ROW_GROUP_SIZE, row_group_size),
+        preserve_order=True
+    )
+
+    # -- Older runs wrote a single flat file at the same path; either way the old
+    # -- dataset is moved aside first and only deleted once the new one is in place
+    if path.exists():
+        path.replace(old_path)
+    temp_path.replace(path)
+    _remove(old_path)
+
+def _remove(path: Path) -> None:
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+def open_dataset(path: Path) -> ds.Dataset:
+    """
+    Opens a partitioned dataset (or a legacy single file) with city dictionary-encoded.
+    """
+    return ds.dataset(
+        path,
+        format="parquet",
+        partitioning=ds.HivePartitioning.discover(infer_dictionary=True)
+    )
+
+def read_partitioned(
+    path: Path,
+    columns: Optional[List[str]] = None,
+    cities: Optional[Iterable[str]] = None,
+    filter: Optional[ds.Expression] = None
+) -> pd.DataFrame:
+    """
+    Reads a dataset into pandas with column pruning, partition pruning on cities
+    and predicate pushdown for filter. Rows come back ordered by pk_id.
+    """
+    dataset = open_dataset(path)
+
+    expression = filter
+    if cities is not None:
+        city_filter = ds.field(PARTITION_COLUMN).isin(list(cities))
+        expression = city_filter if expression is None else expression & city_filter
+
+    df = dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+    # Partitions are read city by city, so restore the original key order
+    if "pk_id" in df.columns:
+        df = df.sort_values("pk_id", kind="stable").reset_index(drop=True)
+    return df
@@ -0,0 +1,209 @@
+# Repeated, percentile-based timing of SQL query variants (MySQL or DuckDB)
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+# Loading variables from env file
+load_dotenv()
+
+# Pathlib configuration
+BASE_DIR = Path(__file__).resolve().parent
+RESULTS_PATH = BASE_DIR / "Processed_Data" / "benchmarks" / "query_benchmark.json"
+
+# Untimed runs before the warm measurements, timed warm runs, and runs on a fresh session
+BENCHMARK_WARMUP = int(os.getenv("BENCHMARK_WARMUP", "3"))
+BENCHMARK_REPETITIONS = int(os.getenv("BENCHMARK_REPETITIONS", "20"))
+BENCHMARK_COLD_RUNS = int(os.getenv("BENCHMARK_COLD_RUNS", "3"))
+
+PERCENTILES = (50, 95, 99)
+
+# Timed parts of one execution:
+# -- server: until the first result is available (rows are streamed, not buffered, on MySQL)
+# -- fetch:  transferring the rows to the client
+# -- frame:  building the DataFrame the step4 functions return
+COMPONENTS = ("server", "fetch", "frame", "total")
+
+@contextmanager
+def _session(backend: str, engine=None, fresh: bool = False):
+    """
+    A connection to run queries on. fresh=True starts a new session (the MySQL pool is
+    disposed first, DuckDB gets a new in-memory database). Server buffer pools and OS
+    page caches cannot be flushed from a client, so "cold" means a cold session, not a cold disk.
+    """
+    if backend == "duckdb":
+        from duckdb_backend import get_duckdb, register_views
+
+        if fresh:
+            import duckdb
+
+            conn = duckdb.connect(":memory:")
+            register_views(conn)
+            try:
+                yield conn
+            finally:
+                conn.close()
+        else:
+            yield get_duckdb().cursor()
+        return
+
+    if fresh:
+        # -- Closes the pooled connections, so the next connect() opens a new server session
+        engine.dispose()
+    with engine.connect() as conn:
+        yield conn
+
+def time_execution(conn, query: str, backend: str) -> Dict[str, float]:
+    """
+    Runs query once and returns the seconds spent in each of COMPONENTS plus the row count.
+    """
+    start = time.perf_counter()
+    if backend == "duckdb":
+        cursor = conn.execute(query)
+        columns = [column[0] for column in cursor.description]
+    else:
+        cursor = conn.execution_options(stream_results=True).execute(text(query))
+        columns = list(cursor.keys())
+    executed = time.perf_counter()
+
+    rows = cursor.fetchall()
+    fetched = time.perf_counter()
+
+    pd.DataFrame(rows, columns=columns)
+    built = time.perf_counter()
+
+    return {
+        "server": executed - start,
+        "fetch": fetched - executed,
+        "frame": built - fetched,
+        "total": built - start,
+        "rows": len(rows)
+    }
+
+def summarize(samples: List[Dict[str, float]]) -> Dict[str, Any]:
+    """
+    p50/p95/p99, mean, stdev, min and max (milliseconds) of every component.
+    """
+    summary: Dict[str, Any] = {"runs": len(samples)}
+    if not samples:
+        return summary
+
+    for component in COMPONENTS:
+        values = np.array([sample[component] for sample in samples]) * 1000
+        stats = {f"p{p}": float(np.percentile(values, p)) for p in PERCENTILES}
+        stats.update({
+            "mean": float(values.mean()),
+            "stdev": float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+            "min": float(values.min()),
+            "max": float(values.max())
+        })
+        summary[f"{component}_ms"] = stats
+    summary["rows"] = samples[-1]["rows"]
+    return summary
+
+def benchmark_queries(
+    variants: Dict[str, str],
+    backend: str = "mysql",
+    engine=None,
+    warmup: int = BENCHMARK_WARMUP,
+    repetitions: int = BENCHMARK_REPETITIONS,
+    cold_runs: int = BENCHMARK_COLD_RUNS
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Times named query variants. Cold runs each use a fresh session. Warm runs share
+    one session after warmup untimed runs per variant and are interleaved round-robin,
+    so drift on the server or network hits every variant alike.
+    Returns {variant: {"cold": summary, "warm": summary}}.
+    """
+    cold: Dict[str, List[Dict[str, float]]] = {name: [] for name in variants}
+    warm: Dict[str, List[Dict[str, float]]] = {name: [] for name in variants}
+
+    for name, query in variants.items():
+        for _ in range(cold_runs):
+            with _session(backend, engine, fresh=True) as conn:
+                cold[name].append(time_execution(conn, query, backend))
+
+    with _session(backend, engine) as conn:
+        for name, query in variants.items():
+            for _ in range(warmup):
+                time_execution(conn, query, backend)
+
+        for _ in range(repetitions):
+            for name, query in variants.items():
+                warm[name].append(time_execution(conn, query, backend))
+
+    return {name: {"cold": summarize(cold[name]), "warm": summarize(warm[name])} for name in variants}
+
+def format_summary(name: str, result: Dict[str, Any]) -> str:
+    warm = result["warm"]
+    if not warm.get("runs"):
+        return f"{name}: no warm runs"
+    total, server, fetch = warm["total_ms"], warm["server_ms"], warm["fetch_ms"]
+    line = (f"{name}: p50 {total['p50']:.2f} ms | p95 {total['p95']:.2f} ms | p99 {total['p99']:.2f} ms "
+            f"(server {server['p50']:.2f} ms + fetch {fetch['p50']:.2f} ms, {warm['runs']} warm runs)")
+    if result["cold"].get("runs"):
+        line += f" | cold p50 {result['cold']['total_ms']['p50']:.2f} ms"
+    return line
+
+def print_report(results: Dict[str, Dict[str, Any]]) -> None:
+    print("--- Query benchmark (warm p50/p95/p99, server vs fetch) ---")
+    for name, result in results.items():
+        print(f"  {format_summary(name, result)}")
+
+def load_runs(path: Path = RESULTS_PATH) -> List[Dict[str, Any]]:
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("runs", [])
+
+def save_results(
+    results: Dict[str, Dict[str, Any]],
+    backend: str,
+    label: Optional[str] = None,
+    path: Path = RESULTS_PATH,
+    settings: Optional[Dict[str, int]] = None
+) -> Path:
+    """
+    Appends this run to the JSON history at path, so runs can be compared over time.
+    settings records the warmup / repetitions / cold_runs used (module defaults when None).
+    """
+    runs = load_runs(path)
+    runs.append({
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "label": label,
+        "backend": backend,
+        "settings": settings or {"warmup": BENCHMARK_WARMUP, "repetitions": BENCHMARK_REPETITIONS,
+                                 "cold_runs": BENCHMARK_COLD_RUNS},
+        "results": results
+    })
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"runs": runs}, f, indent=2)
+    return path
+
+def compare_with_previous(results: Dict[str, Dict[str, Any]], backend: str, path: Path = RESULTS_PATH) -> None:
+    """
+    Prints the warm p50/p95 of every variant against the last saved run on the same backend.
+    """
+    previous = next((run for run in reversed(load_runs(path)) if run["backend"] == backend), None)
+    if previous is None:
+        print("No earlier benchmark run to compare with.")
+        return
+
+    print(f"--- Compared with the run of {previous['created']} ---")
+    for name, result in results.items():
+        before = previous["results"].get(name, {}).get("warm", {}).get("total_ms")
+        after = result["warm"].get("total_ms")
+        if not before or not after:
+            print(f"  {name}: not in the previous run")
+            continue
+        print(f"  {name}: p50 {before['p50']:.2f} -> {after['p50']:.2f} ms ({after['p50'] / max(before['p50'], 1e-9):.2f}x), "
+              f"p95 {before['p95']:.2f} -> {after['p95']:.2f} ms")
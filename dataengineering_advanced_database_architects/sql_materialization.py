@@ -0,0 +1,87 @@
+# Server-side materialization of denormalized_table (no rows leave the database)
+
+from sqlalchemy import inspect, text
+
+DENORMALIZED_TABLE = "denormalized_table"
+
+DENORMALIZED_COLUMNS = "metric_id, city_id, city, pk_id, meeting_id, video_duration_sec, item_count, segment_count"
+
+# Same columns and primary key as the table step4 used to upload from pandas
+CREATE_STATEMENT = """
+CREATE TABLE {table} (
+    metric_id BIGINT PRIMARY KEY,
+    city_id BIGINT,
+    city VARCHAR(255),
+    pk_id BIGINT,
+    meeting_id VARCHAR(255),
+    video_duration_sec BIGINT,
+    item_count BIGINT,
+    segment_count BIGINT
+)
+"""
+
+# The three-way join, evaluated on the server
+SOURCE_QUERY = """
+SELECT
+    mm.metric_id, c.city_id, c.city, m.pk_id, m.meeting_id,
+    mm.video_duration_sec, mm.item_count, mm.segment_count
+FROM cities c
+JOIN meetings m ON c.city_id = m.city_id
+JOIN meeting_metrics mm ON m.pk_id = mm.pk_id
+"""
+
+def rebuild_denormalized(engine) -> int:
+    """
+    Builds a fresh copy next to the live table with CREATE TABLE + INSERT ... SELECT,
+    then swaps it in with one atomic RENAME TABLE, so readers never see a missing or
+    half-filled table. Returns the number of rows.
+    """
+    new_table = f"{DENORMALIZED_TABLE}_new"
+    old_table = f"{DENORMALIZED_TABLE}_old"
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {new_table}"))
+        conn.execute(text(f"DROP TABLE IF EXISTS {old_table}"))
+        conn.execute(text(CREATE_STATEMENT.format(table=new_table)))
+
+    with engine.begin() as conn:
+        rows = conn.execute(text(f"INSERT INTO {new_table} ({DENORMALIZED_COLUMNS}) {SOURCE_QUERY}")).rowcount
+
+    with engine.begin() as conn:
+        if inspect(conn).has_table(DENORMALIZED_TABLE):
+            conn.execute(text(
+                f"RENAME TABLE {DENORMALIZED_TABLE} TO {old_table}, {new_table} TO {DENORMALIZED_TABLE}"
+            ))
+            conn.execute(text(f"DROP TABLE {old_table}"))
+        else:
+            conn.execute(text(f"RENAME TABLE {new_table} TO {DENORMALIZED_TABLE}"))
+    return rows
+
+def refresh_denormalized(engine) -> int:
+    """
+    Inserts only the metric_ids that are not in the table yet, in one INSERT ... SELECT.
+    Returns the number of rows added.
+    """
+    # -- Anti-join on the primary key: existing rows are never rewritten
+    merge_sql = f"""
+    INSERT INTO {DENORMALIZED_TABLE} ({DENORMALIZED_COLUMNS})
+    SELECT src.* FROM ({SOURCE_QUERY}) src
+    LEFT JOIN {DENORMALIZED_TABLE} d ON d.metric_id = src.metric_id
+    WHERE d.metric_id IS NULL
+    """
+    with engine.begin() as conn:
+        return conn.execute(text(merge_sql)).rowcount
+
+def materialize_denormalized(engine, full_refresh: bool = False) -> None:
+    """
+    Refreshes denormalized_table incrementally, or rebuilds and swaps it when
+    full_refresh is set or the table does not exist yet.
+    """
+    if full_refresh or not inspect(engine).has_table(DENORMALIZED_TABLE):
+        print("Rebuilding denormalized_table on the server...")
+        rows = rebuild_denormalized(engine)
+        print(f"Swapped in denormalized_table with {rows} rows.")
+    else:
+        print("Merging new metric_ids into denormalized_table on the server...")
+        rows = refresh_denormalized(engine)
+        print(f"Added {rows} rows to denormalized_table.")
@@ -0,0 +1,366 @@
+# Step 1 + 2: Single-pass extraction of meeting summaries and transcripts
+
+import argparse
+import hashlib
+import json
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from functools import partial
+from pathlib import Path
+from typing import List, Dict, Any, Tuple, Optional, Set
+
+from meetingbank_stream import map_meetings, SHARD_SIZE
+from parquet_io import write_partitioned, write_table_partitioned, read_partitioned, open_dataset, DEFAULT_COMPRESSION, COLUMN_COMPRESSION, ROW_GROUP_SIZE
+from step1_process_metadata import summarize_meeting, build_summary_frame
+from step2_process_transcripts import extract_transcript, extract_segments, build_transcript_frame, transcript_rows_to_frame, build_segment_table, is_target_meeting
+
+# Pathlib configuration
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = BASE_DIR / "Data"
+OUTPUT_DIR = BASE_DIR / "Processed_Data"
+
+# Creating output directory if it does not exist
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+# File Paths
+MEETINGBANK_JSON_PATH = DATA_DIR / "MeetingBank.json"
+SUMMARY_PARQUET_PATH = OUTPUT_DIR / "meeting_summary.parquet"
+TRANSCRIPT_PARQUET_PATH = OUTPUT_DIR / "meeting_transcripts.parquet"
+SEGMENT_PARQUET_PATH = OUTPUT_DIR / "meeting_segments.parquet"
+MANIFEST_PATH = OUTPUT_DIR / "extraction_manifest.json"
+
+# Columns refreshed in place when a known meeting changes
+SUMMARY_VALUE_COLS = ['video_duration_sec', 'item_count', 'segment_count']
+TRANSCRIPT_VALUE_COLS = ['transcript_word_count', 'speaker_count', 'full_transcript_text']
+
+# --- Manifest helpers ---
+def meeting_hash(raw_meeting: bytes) -> str:
+    """
+    Content hash of a meeting's raw JSON bytes.
+    """
+    return hashlib.blake2b(raw_meeting, digest_size=16).hexdigest()
+
+def meeting_key(meeting_id: str) -> str:
+    """
+    Normalises 'City_Number[_...]' to the 'City_Number' pair stored in the Parquet files.
+    """
+    return "_".join(meeting_id.split("_")[:2])
+
+def load_manifest(section: str = "meetings") -> Dict[str, str]:
+    """
+    Returns the meeting_id -> content hash map of the previous run (empty if none).
+    section "meetings" covers the summary and transcript files, "segments" the
+    hashes the segment dataset was last extracted from.
+    """
+    if not MANIFEST_PATH.exists():
+        return {}
+
+    with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+        return json.load(f).get(section, {})
+
+def save_manifest(hashes: Dict[str, str], segment_hashes: Dict[str, str]) -> None:
+    # Written via a temp file so an interrupted run never leaves a half-written manifest
+    temp_path = MANIFEST_PATH.with_suffix(".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"source": MEETINGBANK_JSON_PATH.name, "meetings": hashes, "segments": segment_hashes}, f)
+    temp_path.replace(MANIFEST_PATH)
+
+def extract_meeting_rows(meeting_id: str, meeting_data: Dict[str, Any], include_segments: bool = False) -> Tuple[Dict[str, Any], Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Builds the summary, transcript and (optionally) segment rows from the same parsed meeting.
+    """
+    segments = extract_segments(meeting_id, meeting_data) if include_segments else None
+    return summarize_meeting(meeting_id, meeting_data), extract_transcript(meeting_id, meeting_data), segments
+
+def extract_meetings(
+    workers: int = 1,
+    chunk_size: int = SHARD_SIZE,
+    manifest: Optional[Dict[str, str]] = None,
+    include_segments: bool = False,
+    segment_manifest: Optional[Dict[str, str]] = None
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]], Dict[str, str]]:
+    """
+    Walks MeetingBank JSON once and builds the summary, transcript and segment rows.
+    Returns (summary_rows, transcript_rows, segment_rows, hashes); rows share one
+    meeting order and segment_rows is empty unless include_segments is set.
+    When a manifest is given, meetings whose content hash is unchanged are skipped
+    without being decoded; with include_segments, a meeting is also re-extracted when
+    segment_manifest holds an older hash for it. hashes always covers every target
+    meeting in the source.
+    """
+    if not MEETINGBANK_JSON_PATH.exists():
+        raise FileNotFoundError(f"Source file not found at: {MEETINGBANK_JSON_PATH}")
+
+    manifest = manifest or {}
+    segment_manifest = segment_manifest or {}
+    hashes = {}
+    summary_rows = []
+    transcript_rows = []
+    segment_rows = []
+
+    def is_new_or_changed(meeting_id: str, raw_meeting: bytes) -> bool:
+        digest = meeting_hash(raw_meeting)
+        hashes[meeting_id] = digest
+        return manifest.get(meeting_id) != digest or (include_segments and segment_manifest.get(meeting_id) != digest)
+
+    print(f"Streaming meetings from {MEETINGBANK_JSON_PATH.name}...")
+
+    for summary_row, transcript_row, segment_row in map_meetings(
+        partial(extract_meeting_rows, include_segments=include_segments),
+        MEETINGBANK_JSON_PATH,
+        keep=is_target_meeting,
+        workers=workers,
+        shard_size=chunk_size,
+        select=is_new_or_changed
+    ):
+        summary_rows.append(summary_row)
+        transcript_rows.append(transcript_row)
+        if include_segments:
+            segment_rows.append(segment_row)
+
+    return summary_rows, transcript_rows, segment_rows, hashes
+
+def _upsert_rows(existing: pd.DataFrame, changed: pd.DataFrame, value_cols: List[str], removed_keys: Set[str]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Drops removed meetings and refreshes value_cols of changed ones in place.
+    Returns (merged existing rows, changed rows that are new meetings).
+    Both frames carry a temporary 'meeting_key' column.
+    """
+    existing = existing.copy()
+    existing['meeting_key'] = existing['city'].astype(str) + "_" + existing['meeting_id'].astype(str)
+    existing = existing[~existing['meeting_key'].isin(removed_keys)]
+
+    updates = changed.set_index('meeting_key')
+    is_update = existing['meeting_key'].isin(updates.index)
+    for col in value_cols:
+        existing.loc[is_update, col] = existing.loc[is_update, 'meeting_key'].map(updates[col]).values
+
+    added = changed[~changed['meeting_key'].isin(existing['meeting_key'])]
+    return existing, added
+
+def _drop_removed(existing: pd.DataFrame, removed_keys: Set[str]) -> pd.DataFrame:
+    # Runs that only removed meetings have no changed rows to build a frame from
+    keys = existing['city'].astype(str) + "_" + existing['meeting_id'].astype(str)
+    return existing[~keys.isin(removed_keys)].reset_index(drop=True)
+
+def merge_summary(existing: pd.DataFrame, summary_rows: List[Dict[str, Any]], removed_keys: Set[str]) -> pd.DataFrame:
+    """
+    Merges new/changed summary rows into the existing meeting_summary table.
+    Existing meetings keep their pk_id, city_id and metric_id; new meetings get
+    IDs above the previous maximum so step3 delta loading still works.
+    """
+    if not summary_rows:
+        return _drop_removed(existing, removed_keys)
+
+    changed = pd.DataFrame(summary_rows)
+    changed['meeting_key'] = changed['meeting_id'].map(meeting_key)
+    changed['meeting_id'] = changed['meeting_key'].str.split('_').str[1].astype(str)
+
+    # Maxima are taken before removals so IDs are never reused
+    next_pk = int(existing['pk_id'].max()) + 1 if len(existing) else 1
+    next_metric = int(existing['metric_id'].max()) + 1 if len(existing) else 1
+    city_ids = dict(zip(existing['city'], existing['city_id']))
+
+    merged, added = _upsert_rows(existing, changed, SUMMARY_VALUE_COLS, removed_keys)
+    added = added.copy()
+
+    # -- Primary / Metric keys continue from the previous maximum
+    added['pk_id'] = range(next_pk, next_pk + len(added))
+    added['metric_id'] = range(next_metric, next_metric + len(added))
+
+    # -- Known cities keep their ID, new cities are numbered after the existing ones
+    next_city = max(city_ids.values(), default=0) + 1
+    for city in pd.unique(added['city']):
+        if city not in city_ids:
+            city_ids[city] = next_city
+            next_city += 1
+    added['city_id'] = added['city'].map(city_ids)
+
+    merged = pd.concat([merged, added], ignore_index=True)
+    return merged[list(existing.columns)]
+
+def merge_transcripts(existing: pd.DataFrame, transcript_rows: List[Dict[str, Any]], removed_keys: Set[str], df_summary: pd.DataFrame) -> pd.DataFrame:
+    """
+    Merges new/changed transcript rows into the existing meeting_transcripts table.
+    pk_id is taken from the merged summary so both files stay aligned.
+    """
+    if not transcript_rows:
+        return _drop_removed(existing, removed_keys)
+
+    changed = transcript_rows_to_frame(transcript_rows)
+    changed['meeting_id'] = changed['meeting_id'].astype(str)
+    changed['meeting_key'] = changed['city'] + "_" + changed['meeting_id']
+
+    merged, added = _upsert_rows(existing, changed, TRANSCRIPT_VALUE_COLS, removed_keys)
+    added = added.copy()
+
+    summary_keys = df_summary['city'].astype(str) + "_" + df_summary['meeting_id'].astype(str)
+    added['pk_id'] = added['meeting_key'].map(dict(zip(summary_keys, df_summary['pk_id'])))
+
+    merged = pd.concat([merged, added], ignore_index=True)
+    return merged[list(existing.columns)]
+
+def reuse_ids(existing: pd.DataFrame, summary_rows: List[Dict[str, Any]], transcript_rows: List[Dict[str, Any]]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Builds both tables from a full extraction while keeping the IDs of the existing
+    summary: known meetings and cities keep theirs, new ones continue from the maxima
+    and meetings missing from the source are dropped. Renumbering from 1 would attach
+    rows step3 already loaded to other meetings and cities.
+    """
+    keys = existing['city'].astype(str) + "_" + existing['meeting_id'].astype(str)
+    extracted_keys = {meeting_key(row['meeting_id']) for row in summary_rows}
+    df_summary = merge_summary(existing, summary_rows, set(keys) - extracted_keys)
+
+    summary_keys = df_summary['city'].astype(str) + "_" + df_summary['meeting_id'].astype(str)
+    df_transcripts = build_transcript_frame(transcript_rows)
+    df_transcripts['pk_id'] = (df_transcripts['city'] + "_" + df_transcripts['meeting_id']).map(
+        dict(zip(summary_keys, df_summary['pk_id']))
+    )
+    df_summary = df_summary.sort_values('pk_id').reset_index(drop=True)
+    return df_summary, df_transcripts.sort_values('pk_id').reset_index(drop=True)
+
+def segment_pk_ids(segment_rows: List[Dict[str, Any]], df_summary: pd.DataFrame) -> List[int]:
+    """
+    Looks up the meeting_summary pk_id of every extracted segment block.
+    """
+    summary_keys = df_summary['city'].astype(str) + "_" + df_summary['meeting_id'].astype(str)
+    pk_lookup = dict(zip(summary_keys, df_summary['pk_id']))
+    return [int(pk_lookup[f"{row['city']}_{row['meeting_id']}"]) for row in segment_rows]
+
+def merge_segments(existing: pa.Table, segment_rows: List[Dict[str, Any]], removed_keys: Set[str], df_summary: pd.DataFrame) -> pa.Table:
+    """
+    Replaces the segments of new/changed/removed meetings in the existing segment table.
+    """
+    changed = build_segment_table(segment_rows, segment_pk_ids(segment_rows, df_summary))
+    stale_keys = removed_keys | {f"{row['city']}_{row['meeting_id']}" for row in segment_rows}
+
+    # The partition column comes back dictionary-encoded, so compare on plain strings
+    existing_keys = pc.binary_join_element_wise(
+        existing['city'].cast(pa.string()),
+        existing['meeting_id'].cast(pa.string()),
+        "_"
+    )
+    keep = pc.invert(pc.is_in(existing_keys, value_set=pa.array(sorted(stale_keys), pa.string())))
+    kept = existing.filter(keep).select(changed.column_names).cast(changed.schema)
+
+    return pa.concat_tables([kept, changed]).sort_by([("pk_id", "ascending")])
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Extract meeting summaries and transcripts in one pass.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes for extraction (0 = all cores, 1 = serial)")
+    parser.add_argument("--chunk-size", type=int, default=SHARD_SIZE,
+                        help="Meetings sent to a worker per task")
+    parser.add_argument("--full-refresh", action="store_true",
+                        help="Ignore the manifest and re-extract every meeting")
+    parser.add_argument("--compression", default=DEFAULT_COMPRESSION,
+                        help="Parquet codec for all columns (snappy, zstd, gzip, lz4, none)")
+    parser.add_argument("--text-compression", default=COLUMN_COMPRESSION["full_transcript_text"],
+                        help="Parquet codec for full_transcript_text")
+    parser.add_argument("--row-group-size", type=int, default=ROW_GROUP_SIZE,
+                        help="Maximum rows per Parquet row group")
+    parser.add_argument("--segments", action="store_true",
+                        help="Also write the segment-level meeting_segments dataset")
+    return parser.parse_args()
+
+def write_outputs(df_summary: pd.DataFrame, df_transcripts: pd.DataFrame, args: argparse.Namespace) -> None:
+    """
+    Writes both tables as city-partitioned datasets with the configured codecs.
+    """
+    write_partitioned(
+        df_summary,
+        SUMMARY_PARQUET_PATH,
+        compression=args.compression,
+        row_group_size=args.row_group_size
+    )
+    write_partitioned(
+        df_transcripts,
+        TRANSCRIPT_PARQUET_PATH,
+        compression=args.compression,
+        column_compression={"full_transcript_text": args.text_compression},
+        row_group_size=args.row_group_size
+    )
+
+def write_segments(table: pa.Table, args: argparse.Namespace) -> None:
+    write_table_partitioned(
+        table,
+        SEGMENT_PARQUET_PATH,
+        compression=args.compression,
+        column_compression={"text": args.text_compression},
+        row_group_size=args.row_group_size
+    )
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    # Incremental mode needs the previous outputs as well as the manifest
+    incremental = (
+        not args.full_refresh
+        and MANIFEST_PATH.exists()
+        and SUMMARY_PARQUET_PATH.exists()
+        and TRANSCRIPT_PARQUET_PATH.exists()
+        and (SEGMENT_PARQUET_PATH.exists() or not args.segments)
+    )
+    manifest = load_manifest() if incremental else {}
+
+    # -- Runs without --segments leave the segment dataset as it is, so it keeps its own
+    # -- hashes; a later --segments run re-extracts every meeting whose hash moved on since
+    segment_manifest = load_manifest("segments")
+
+    summary_rows, transcript_rows, segment_rows, hashes = extract_meetings(
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        manifest=manifest,
+        include_segments=args.segments,
+        segment_manifest=segment_manifest if incremental else None
+    )
+    removed_keys = {meeting_key(meeting_id) for meeting_id in manifest.keys() - hashes.keys()}
+    removed_segment_keys = {meeting_key(meeting_id) for meeting_id in segment_manifest.keys() - hashes.keys()}
+    segment_hashes = hashes if args.segments else segment_manifest
+
+    print(f"Total meetings filtered: {len(hashes)}")
+    if incremental:
+        print(f"New or changed: {len(summary_rows)}, removed: {len(removed_keys)}")
+
+    if incremental and not summary_rows and not removed_keys and not (args.segments and removed_segment_keys):
+        print("Outputs are up to date. Nothing to extract.")
+
+    elif incremental:
+        df_summary = merge_summary(read_partitioned(SUMMARY_PARQUET_PATH), summary_rows, removed_keys)
+        df_transcripts = merge_transcripts(read_partitioned(TRANSCRIPT_PARQUET_PATH), transcript_rows, removed_keys, df_summary)
+
+        write_outputs(df_summary, df_transcripts, args)
+        if args.segments:
+            existing_segments = open_dataset(SEGMENT_PARQUET_PATH).to_table()
+            write_segments(merge_segments(existing_segments, segment_rows, removed_keys | removed_segment_keys, df_summary), args)
+        save_manifest(hashes, segment_hashes)
+
+        print(f"\nFiles successfully updated at: {SUMMARY_PARQUET_PATH} and {TRANSCRIPT_PARQUET_PATH}")
+
+    elif summary_rows:
+        if SUMMARY_PARQUET_PATH.exists():
+            # -- Full extraction over existing outputs (no manifest, --full-refresh, first --segments
+            # -- run): step3 has already loaded their IDs, so known meetings and cities keep them
+            df_summary, df_transcripts = reuse_ids(read_partitioned(SUMMARY_PARQUET_PATH), summary_rows, transcript_rows)
+        else:
+            # pk_id lines up between both files because the rows share one ordering
+            df_summary = build_summary_frame(summary_rows)
+            df_transcripts = build_transcript_frame(transcript_rows)
+
+        write_outputs(df_summary, df_transcripts, args)
+        if args.segments:
+            write_segments(build_segment_table(segment_rows, segment_pk_ids(segment_rows, df_summary)), args)
+            print(f"Segment-level table saved at: {SEGMENT_PARQUET_PATH}")
+        save_manifest(hashes, segment_hashes)
+
+        print("\n--- Summary Preview ---")
+        print(df_summary.head(10).to_string(index=False))
+        print("\n--- Transcript Preview ---")
+        print(df_transcripts[["pk_id", "meeting_id", "transcript_word_count", "speaker_count"]].head(10))
+
+        print(f"\nFiles successfully saved at: {SUMMARY_PARQUET_PATH} and {TRANSCRIPT_PARQUET_PATH}")
+
+    else:
+        print("No data found to process.")
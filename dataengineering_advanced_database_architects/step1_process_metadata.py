@@ -1,10 +1,13 @@
 # Step 1: Process metadata
 
-import json
 import pandas as pd
 from pathlib import Path
 from typing import List, Dict, Any
 
+from parquet_io import write_partitioned
+from meetingbank_stream import iter_meetings
+from meetingbank_cache import cached_summary_rows
+
 # Pathlib configuration
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / "Data"
@@ -20,6 +23,26 @@ OUTPUT_PARQUET_PATH = OUTPUT_DIR / "meeting_summary.parquet"
 # Filter criteria
 TARGET_CITIES = {"LongBeachCC", "SeattleCityCouncil"}
 
+def summarize_meeting(meeting_id: str, meeting_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Builds the metadata summary row for a single meeting.
+    """
+    item_info = meeting_data.get("itemInfo", {})
+    
+    # Calculate total segments across all items in the meeting
+    total_segments = sum(
+        len(item.get("transcripts", [])) 
+        for item in item_info.values()
+    )
+
+    return {
+        "meeting_id": meeting_id,
+        "city": meeting_id.split("_")[0],
+        "video_duration_sec": meeting_data.get("VideoDuration"),
+        "item_count": len(item_info),
+        "segment_count": total_segments
+    }
+
 def read_and_filter_meetingbank() -> List[Dict[str, Any]]:
     """
     Reads MeetingBank JSON and extracts metadata for specific cities.
@@ -28,36 +51,47 @@ def read_and_filter_meetingbank() -> List[Dict[str, Any]]:
         print(f"Error: Could not find {MEETINGBANK_JSON_PATH}")
         return []
 
-    with open(MEETINGBANK_JSON_PATH, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    # A fresh Arrow cache (python meetingbank_cache.py) replaces the JSON parse
+    cached_rows = cached_summary_rows(TARGET_CITIES)
+    if cached_rows is not None:
+        print("Reading meetings from the Arrow cache...")
+        return cached_rows
 
     meetings = []
 
-    for meeting_id, meeting_data in data.items():
-        # Identify the city prefix
-        city = meeting_id.split("_")[0]
-
-        if city not in TARGET_CITIES:
-            continue
+    # Meetings are streamed one at a time; other cities are skipped on the key alone
+    def is_target_city(meeting_id: str) -> bool:
+        return meeting_id.split("_")[0] in TARGET_CITIES
 
-        item_info = meeting_data.get("itemInfo", {})
-        
-        # Calculate total segments across all items in the meeting
-        total_segments = sum(
-            len(item.get("transcripts", [])) 
-            for item in item_info.values()
-        )
-
-        meetings.append({
-            "meeting_id": meeting_id,
-            "city": city,
-            "video_duration_sec": meeting_data.get("VideoDuration"),
-            "item_count": len(item_info),
-            "segment_count": total_segments
-        })
+    for meeting_id, meeting_data in iter_meetings(MEETINGBANK_JSON_PATH, keep=is_target_city):
+        meetings.append(summarize_meeting(meeting_id, meeting_data))
 
     return meetings
 
+def build_summary_frame(meeting_list: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Converts summary rows into the meeting_summary table with generated IDs.
+    """
+    df = pd.DataFrame(meeting_list)
+
+    # Trim meeting_id to numeric part only (saved as string)
+    df['meeting_id'] = df['meeting_id'].str.split('_').str[1].astype(str)
+
+    # Generate ID Columns
+    # -- Primary Key: Sequential 1 to N
+    df['pk_id'] = range(1, len(df) + 1)
+
+    # -- City ID: Unique integer for each unique city (starts at 1)
+    df['city_id'] = pd.factorize(df['city'])[0] + 1
+
+    # -- Metric ID: Sequential 1 to N (as requested)
+    df['metric_id'] = range(1, len(df) + 1)
+
+    # Reorder Columns (IDs first)
+    id_cols = ['pk_id', 'city_id', 'metric_id']
+    other_cols = [col for col in df.columns if col not in id_cols]
+    return df[id_cols + other_cols]
+
 # --- Execution ---
 if __name__ == "__main__":
     # Load and Filter Data
@@ -66,28 +100,10 @@ if __name__ == "__main__":
 
     if meeting_list:
         # Create DataFrame
-        df = pd.DataFrame(meeting_list)
-
-        # Trim meeting_id to numeric part only (saved as string)
-        df['meeting_id'] = df['meeting_id'].str.split('_').str[1].astype(str)
-
-        # Generate ID Columns
-        # -- Primary Key: Sequential 1 to N
-        df['pk_id'] = range(1, len(df) + 1)
-
-        # -- City ID: Unique integer for each unique city (starts at 1)
-        df['city_id'] = pd.factorize(df['city'])[0] + 1
-
-        # -- Metric ID: Sequential 1 to N (as requested)
-        df['metric_id'] = range(1, len(df) + 1)
-
-        # Reorder Columns (IDs first)
-        id_cols = ['pk_id', 'city_id', 'metric_id']
-        other_cols = [col for col in df.columns if col not in id_cols]
-        df = df[id_cols + other_cols]
+        df = build_summary_frame(meeting_list)
 
         # Save to Parquet
-        df.to_parquet(OUTPUT_PARQUET_PATH, engine='pyarrow', index=False)
+        write_partitioned(df, OUTPUT_PARQUET_PATH)
 
         # Final Preview
         print("\n--- Processed Data Preview ---")
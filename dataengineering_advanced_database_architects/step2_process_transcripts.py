@@ -1,10 +1,16 @@
 # Step 2: Process transcripts
 
-import json
+import argparse
 import pandas as pd
+import pyarrow as pa
 from pathlib import Path
 from typing import List, Dict, Any
 
+from parquet_io import write_partitioned
+from transcript_stats import add_transcript_stats
+from meetingbank_stream import map_meetings, SHARD_SIZE
+from meetingbank_cache import cached_transcript_rows
+
 # Pathlib configuration
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / "Data"
@@ -20,95 +26,194 @@ OUTPUT_PARQUET_PATH = OUTPUT_DIR / "meeting_transcripts.parquet"
 # Filter criteria
 TARGET_CITIES = {"LongBeachCC", "SeattleCityCouncil"}
 
-def build_transcript_features() -> List[Dict[str, Any]]:
+# Output schema of meeting_transcripts
+TRANSCRIPT_COLUMNS = ['pk_id', 'meeting_id', 'city', 'transcript_word_count', 'speaker_count', 'full_transcript_text']
+
+def extract_transcript(meeting_id: str, meeting_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Builds the transcript row (full text and speaker list) for a single meeting.
+    Word and speaker counts are added column-wise by transcript_stats.
+    """
+    # Split 'LongBeachCC_08092022' into ['LongBeachCC', '08092022']
+    city, numeric_id = meeting_id.split("_")[:2]
+
+    item_info = meeting_data.get("itemInfo", {})
+
+    full_text_list = []
+    speakers = []
+
+    # Deep extraction loop
+    for item in item_info.values():
+        transcripts = item.get("transcripts", [])
+        
+        # Logic to process segments
+        for segment in transcripts:
+            text = segment.get("text", "").strip()
+            speaker = segment.get("speaker")
+            
+            if text:
+                full_text_list.append(text)
+            
+            # explicit None check because empty string "" is a valid speaker name in some messy data
+            if speaker is not None:
+                speakers.append(str(speaker))
+
+    # Join text at the end
+    full_transcript_text = " ".join(full_text_list)
+    
+    return {
+        "meeting_id": str(numeric_id), # Saving only the numerical part as string
+        "city": city,
+        "full_transcript_text": full_transcript_text,
+        "speakers": speakers
+    }
+
+def extract_segments(meeting_id: str, meeting_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Flattens a meeting into segment-level columns, one entry per transcript segment.
+    Segment text is stripped the same way as for full_transcript_text.
+    """
+    city, numeric_id = meeting_id.split("_")[:2]
+
+    item_keys = []
+    segment_indexes = []
+    speakers = []
+    texts = []
+
+    for item_key, item in meeting_data.get("itemInfo", {}).items():
+        for segment_index, segment in enumerate(item.get("transcripts", [])):
+            speaker = segment.get("speaker")
+
+            item_keys.append(item_key)
+            segment_indexes.append(segment_index)
+            speakers.append(None if speaker is None else str(speaker))
+            texts.append(segment.get("text", "").strip())
+
+    return {
+        "meeting_id": str(numeric_id),
+        "city": city,
+        "item_key": item_keys,
+        "segment_index": segment_indexes,
+        "speaker": speakers,
+        "text": texts
+    }
+
+def build_segment_table(segments: List[Dict[str, Any]], pk_ids: List[int]) -> pa.Table:
+    """
+    Builds the meeting_segments Arrow table (one row per segment) from extract_segments output.
+    pk_ids holds the meeting_summary primary key of each meeting, in the same order.
+    meeting_id and speaker repeat heavily, so they are dictionary-encoded.
+    """
+    columns = {name: [] for name in ["pk_id", "meeting_id", "city", "item_key", "segment_index", "speaker", "text"]}
+
+    for meeting, pk_id in zip(segments, pk_ids):
+        count = len(meeting["text"])
+        columns["pk_id"].extend([pk_id] * count)
+        columns["meeting_id"].extend([meeting["meeting_id"]] * count)
+        columns["city"].extend([meeting["city"]] * count)
+        for name in ["item_key", "segment_index", "speaker", "text"]:
+            columns[name].extend(meeting[name])
+
+    return pa.table({
+        "pk_id": pa.array(columns["pk_id"], pa.int64()),
+        "meeting_id": pa.array(columns["meeting_id"], pa.string()).dictionary_encode(),
+        "city": pa.array(columns["city"], pa.string()),
+        "item_key": pa.array(columns["item_key"], pa.string()),
+        "segment_index": pa.array(columns["segment_index"], pa.int32()),
+        "speaker": pa.array(columns["speaker"], pa.string()).dictionary_encode(),
+        "text": pa.array(columns["text"], pa.string())
+    })
+
+def is_target_meeting(meeting_id: str) -> bool:
+    """
+    Checks the 'City_Number' key format and the city filter without touching the meeting body.
+    """
+    id_parts = meeting_id.split("_")
+    
+    # Safety check to ensure format is correct
+    return len(id_parts) >= 2 and id_parts[0] in TARGET_CITIES
+
+def build_transcript_features(workers: int = 1, chunk_size: int = SHARD_SIZE) -> List[Dict[str, Any]]:
     """
     Parses MeetingBank JSON to extract full text and speaker counts.
     Returns a list of dictionaries ready for DataFrame conversion.
+    With workers > 1 meetings are sharded (chunk_size per task) across a process pool;
+    results keep file order so the output is identical to a serial run.
     """
     
     if not MEETINGBANK_JSON_PATH.exists():
         raise FileNotFoundError(f"Source file not found at: {MEETINGBANK_JSON_PATH}")
 
-    with open(MEETINGBANK_JSON_PATH, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    # A fresh Arrow cache (python meetingbank_cache.py) replaces the JSON parse
+    cached_rows = cached_transcript_rows(TARGET_CITIES)
+    if cached_rows is not None:
+        print("Reading meetings from the Arrow cache...")
+        return cached_rows
 
-    processed_meetings = []
+    print(f"Streaming meetings from {MEETINGBANK_JSON_PATH.name}...")
 
-    print(f"Processing {len(data)} meetings...")
+    # Meetings are streamed one at a time instead of loading the whole file
+    return list(map_meetings(
+        extract_transcript,
+        MEETINGBANK_JSON_PATH,
+        keep=is_target_meeting,
+        workers=workers,
+        shard_size=chunk_size
+    ))
 
-    for meeting_id, meeting_data in data.items():
-        
-        # Split 'LongBeachCC_08092022' into ['LongBeachCC', '08092022']
-        id_parts = meeting_id.split("_")
-        
-        # Safety check to ensure format is correct
-        if len(id_parts) < 2:
-            continue
-
-        city = id_parts[0]
-        numeric_id = id_parts[1] # Extracts '08092022'
-
-        if city not in TARGET_CITIES:
-            continue
+def transcript_rows_to_frame(meetings: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Converts transcript rows to a DataFrame with word and speaker counts computed
+    in batch by Arrow kernels (no per-meeting Python word lists or speaker sets).
+    """
+    table = pa.Table.from_pylist(meetings, schema=pa.schema([
+        ("meeting_id", pa.string()),
+        ("city", pa.string()),
+        ("full_transcript_text", pa.string()),
+        ("speakers", pa.list_(pa.string()))
+    ]))
+    df = add_transcript_stats(table).to_pandas()
+    return df[[col for col in TRANSCRIPT_COLUMNS if col != 'pk_id']]
+
+def build_transcript_frame(meetings: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Converts transcript rows into the meeting_transcripts table with a primary key.
+    """
+    df = transcript_rows_to_frame(meetings)
+    
+    # Enforce string type on meeting_id to prevent it from becoming an Integer
+    # This preserves leading zeros (e.g., "08092022" stays "08092022")
+    df['meeting_id'] = df['meeting_id'].astype(str)
 
-        item_info = meeting_data.get("itemInfo", {})
+    # Adding the Primary Key
+    df['pk_id'] = range(1, len(df) + 1)
 
-        full_text_list = []
-        speakers = set()
+    # Moving 'pk_id' to the first column position
+    return df[TRANSCRIPT_COLUMNS]
 
-        # Deep extraction loop
-        for item in item_info.values():
-            transcripts = item.get("transcripts", [])
-            
-            # Logic to process segments
-            for segment in transcripts:
-                text = segment.get("text", "").strip()
-                speaker = segment.get("speaker")
-                
-                if text:
-                    full_text_list.append(text)
-                
-                # explicit None check because empty string "" is a valid speaker name in some messy data
-                if speaker is not None:
-                    speakers.add(speaker)
-
-        # Join text at the end
-        full_transcript_text = " ".join(full_text_list)
-        
-        processed_meetings.append({
-            "meeting_id": str(numeric_id), # Saving only the numerical part as string
-            "city": city,
-            "transcript_word_count": len(full_transcript_text.split()),
-            "speaker_count": len(speakers),
-            "full_transcript_text": full_transcript_text
-        })
 
-    return processed_meetings
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Extract transcript features from MeetingBank JSON.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes for extraction (0 = all cores, 1 = serial)")
+    parser.add_argument("--chunk-size", type=int, default=SHARD_SIZE,
+                        help="Meetings sent to a worker per task")
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
+    args = parse_args()
     try:
-        meetings = build_transcript_features()
+        meetings = build_transcript_features(workers=args.workers, chunk_size=args.chunk_size)
         
         if not meetings:
             print("No meetings matched the filter criteria.")
         else:
             # Create DataFrame
-            df = pd.DataFrame(meetings)
-            
-            # Enforce string type on meeting_id to prevent it from becoming an Integer
-            # This preserves leading zeros (e.g., "08092022" stays "08092022")
-            df['meeting_id'] = df['meeting_id'].astype(str)
-
-            # Adding the Primary Key
-            df['pk_id'] = range(1, len(df) + 1)
-
-            # Moving 'pk_id' to the first column position
-            cols = ['pk_id'] + [col for col in df.columns if col != 'pk_id']
-            df = df[cols]
+            df = build_transcript_frame(meetings)
             
             # to parquet step
-            df.to_parquet(OUTPUT_PARQUET_PATH, engine='pyarrow', index=False)
+            write_partitioned(df, OUTPUT_PARQUET_PATH)
 
             print(f"\nSUCCESS: Processed {len(df)} meetings.")
             print(f"Data saved to: {OUTPUT_PARQUET_PATH}")
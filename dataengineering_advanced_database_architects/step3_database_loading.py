@@ -2,13 +2,27 @@
 
 import pandas as pd
 import sys
+import csv
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from sqlalchemy import create_engine, inspect, text
-from pymongo import MongoClient
-import certifi
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import InterfaceError, OperationalError
+from pymongo.errors import AutoReconnect, BulkWriteError, OperationFailure
 import os
+import pyarrow.dataset as ds
 from dotenv import load_dotenv
 
+from city_aggregates import (
+    MONGO_AGGREGATES_COLLECTION, ensure_city_aggregates_table, city_deltas, apply_city_deltas,
+    rebuild_city_aggregates, apply_staged_city_deltas, mongo_city_increments, apply_mongo_increments, rebuild_mongo_city_aggregates
+)
+from adaptive_batch import AdaptiveBatchSizer, BatchLoadError, load_in_batches, retry_with_backoff
+from connections import get_sql_engine, get_mongo_collection
+from parquet_io import read_partitioned, open_dataset
+from transcript_codec import resolve_format, ensure_chunk_index, chunk_collection, transcript_operations, content_hash, stored_hashes
+
 # CONFIGURATION & PATHING
 try:
     BASE_DIR = Path(__file__).resolve().parent
@@ -19,56 +33,490 @@ PROCESSED_DIR = BASE_DIR / "Processed_Data"
 SUMMARY_PARQUET = PROCESSED_DIR / "meeting_summary.parquet"
 TRANSCRIPT_PARQUET = PROCESSED_DIR / "meeting_transcripts.parquet"
 
+# Only the columns that are loaded are read from the partitioned datasets
+SUMMARY_COLUMNS = ['pk_id', 'city_id', 'metric_id', 'city', 'meeting_id', 'video_duration_sec', 'item_count', 'segment_count']
+TRANSCRIPT_COLUMNS = ['pk_id', 'meeting_id', 'city', 'transcript_word_count', 'speaker_count', 'full_transcript_text']
+
 # Loading variables from env file
 load_dotenv()
 
 # SQL and NOSQL DATABASE CONNECTIONS
-SQL_URL = os.getenv("SQL_URL")
+# -- Created on first use by connections.py and shared with the other steps (pool settings in .env)
 
-SQL_ENGINE = create_engine(
-    SQL_URL,
-    connect_args={"ssl": {"fake_flag_to_enable_tls": True}},
-    pool_pre_ping=True
-)
+# Transcripts per Parquet batch / bulk_write call
+MONGO_BATCH_SIZE = int(os.getenv("MONGO_BATCH_SIZE", "500"))
+
+# Storage format of the transcript text in this collection: plain | zlib | zstd | chunked
+# -- every document records its own format, so readers decode collections of any mix
+MONGO_TRANSCRIPT_FORMAT = os.getenv("MONGO_TRANSCRIPT_FORMAT", "plain")
+
+# LOAD CONCURRENCY
+# -- serial:   MySQL tables, then MongoDB transcripts
+# -- parallel: MongoDB transcripts load while the MySQL chain runs
+LOAD_CONCURRENCY = os.getenv("LOAD_CONCURRENCY", "serial")
+
+# SQL LOAD MODE
+# -- delta:  fetch existing keys and filter client-side (original behaviour)
+# -- server: bulk-insert into a staging table and let MySQL deduplicate
+# -- watermark: load only rows whose (monotonic) key is above the table's recorded high-water mark
+SQL_LOAD_MODE = os.getenv("SQL_LOAD_MODE", "delta")
+
+# Per-table high-water marks for the watermark mode
+WATERMARK_TABLE = "load_watermarks"
+
+# Surrogate key of every SQL table; all of them only ever grow
+TABLE_KEYS = {"cities": "city_id", "meetings": "pk_id", "meeting_metrics": "metric_id"}
 
-MONGO_URI = os.getenv("MONGO_URI")
-MONGO_DB_NAME = os.getenv("MONGO_DB_NAME")
-MONGO_COLLECTION_NAME = os.getenv("MONGO_COLLECTION_NAME")
+# -- How the server mode merges staging rows: not_exists | ignore | update
+# -- 'ignore' and 'update' need a primary key on the target table
+SQL_UPSERT_STRATEGY = os.getenv("SQL_UPSERT_STRATEGY", "not_exists")
 
-MONGO_CLIENT = MongoClient(MONGO_URI, tlsCAFile=certifi.where())
-MONGO_DB = MONGO_CLIENT[MONGO_DB_NAME]
-MONGO_COLLECTION = MONGO_DB[MONGO_COLLECTION_NAME]
+# SQL INSERT METHOD
+# -- to_sql:    multi-row INSERT statements through SQLAlchemy (fallback)
+# -- load_data: LOAD DATA LOCAL INFILE from a temporary TSV file (server needs local_infile=ON)
+SQL_INSERT_METHOD = os.getenv("SQL_INSERT_METHOD", "to_sql")
+
+# Rows written to the temporary TSV file per chunk
+BULK_CHUNK_ROWS = 50_000
+
+# ADAPTIVE BATCHING
+# -- Every batch is its own transaction; the size adapts to the observed latency and error rate
+SQL_BATCH_SIZE = int(os.getenv("SQL_BATCH_SIZE", "1000"))
+SQL_BATCH_MIN = int(os.getenv("SQL_BATCH_MIN", "100"))
+SQL_BATCH_MAX = int(os.getenv("SQL_BATCH_MAX", "20000"))
+BATCH_TARGET_SECONDS = float(os.getenv("BATCH_TARGET_SECONDS", "2.0"))
+# -- Failed batches are retried with exponential backoff (base delay in seconds)
+BATCH_MAX_RETRIES = int(os.getenv("BATCH_MAX_RETRIES", "5"))
+BATCH_RETRY_BASE_DELAY = float(os.getenv("BATCH_RETRY_BASE_DELAY", "0.5"))
+
+# Rows per INSERT statement inside a to_sql batch (keeps statements below max_allowed_packet)
+INSERT_STATEMENT_ROWS = 1000
+
+# Connection drops and timeouts are retried; constraint or syntax errors are not
+SQL_RETRY_ERRORS = (OperationalError, InterfaceError)
+MONGO_RETRY_ERRORS = (AutoReconnect,)
 
 def get_existing_sql_ids(table_name, id_column):
     """
     Fetches the existing primary keys from a SQL table to prevent duplicates.
     Returns a set of IDs.
     """
-    inspector = inspect(SQL_ENGINE)
+    engine = get_sql_engine()
+    inspector = inspect(engine)
     if not inspector.has_table(table_name):
         return set()
 
     query = text(f"SELECT {id_column} FROM {table_name}")
     try:
-        with SQL_ENGINE.connect() as conn:
+        with engine.connect() as conn:
             existing_ids = pd.read_sql(query, conn)
             return set(existing_ids[id_column].unique())
     except Exception as e:
         print(f"Warning: Could not fetch existing IDs for {table_name}: {e}")
         return set()
 
-def load_data_optimized():
-    # --- SQL SECTION: Meeting Summaries ---
-    if not SUMMARY_PARQUET.exists():
-        print(f"Error: {SUMMARY_PARQUET} not found.")
+def ensure_watermark_table():
+    with get_sql_engine().begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} ("
+            "table_name VARCHAR(64) PRIMARY KEY, "
+            "id_column VARCHAR(64) NOT NULL, "
+            "high_water BIGINT NOT NULL)"
+        ))
+
+def get_watermark(table_name, id_column):
+    """
+    The recorded high-water mark of a table. Tables loaded before the watermark mode
+    existed start from MAX(id_column); missing tables start from 0.
+    """
+    engine = get_sql_engine()
+    with engine.connect() as conn:
+        high_water = conn.execute(
+            text(f"SELECT high_water FROM {WATERMARK_TABLE} WHERE table_name = :table_name"),
+            {"table_name": table_name}
+        ).scalar()
+        if high_water is not None:
+            return int(high_water)
+
+        if not inspect(engine).has_table(table_name):
+            return 0
+        # -- MAX over the primary key is a single index lookup
+        return int(conn.execute(text(f"SELECT COALESCE(MAX({id_column}), 0) FROM {table_name}")).scalar())
+
+def record_watermark(conn, table_name, id_column, high_water):
+    """
+    Moves a table's high-water mark forward inside the caller's transaction, so it is
+    committed together with the rows it covers.
+    """
+    params = {"table_name": table_name, "id_column": id_column, "high_water": int(high_water)}
+    if conn.dialect.name == "mysql":
+        upsert = (
+            f"INSERT INTO {WATERMARK_TABLE} (table_name, id_column, high_water) "
+            "VALUES (:table_name, :id_column, :high_water) "
+            "ON DUPLICATE KEY UPDATE high_water = GREATEST(high_water, VALUES(high_water))"
+        )
+    else:
+        upsert = (
+            f"INSERT INTO {WATERMARK_TABLE} (table_name, id_column, high_water) "
+            "VALUES (:table_name, :id_column, :high_water) "
+            "ON CONFLICT (table_name) DO UPDATE SET high_water = MAX(high_water, excluded.high_water)"
+        )
+    conn.execute(text(upsert), params)
+
+def bulk_load_infile(temp_df, table_name, after_write=None):
+    """
+    Streams rows into a temporary TSV file and ingests it with LOAD DATA LOCAL INFILE.
+    after_write(conn, temp_df) runs in the same transaction.
+    """
+    # Separate engine: the driver only sends local files when local_infile is enabled
+    engine = get_sql_engine(local_infile=True)
+
+    # LOAD DATA needs an existing table; an empty to_sql creates it with the right types
+    if not inspect(engine).has_table(table_name):
+        temp_df.head(0).to_sql(table_name, engine, index=False)
+
+    # Integer columns holding nulls arrive as float64; Int64 keeps them from being written as 1.0
+    tsv_df = temp_df.copy()
+    for col in tsv_df.columns:
+        values = tsv_df[col]
+        if pd.api.types.is_float_dtype(values) and values.isna().any() and (values.dropna() % 1 == 0).all():
+            tsv_df[col] = values.astype("Int64")
+
+    # Every field is read into a user variable; NULLs are written as empty fields and mapped back
+    # with NULLIF (a \N token would be escaped to \\N by the writer and loaded as text). The loaded
+    # tables have no meaningful empty strings, so those load as NULL too
+    variables = ", ".join(f"@v{i}" for i in range(len(tsv_df.columns)))
+    assignments = ", ".join(f"`{col}` = NULLIF(@v{i}, '')" for i, col in enumerate(tsv_df.columns))
+    fd, tsv_path = tempfile.mkstemp(suffix=".tsv")
+    os.close(fd)
+
+    try:
+        # MySQL's default format: tab-separated, backslash escapes
+        tsv_df.to_csv(
+            tsv_path,
+            sep="\t",
+            header=False,
+            index=False,
+            na_rep="",
+            quoting=csv.QUOTE_NONE,
+            escapechar="\\",
+            lineterminator="\n",
+            chunksize=BULK_CHUNK_ROWS
+        )
+
+        load_sql = (
+            f"LOAD DATA LOCAL INFILE '{Path(tsv_path).as_posix()}' INTO TABLE `{table_name}` "
+            f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' ({variables}) "
+            f"SET {assignments}"
+        )
+        with engine.begin() as conn:
+            conn.execute(text(load_sql))
+            if after_write is not None:
+                after_write(conn, temp_df)
+    finally:
+        os.remove(tsv_path)
+
+def append_rows(chunk, table_name, after_write=None):
+    """
+    Appends one batch with multi-row INSERTs in its own transaction
+    (after_write(conn, chunk) runs before the commit).
+    """
+    with get_sql_engine().begin() as conn:
+        chunk.to_sql(
+            table_name, 
+            conn, 
+            if_exists='append', 
+            index=False, 
+            chunksize=INSERT_STATEMENT_ROWS, 
+            method='multi'
+        )
+        if after_write is not None:
+            after_write(conn, chunk)
+
+def new_batch_sizer(method):
+    # LOAD DATA moves far more rows per round trip, so it starts from a larger batch
+    if method == "load_data":
+        return AdaptiveBatchSizer(BULK_CHUNK_ROWS, min_size=SQL_BATCH_MIN, max_size=max(SQL_BATCH_MAX, BULK_CHUNK_ROWS * 4),
+                                  target_seconds=BATCH_TARGET_SECONDS)
+    return AdaptiveBatchSizer(SQL_BATCH_SIZE, min_size=SQL_BATCH_MIN, max_size=SQL_BATCH_MAX,
+                              target_seconds=BATCH_TARGET_SECONDS)
+
+def insert_rows(temp_df, table_name, watermark_col=None, after_write=None):
+    """
+    Appends rows with the configured SQL_INSERT_METHOD in adaptively sized, individually
+    committed batches and reports throughput. If LOAD DATA fails, to_sql continues
+    from the last committed batch. With watermark_col (rows sorted on it), every batch
+    commits together with the table's new high-water mark; after_write(conn, chunk)
+    also runs inside each batch's transaction.
+    """
+    start_time = time.perf_counter()
+    method = SQL_INSERT_METHOD
+    written = 0
+
+    hooks = [after_write] if after_write is not None else []
+    if watermark_col is not None:
+        hooks.append(lambda conn, chunk: record_watermark(conn, table_name, watermark_col, chunk[watermark_col].max()))
+
+    def after_batch(conn, chunk):
+        for hook in hooks:
+            hook(conn, chunk)
+
+    def load(df, write_batch):
+        return load_in_batches(
+            df,
+            write_batch,
+            new_batch_sizer(method),
+            retry_on=SQL_RETRY_ERRORS,
+            max_retries=BATCH_MAX_RETRIES,
+            base_delay=BATCH_RETRY_BASE_DELAY,
+            label=f"{table_name} ({method})"
+        )
+
+    if method == "load_data":
+        try:
+            written = load(temp_df, lambda chunk: bulk_load_infile(chunk, table_name, after_batch))
+        except BatchLoadError as e:
+            written = e.rows_written
+            method = "to_sql"
+            print(f"     LOAD DATA LOCAL INFILE failed ({e.__cause__}), falling back to to_sql "
+                  f"for the remaining {len(temp_df) - written} rows.")
+
+    if method == "to_sql":
+        written += load(temp_df.iloc[written:], lambda chunk: append_rows(chunk, table_name, after_batch))
+
+    elapsed = time.perf_counter() - start_time
+    rate = len(temp_df) / elapsed if elapsed > 0 else float("inf")
+    print(f"     {table_name} via {method}: {len(temp_df)} rows in {elapsed:.2f} s ({rate:,.0f} rows/s)")
+
+def upsert_via_staging(temp_df, table_name, pk_col, after_write=None, before_merge=None, after_merge=None):
+    """
+    Bulk-inserts rows into a staging table and merges them into the target on the server
+    (INSERT ... SELECT ... WHERE NOT EXISTS / INSERT IGNORE / ON DUPLICATE KEY UPDATE),
+    so no existing keys are downloaded. after_write is passed to insert_rows on a first
+    load; before_merge(conn, staging_table) and after_merge(conn, staging_table) run in the
+    merge transaction, around the merge statement.
+    """
+    engine = get_sql_engine()
+    inspector = inspect(engine)
+    if not inspector.has_table(table_name):
+        # First load: every row is new and to_sql creates the table
+        print(f"  -> {table_name}: Table not found, inserting {len(temp_df)} records...")
+        insert_rows(temp_df, table_name, after_write=after_write)
+        print(f"     Success.")
         return
 
-    print("Reading Summary Parquet...")
-    df = pd.read_parquet(SUMMARY_PARQUET)
-    
-    BATCH_SIZE = 1000
-    
-    def safe_to_sql_delta(temp_df, table_name, pk_col):
+    strategy = SQL_UPSERT_STRATEGY
+    if strategy != "not_exists" and not inspector.get_pk_constraint(table_name).get("constrained_columns"):
+        print(f"  -> {table_name}: No primary key, using 'not_exists' instead of '{strategy}'.")
+        strategy = "not_exists"
+
+    if strategy != "update":
+        # -- Keys only ever grow, so rows at or below the server's MAX key are already loaded;
+        # -- 'update' still stages every row, since rewriting existing rows is its point
+        with engine.connect() as conn:
+            high_water = int(conn.execute(text(f"SELECT COALESCE(MAX(`{pk_col}`), 0) FROM `{table_name}`")).scalar())
+        temp_df = temp_df[temp_df[pk_col] > high_water]
+        if temp_df.empty:
+            print(f"  -> {table_name}: No records above MAX({pk_col}) = {high_water}.")
+            return
+
+    staging_table = f"{table_name}_staging"
+    columns = ", ".join(f"`{col}`" for col in temp_df.columns)
+    select_columns = ", ".join(f"s.`{col}`" for col in temp_df.columns)
+
+    if strategy == "ignore":
+        merge_sql = f"INSERT IGNORE INTO `{table_name}` ({columns}) SELECT {select_columns} FROM `{staging_table}` s"
+    elif strategy == "update":
+        updates = ", ".join(f"`{col}` = s.`{col}`" for col in temp_df.columns if col != pk_col)
+        merge_sql = (
+            f"INSERT INTO `{table_name}` ({columns}) SELECT {select_columns} FROM `{staging_table}` s "
+            f"ON DUPLICATE KEY UPDATE {updates}"
+        )
+    else:
+        merge_sql = (
+            f"INSERT INTO `{table_name}` ({columns}) SELECT {select_columns} FROM `{staging_table}` s "
+            f"WHERE NOT EXISTS (SELECT 1 FROM `{table_name}` t WHERE t.`{pk_col}` = s.`{pk_col}`)"
+        )
+
+    print(f"  -> {table_name}: Staging {len(temp_df)} records for a server-side merge ({strategy})...")
+    try:
+        with engine.begin() as conn:
+            # Same columns and indexes as the target, so the merge can use the key index
+            conn.execute(text(f"DROP TABLE IF EXISTS `{staging_table}`"))
+            conn.execute(text(f"CREATE TABLE `{staging_table}` LIKE `{table_name}`"))
+
+        insert_rows(temp_df, staging_table)
+
+        def merge():
+            with engine.begin() as conn:
+                if before_merge is not None:
+                    before_merge(conn, staging_table)
+                rowcount = conn.execute(text(merge_sql)).rowcount
+                if after_merge is not None:
+                    after_merge(conn, staging_table)
+                return rowcount
+
+        # -- The merge is one statement in one transaction, so repeating it is safe
+        rowcount = retry_with_backoff(merge, retry_on=SQL_RETRY_ERRORS, max_retries=BATCH_MAX_RETRIES,
+                                      base_delay=BATCH_RETRY_BASE_DELAY, label=f"{table_name} merge")
+        print(f"     Success. Rows affected: {rowcount}")
+    except Exception as e:
+        print(f"     Failed to merge into {table_name}: {e}")
+        raise
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS `{staging_table}`"))
+
+def load_transcripts_to_mongo(batch_size=MONGO_BATCH_SIZE):
+    """
+    Streams transcript Parquet batches into unordered bulk upserts keyed on (meeting_id, city).
+    Memory is bounded by one batch and no full-collection distinct scan is needed.
+    """
+    print("\nChecking Transcripts...")
+    if not TRANSCRIPT_PARQUET.exists():
+        print("Transcript Parquet file not found. Skipping Mongo step.")
+        return
+
+    collection = get_mongo_collection()
+
+    # -- The unique index makes every upsert an index lookup and blocks duplicates
+    # -- meeting_id alone is only unique within a city, so the city is part of the key
+    try:
+        collection.create_index([("meeting_id", 1), ("city", 1)], unique=True, name="uniq_meeting")
+    except OperationFailure as e:
+        print(f"Warning: Could not create the unique meeting index (existing duplicates?): {e}")
+
+    storage_format = resolve_format(MONGO_TRANSCRIPT_FORMAT)
+    if storage_format == "chunked":
+        ensure_chunk_index(collection)
+
+    # -- Per-city word/speaker aggregates: seeded once from existing transcripts, then incremented
+    aggregates = get_mongo_collection(MONGO_AGGREGATES_COLLECTION)
+    if aggregates.estimated_document_count() == 0 and collection.estimated_document_count() > 0:
+        rebuild_mongo_city_aggregates(collection, aggregates)
+    stale_cities = set()
+
+    upserted = modified = failed = unchanged = 0
+    dataset = open_dataset(TRANSCRIPT_PARQUET)
+
+    def write_batch(collection, operations, count_writes=True):
+        """
+        Returns the indexes of the operations that inserted a new document, the modified count
+        and the indexes of the operations that failed.
+        """
+        nonlocal upserted, modified, failed
+        # -- Unordered: one bad document does not stop the rest of the batch
+        # -- Upserts are idempotent, so a batch interrupted by a dropped connection is simply resent
+        try:
+            result = retry_with_backoff(
+                lambda: collection.bulk_write(operations, ordered=False),
+                retry_on=MONGO_RETRY_ERRORS,
+                max_retries=BATCH_MAX_RETRIES,
+                base_delay=BATCH_RETRY_BASE_DELAY,
+                label=f"{collection.name} bulk_write"
+            )
+            if count_writes:
+                upserted += result.upserted_count
+                modified += result.modified_count
+            return set(result.upserted_ids or {}), result.modified_count, set()
+        except BulkWriteError as e:
+            details = e.details
+            if count_writes:
+                upserted += details.get("nUpserted", 0)
+                modified += details.get("nModified", 0)
+                failed += len(details.get("writeErrors", []))
+            print(f"     Batch had {len(details.get('writeErrors', []))} failed writes: {details['writeErrors'][:1]}")
+            return ({item["index"] for item in details.get("upserted", [])}, details.get("nModified", 0),
+                    {error["index"] for error in details.get("writeErrors", [])})
+
+    for batch in dataset.to_batches(columns=TRANSCRIPT_COLUMNS, batch_size=batch_size):
+        records = batch.to_pylist()
+
+        # -- Only new or changed transcripts are sent: the stored content hash is read per batch
+        # -- (index lookups, no text) and records with the same hash are skipped
+        existing = stored_hashes(collection, records)
+        changed = [(record, digest) for record, digest in
+                   ((record, content_hash(record, storage_format)) for record in records)
+                   if existing.get((record["meeting_id"], record["city"])) != digest]
+        unchanged += len(records) - len(changed)
+        records = [record for record, _ in changed]
+
+        operations = []
+        chunk_operations = []
+        chunk_owners = []
+        for i, (record, digest) in enumerate(changed):
+            operation, chunks = transcript_operations(record, storage_format, digest=digest)
+            operations.append(operation)
+            chunk_operations.extend(chunks)
+            chunk_owners.extend([i] * len(chunks))
+        if not operations:
+            continue
+
+        # -- Chunks first: a parent marked 'chunked' never points at missing chunks, so the
+        # -- parents of failed chunk writes are skipped (and retried on the next run)
+        if chunk_operations:
+            _, _, failed_chunks = write_batch(chunk_collection(collection), chunk_operations, count_writes=False)
+            skipped = {chunk_owners[i] for i in failed_chunks}
+            if skipped:
+                failed += len(skipped)
+                print(f"     Skipping {len(skipped)} transcripts whose chunks failed to write.")
+                records = [record for i, record in enumerate(records) if i not in skipped]
+                operations = [operation for i, operation in enumerate(operations) if i not in skipped]
+                if not operations:
+                    continue
+        inserted, batch_modified, _ = write_batch(collection, operations)
+
+        # -- New transcripts are added to their city's aggregates; changed ones mark the city for a recompute
+        apply_mongo_increments(aggregates, mongo_city_increments(records[i] for i in inserted))
+        if batch_modified:
+            stale_cities.update(record["city"] for i, record in enumerate(records) if i not in inserted)
+
+    if stale_cities:
+        rebuild_mongo_city_aggregates(collection, aggregates, stale_cities)
+
+    print(f"  -> Transcripts ({storage_format}) upserted: {upserted}, updated: {modified}, "
+          f"unchanged: {unchanged}, failed: {failed}")
+
+def load_sql_tables(df, timings, watermarks=None):
+    """
+    Loads cities -> meetings -> meeting_metrics in foreign-key order,
+    recording the wall time of each table in timings.
+    """
+    # Per-city aggregates move forward in the same transactions as the meeting_metrics rows
+    engine = get_sql_engine()
+    if ensure_city_aggregates_table(engine) and inspect(engine).has_table("meeting_metrics"):
+        with engine.begin() as conn:
+            rebuild_city_aggregates(conn)
+
+    city_of = df.drop_duplicates("pk_id").set_index("pk_id")[["city_id", "city"]]
+
+    def add_to_city_aggregates(conn, chunk):
+        apply_city_deltas(conn, city_deltas(chunk.join(city_of, on="pk_id")))
+
+    def subtract_staged_from_city_aggregates(conn, staging_table):
+        apply_staged_city_deltas(conn, staging_table, sign=-1)
+
+    def load_above_watermark(temp_df, table_name, pk_col, after_write=None):
+        """
+        Inserts only rows above the table's high-water mark; no keys are downloaded.
+        """
+        high_water = watermarks[table_name]
+        new_data = temp_df[temp_df[pk_col] > high_water].sort_values(pk_col)
+
+        if new_data.empty:
+            print(f"  -> {table_name}: No records above the watermark ({pk_col} > {high_water}).")
+            return
+
+        print(f"  -> {table_name}: Inserting {len(new_data)} records above the watermark ({pk_col} > {high_water})...")
+        try:
+            insert_rows(new_data, table_name, watermark_col=pk_col, after_write=after_write)
+            print(f"     Success. Watermark now {new_data[pk_col].max()}.")
+        except BatchLoadError as e:
+            # The watermark only covers committed batches, so the next run resumes here
+            print(f"     Failed to insert into {table_name} after {e.rows_written} committed rows: {e}")
+            raise
+
+    def safe_to_sql_delta(temp_df, table_name, pk_col, after_write=None):
         """
         Filters data against existing DB records and inserts only new rows.
         """
@@ -90,28 +538,42 @@ def load_data_optimized():
         print(f"  -> {table_name}: Inserting {count_new} new records...")
         
         try:
-            new_data.to_sql(
-                table_name, 
-                SQL_ENGINE, 
-                if_exists='append', 
-                index=False, 
-                chunksize=BATCH_SIZE, 
-                method='multi'
-            )
+            insert_rows(new_data, table_name, after_write=after_write)
             print(f"     Success.")
-        except Exception as e:
-            print(f"     Failed to insert into {table_name}: {e}")
+        except BatchLoadError as e:
+            # Committed batches stay; the next run's delta check skips them and resumes here
+            print(f"     Failed to insert into {table_name} after {e.rows_written} committed rows: {e}")
+            raise
+
+    def load_table(temp_df, table_name, pk_col):
+        """
+        Dispatches to the configured SQL_LOAD_MODE.
+        """
+        start_time = time.perf_counter()
+        after_write = add_to_city_aggregates if table_name == "meeting_metrics" else None
+        if SQL_LOAD_MODE == "server":
+            # -- A merge may update rows in place: the staged keys' current rows are subtracted
+            # -- before it and added back after it, in its transaction
+            before_merge = subtract_staged_from_city_aggregates if table_name == "meeting_metrics" else None
+            after_merge = apply_staged_city_deltas if table_name == "meeting_metrics" else None
+            upsert_via_staging(temp_df, table_name, pk_col, after_write=after_write,
+                               before_merge=before_merge, after_merge=after_merge)
+        elif SQL_LOAD_MODE == "watermark":
+            load_above_watermark(temp_df, table_name, pk_col, after_write=after_write)
+        else:
+            safe_to_sql_delta(temp_df, table_name, pk_col, after_write=after_write)
+        timings[f"mysql.{table_name}"] = time.perf_counter() - start_time
 
     # Load Tables with Delta Checks
     # -- Cities (Primary Key: city_id)
-    safe_to_sql_delta(
+    load_table(
         df[['city_id', 'city']].drop_duplicates(), 
         'cities', 
         'city_id'
     )
     
     # -- Meetings (Primary Key: pk_id)
-    safe_to_sql_delta(
+    load_table(
         df[['pk_id', 'city_id', 'meeting_id']].drop_duplicates(), 
         'meetings', 
         'pk_id'
@@ -119,47 +581,62 @@ def load_data_optimized():
     
     # -- Metrics (Primary Key: metric_id)
     metrics_cols = ['metric_id', 'pk_id', 'video_duration_sec', 'item_count', 'segment_count']
-    safe_to_sql_delta(
+    load_table(
         df[metrics_cols].drop_duplicates(), 
         'meeting_metrics', 
         'metric_id'
     )
 
-    # --- MONGO SECTION: Transcripts ---
-    print("\nChecking Transcripts...")
-    if TRANSCRIPT_PARQUET.exists():
-        df_transcripts = pd.read_parquet(TRANSCRIPT_PARQUET)
-        
-        # -- Fetch existing meeting_ids from MongoDB to avoid duplicates
-        # Assuming 'meeting_id' is the unique identifier in your Mongo documents
-        try:
-            existing_mongo_ids = set(MONGO_COLLECTION.distinct("meeting_id"))
-        except Exception as e:
-            print(f"Warning: Could not fetch existing Mongo IDs: {e}")
-            existing_mongo_ids = set()
-
-        # -- Filter the dataframe
-        if existing_mongo_ids:
-            # Only keep rows where meeting_id is NOT in the existing set
-            initial_count = len(df_transcripts)
-            df_transcripts = df_transcripts[~df_transcripts['meeting_id'].isin(existing_mongo_ids)]
-            filtered_count = len(df_transcripts)
-            print(f"  -> Filtered out {initial_count - filtered_count} existing transcripts.")
-        
-        # -- Insert remaining
-        if not df_transcripts.empty:
-            records = df_transcripts.to_dict(orient='records')
-            try:
-                print(f"  -> Inserting {len(records)} new transcripts to Mongo...")
-                result = MONGO_COLLECTION.insert_many(records)
-                print(f"     Success! Inserted ids count: {len(result.inserted_ids)}")
-            except Exception as e:
-                print(f"     Mongo Insert Failed: {e}")
-        else:
-            print("  -> No new transcripts to upload.")
+def load_mongo_transcripts(timings):
+    start_time = time.perf_counter()
+    load_transcripts_to_mongo()
+    timings["mongo.transcripts"] = time.perf_counter() - start_time
+
+def load_data_optimized():
+    # --- SQL SECTION: Meeting Summaries ---
+    if not SUMMARY_PARQUET.exists():
+        print(f"Error: {SUMMARY_PARQUET} not found.")
+        return
+
+    watermarks = None
+    row_filter = None
+    if SQL_LOAD_MODE == "watermark":
+        ensure_watermark_table()
+        watermarks = {table: get_watermark(table, key) for table, key in TABLE_KEYS.items()}
+        print(f"High-water marks: {watermarks}")
 
+        # -- Only rows new to at least one table are read (row groups below every mark are skipped)
+        for table, key in TABLE_KEYS.items():
+            condition = ds.field(key) > watermarks[table]
+            row_filter = condition if row_filter is None else row_filter | condition
+
+    print("Reading Summary Parquet...")
+    df = read_partitioned(SUMMARY_PARQUET, columns=SUMMARY_COLUMNS, filter=row_filter)
+
+    timings = {}
+    start_time = time.perf_counter()
+
+    if LOAD_CONCURRENCY == "parallel":
+        # MySQL and MongoDB are independent stores: the SQL chain keeps its
+        # foreign-key order in one thread while the transcripts load in another
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            sql_future = executor.submit(load_sql_tables, df, timings, watermarks)
+            mongo_future = executor.submit(load_mongo_transcripts, timings)
+            sql_future.result()
+            mongo_future.result()
     else:
-        print("Transcript Parquet file not found. Skipping Mongo step.")
+        load_sql_tables(df, timings, watermarks)
+
+        # --- MONGO SECTION: Transcripts ---
+        load_mongo_transcripts(timings)
+
+    total_time = time.perf_counter() - start_time
+
+    print(f"\n--- Load timings ({LOAD_CONCURRENCY}) ---")
+    for target, elapsed in timings.items():
+        print(f"  {target:<24} {elapsed:8.2f} s")
+    print(f"  {'mysql (sum)':<24} {sum(v for k, v in timings.items() if k.startswith('mysql.')):8.2f} s")
+    print(f"  {'wall clock':<24} {total_time:8.2f} s")
 
 if __name__ == "__main__":
     load_data_optimized()
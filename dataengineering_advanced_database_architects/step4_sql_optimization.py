@@ -14,13 +14,19 @@ import pandas as pd, numpy as np
 import matplotlib.pyplot as plt, seaborn as sns
 import requests
 import os
-import time
-from sqlalchemy import create_engine, inspect
+from sqlalchemy import inspect
 from sqlalchemy import text
-import re
 from dotenv import load_dotenv
 from IPython.display import display
 
+from connections import get_sql_engine
+from duckdb_backend import query_df, explain_text
+from sql_materialization import materialize_denormalized
+from city_aggregates import CITY_AVERAGES_QUERY
+from index_advisor import advise, print_advice
+from explain_plan import parse_plan, format_plan, plan_summary, record_plan
+from query_benchmark import benchmark_queries, print_report, save_results, compare_with_previous
+
 import warnings
 warnings.filterwarnings("ignore")
 
@@ -31,62 +37,78 @@ warnings.filterwarnings("ignore")
 # Load the variables from the .env file
 load_dotenv()
 
-# SQL Config
-SQL_URL = os.getenv("SQL_URL")
+# Analytics backend
+# -- mysql:  the remote MySQL server loaded by step3
+# -- duckdb: embedded DuckDB views over the Processed_Data Parquet files (offline, no index DDL)
+ANALYTICS_BACKEND = os.getenv("ANALYTICS_BACKEND", "mysql")
+
+# SQL Config (shared pooled engine, pool settings in .env)
+SQL_ENGINE = get_sql_engine() if ANALYTICS_BACKEND == "mysql" else None
+
+# denormalized_table refresh: 'incremental' (merge new metric_ids) or 'full' (rebuild and swap)
+DENORMALIZED_REFRESH = os.getenv("DENORMALIZED_REFRESH", "incremental")
+
+# Index advisor cell: runs EXPLAIN ANALYZE over the whole step4/step6 workload, so it is opt-in
+STEP4_INDEX_ADVICE = os.getenv("STEP4_INDEX_ADVICE", "false").lower() == "true"
+
+def read_query(query):
+    """
+    Runs a SELECT on the configured backend and returns a DataFrame.
+    """
+    if ANALYTICS_BACKEND == "duckdb":
+        return query_df(query)
+    with SQL_ENGINE.connect() as conn:
+        return pd.read_sql(text(query), conn)
+
+def explain_query(query):
+    """
+    Runs an EXPLAIN ANALYZE statement on the configured backend and returns the plan text.
+    MySQL plans are stored per query fingerprint and compared with the previous run.
+    """
+    if ANALYTICS_BACKEND == "duckdb":
+        return explain_text(query)
+    with SQL_ENGINE.connect() as conn:
+        plan = conn.execute(text(query)).fetchone()[0]
+
+    for flag in record_plan(query, plan):
+        print(f"PLAN REGRESSION: {flag}")
+    return plan
+
+# Benchmark runs per query in step4: kept small, every run is a round trip to the remote server
+STEP4_BENCHMARK_SETTINGS = {
+    "warmup": int(os.getenv("STEP4_BENCHMARK_WARMUP", "1")),
+    "repetitions": int(os.getenv("STEP4_BENCHMARK_REPETITIONS", "5")),
+    "cold_runs": int(os.getenv("STEP4_BENCHMARK_COLD_RUNS", "1"))
+}
 
-SQL_ENGINE = create_engine(
-    SQL_URL,
-    connect_args={"ssl": {"fake_flag_to_enable_tls": True}}
-)
+# Queries register here as their cells run; competing variants are then benchmarked in one
+# interleaved call, after all of them have their index setup in place
+BENCHMARK_QUERIES = {}
+BENCHMARK_RESULTS = {}
+
+def register_query(name, query):
+    BENCHMARK_QUERIES[name] = query
+
+def benchmark_group(names):
+    """
+    Benchmarks the named queries together (warm runs interleaved round-robin) and prints them.
+    """
+    results = benchmark_queries({name: BENCHMARK_QUERIES[name] for name in names},
+                                backend=ANALYTICS_BACKEND, engine=SQL_ENGINE, **STEP4_BENCHMARK_SETTINGS)
+    BENCHMARK_RESULTS.update(results)
+    print_report(results)
+    return results
 
 # %% [markdown]
 # #### Creating Denormalized table with Primary key
 
 # %%
-# Fetch the data into Python
-query = """
-SELECT 
-    c.city_id, c.city, m.pk_id, m.meeting_id,
-    mm.metric_id, mm.video_duration_sec, mm.item_count, mm.segment_count
-FROM cities c
-JOIN meetings m ON c.city_id = m.city_id
-JOIN meeting_metrics mm ON m.pk_id = mm.pk_id;
-"""
-
-with SQL_ENGINE.connect() as conn:
-    print("Fetching data...")
-    df = pd.read_sql(text(query), conn)
-
-    # Manually create the table with a Primary Key
-    # We drop table if it exists first to ensure a clean slate
-    conn.execute(text("DROP TABLE IF EXISTS denormalized_table"))
-    
-    create_statement = """
-    CREATE TABLE denormalized_table (
-        metric_id BIGINT PRIMARY KEY,
-        city_id BIGINT,
-        city VARCHAR(255),
-        pk_id BIGINT,
-        meeting_id VARCHAR(255),
-        video_duration_sec BIGINT,
-        item_count BIGINT,
-        segment_count BIGINT
-    );
-    """
-    print("Creating table with Primary Key...")
-    conn.execute(text(create_statement))
-    conn.commit()
-
-    # Use to_sql to 'append' the data to the existing structure
-    print(f"Uploading {len(df)} rows...")
-    df.to_sql(
-        'denormalized_table', 
-        con=conn, 
-        if_exists='append', 
-        index=False, 
-        chunksize=500
-    )
-    conn.commit()
+# Built on the server with CREATE TABLE + INSERT ... SELECT: no rows travel to the client and back.
+# Incremental by default (only new metric_ids are merged); a full rebuild is swapped in with RENAME TABLE,
+# so step6 never reads an empty table.
+# Under DuckDB, denormalized_table is already a view over meeting_summary
+if ANALYTICS_BACKEND == "mysql":
+    materialize_denormalized(SQL_ENGINE, full_refresh=DENORMALIZED_REFRESH == "full")
 
 print("Success! Denormalized table created with a Primary Key.")
 
@@ -126,7 +148,7 @@ def inspect_database(engine):
         except Exception as e:
             print(f"Error reading table {table}: {e}")
 
-if __name__ == "__main__":
+if __name__ == "__main__" and ANALYTICS_BACKEND == "mysql":
     inspect_database(SQL_ENGINE)
 
 # %% [markdown]
@@ -136,17 +158,15 @@ if __name__ == "__main__":
 # List of your table names
 tables = ["cities", "meetings", "meeting_metrics","denormalized_table"]
 
-with SQL_ENGINE.connect() as conn:
-    for table in tables:
-        print(f"--- Table: {table} (First few rows) ---")
-        
-        # Query with limit - viewing a sample
-        query = text(f"SELECT * FROM {table} LIMIT 5")
-        df = pd.read_sql(query, conn)
-        
-        # Display the dataframe
-        display(df)
-        print("\n")
+for table in tables:
+    print(f"--- Table: {table} (First few rows) ---")
+    
+    # Query with limit - viewing a sample
+    df = read_query(f"SELECT * FROM {table} LIMIT 5")
+    
+    # Display the dataframe
+    display(df)
+    print("\n")
 
 # %% [markdown]
 # #### Inefficient query example
@@ -154,17 +174,16 @@ with SQL_ENGINE.connect() as conn:
 # %%
 def run_denormalized_inefficient():
     # Drop the index if it exists
-    with SQL_ENGINE.connect() as conn:
-        try:
-            # Removing the index so MySQL has to do a Full Table Scan - 
-            conn.execute(text("DROP INDEX idx_city_denormalized ON denormalized_table"))
-            conn.commit()
-        except Exception:
-            pass 
+    # Index DDL only applies to MySQL; the DuckDB views have no indexes
+    if ANALYTICS_BACKEND == "mysql":
+        with SQL_ENGINE.connect() as conn:
+            try:
+                # Removing the index so MySQL has to do a Full Table Scan - 
+                conn.execute(text("DROP INDEX idx_city_denormalized ON denormalized_table"))
+                conn.commit()
+            except Exception:
+                pass 
 
-    # Executing and timing the query
-    start_time = time.perf_counter()
-    
     # Grouping by a non-indexed VARCHAR column
     query = """
     SELECT 
@@ -174,14 +193,11 @@ def run_denormalized_inefficient():
     GROUP BY city;
     """
     
-    with SQL_ENGINE.connect() as conn:
-        df = pd.read_sql(text(query), conn)
-        
-    end_time = time.perf_counter()
-    return df, end_time - start_time
+    df = read_query(query)
+    register_query("denormalized_inefficient", query)
+    return df
 
-df_bad_denorm, time_bad_denorm = run_denormalized_inefficient()
-print(f"Inefficient Denormalized Runtime: {time_bad_denorm:.4f} seconds")
+df_bad_denorm = run_denormalized_inefficient()
 display(df_bad_denorm.head())
 
 # %% [markdown]
@@ -190,21 +206,20 @@ display(df_bad_denorm.head())
 # %%
 def run_optimized_efficient():
     # Recreating the test environment: Dropping and recreating the Index
-    with SQL_ENGINE.connect() as conn:
-        # Dropping if it exists to avoid a 'Duplicate key' error
-        try:
-            conn.execute(text("DROP INDEX idx_city_search ON cities"))
+    # Index DDL only applies to MySQL; the DuckDB views have no indexes
+    if ANALYTICS_BACKEND == "mysql":
+        with SQL_ENGINE.connect() as conn:
+            # Dropping if it exists to avoid a 'Duplicate key' error
+            try:
+                conn.execute(text("DROP INDEX idx_city_search ON cities"))
+                conn.commit()
+            except Exception:
+                pass 
+                
+            print("Creating index for optimization...")
+            conn.execute(text("CREATE INDEX idx_city_search ON cities(city)"))
             conn.commit()
-        except Exception:
-            pass 
-            
-        print("Creating index for optimization...")
-        conn.execute(text("CREATE INDEX idx_city_search ON cities(city)"))
-        conn.commit()
             
-    # Executing and timing the query
-    start_time = time.perf_counter()
-    
     # Aggregating on integers in a subquery to optimize efficiency
     query = """
     SELECT 
@@ -221,28 +236,49 @@ def run_optimized_efficient():
     ) sub ON c.city_id = sub.city_id;
     """
     
-    with SQL_ENGINE.connect() as conn:
-        df = pd.read_sql(text(query), conn)
-        
-    end_time = time.perf_counter()
-    return df, end_time - start_time
+    df = read_query(query)
+    register_query("optimized_efficient", query)
+    return df
 
-df_good, time_good = run_optimized_efficient()
-print(f"Optimized Efficient Runtime: {time_good:.4f} seconds")
+df_good = run_optimized_efficient()
 display(df_good.head())
 
+# %% [markdown]
+# #### Pre-aggregated query
+
+# %%
+def run_city_aggregates():
+    # city_aggregates holds per-city count / sum / sum of squares, kept current by step3 in the
+    # same transactions as meeting_metrics, so averages read one row per city instead of a join
+    df = read_query(CITY_AVERAGES_QUERY)
+    register_query("city_aggregates", CITY_AVERAGES_QUERY)
+    return df
+
+df_aggregates = run_city_aggregates()
+display(df_aggregates[["city", "meeting_count", "avg_duration", "std_duration"]].head())
+
+# %% [markdown]
+# #### Head-to-head benchmark
+
+# %%
+# The three ways of getting the average duration per city, timed in the same interleaved runs
+# and with the index setup of the cells above
+benchmark_group(["denormalized_inefficient", "optimized_efficient", "city_aggregates"])
+
 # %% [markdown]
 # #### EXPLAIN ANALYZE querry
 
 # %%
 def explain_denormalized_inefficient():
     # Drop the index to force inefficiency for demonstration purposes
-    with SQL_ENGINE.connect() as conn:
-        try:
-            conn.execute(text("DROP INDEX idx_city_denormalized ON denormalized_table"))
-            conn.commit()
-        except Exception:
-            pass 
+    # Index DDL only applies to MySQL; the DuckDB views have no indexes
+    if ANALYTICS_BACKEND == "mysql":
+        with SQL_ENGINE.connect() as conn:
+            try:
+                conn.execute(text("DROP INDEX idx_city_denormalized ON denormalized_table"))
+                conn.commit()
+            except Exception:
+                pass 
 
     # EXPLAIN ANALYZE to the raw SQL
     query = """
@@ -254,10 +290,8 @@ def explain_denormalized_inefficient():
     GROUP BY city;
     """
     
-    with SQL_ENGINE.connect() as conn:
-        # We use .scalar() or fetchone() because EXPLAIN ANALYZE returns a text block
-        result = conn.execute(text(query))
-        plan = result.fetchone()[0]
+    # EXPLAIN ANALYZE returns a single text block
+    plan = explain_query(query)
         
     return plan
 
@@ -269,12 +303,14 @@ print(plan_bad)
 # %%
 def explain_optimized_efficient():
     # Ensure index exists for optimization
-    with SQL_ENGINE.connect() as conn:
-        try:
-            conn.execute(text("CREATE INDEX idx_city_search ON cities(city)"))
-            conn.commit()
-        except Exception:
-            pass 
+    # Index DDL only applies to MySQL; the DuckDB views have no indexes
+    if ANALYTICS_BACKEND == "mysql":
+        with SQL_ENGINE.connect() as conn:
+            try:
+                conn.execute(text("CREATE INDEX idx_city_search ON cities(city)"))
+                conn.commit()
+            except Exception:
+                pass 
             
     # EXPLAIN ANALYZE to the "complex" query
     query = """
@@ -293,9 +329,7 @@ def explain_optimized_efficient():
     ) sub ON c.city_id = sub.city_id;
     """
     
-    with SQL_ENGINE.connect() as conn:
-        result = conn.execute(text(query))
-        plan = result.fetchone()[0]
+    plan = explain_query(query)
         
     return plan
 
@@ -309,25 +343,32 @@ print(plan_good)
 
 # %%
 def print_business_summary(plan_text, query_name):
-    # Extract the total time from the very first line (the root of the query)
-    time_match = re.search(r'actual time=\d+\.\d+\.\.(\d+\.\d+)', plan_text)
-    total_time = time_match.group(1) if time_match else "Unknown"
-    
-    # Extract how many rows the database *guessed* it needed to look at
-    rows_match = re.search(r'rows=(\d+)', plan_text)
-    total_rows = rows_match.group(1) if rows_match else "Unknown"
+    # Parse the plan into its node tree (the root node carries the total time)
+    plan = parse_plan(plan_text)
+    if plan is None:
+        print(f"Performance Report: {query_name}")
+        print("Plan format not recognised (structured reports need MySQL's tree or JSON EXPLAIN output).")
+        print("\n")
+        return
+    summary = plan_summary(plan)
 
-    # Look for key "Red Flags" or "Green Flags"
-    is_brute_force = "Table scan" in plan_text
+    total_time = f"{summary['total_ms']:.3f}" if summary["total_ms"] is not None else "Unknown"
+
+    # Look for key "Red Flags" or "Green Flags": full scans of real tables, not of temporary tables
+    is_brute_force = bool(summary["full_scans"])
     
     # Print the clean dashboard
     print(f"Performance Report: {query_name}")
     print("-" * 50)
     print(f"Total Time Taken : {total_time} milliseconds")
-    print(f"Data Volume Touched: ~{total_rows} rows")
+    print(f"Data Volume Touched: ~{summary['rows_read']:,.0f} rows (all table accesses, all loops)")
+    for table, access_type, index in summary["accesses"]:
+        print(f"  {table}: {access_type}" + (f" using {index}" if index else ""))
+    if summary["worst_drift"] and summary["worst_drift"][1] > 1:
+        print(f"Largest row misestimate: {summary['worst_drift'][0]} ({summary['worst_drift'][1]:.1f}x)")
     
     if is_brute_force:
-        print("Strategy: 'Brute Force' (Full Table Scan)")
+        print(f"Strategy: 'Brute Force' (Full Table Scan on {', '.join(summary['full_scans'])})")
         print("Explanation: The database read every single row in the table like ")
         print("reading a book cover-to-cover to find one word. This is fine for ")
         print("small amounts of data, but will cause major lag as the system grows.")
@@ -337,6 +378,8 @@ def print_business_summary(plan_text, query_name):
         print("to jump straight to the exact data needed. This will stay lightning ")
         print("fast even if we add millions of rows to the system.")
     print("-" * 50)
+    print(format_plan(plan))
+    print("-" * 50)
     print("\n")
 
 # %%
@@ -349,21 +392,20 @@ print_business_summary(plan_good, "Optimized Query (Indexed & Normalized)")
 # %%
 def run_avg_segment_count_query():
     # Recreating the test environment: Dropping and recreating the Index
-    with SQL_ENGINE.connect() as conn:
-        # Dropping if it exists to avoid a 'Duplicate key' error
-        try:
-            conn.execute(text("DROP INDEX idx_city_search ON cities"))
+    # Index DDL only applies to MySQL; the DuckDB views have no indexes
+    if ANALYTICS_BACKEND == "mysql":
+        with SQL_ENGINE.connect() as conn:
+            # Dropping if it exists to avoid a 'Duplicate key' error
+            try:
+                conn.execute(text("DROP INDEX idx_city_search ON cities"))
+                conn.commit()
+            except Exception:
+                pass 
+                
+            print("Creating index for optimization...")
+            conn.execute(text("CREATE INDEX idx_city_search ON cities(city)"))
             conn.commit()
-        except Exception:
-            pass 
             
-        print("Creating index for optimization...")
-        conn.execute(text("CREATE INDEX idx_city_search ON cities(city)"))
-        conn.commit()
-            
-    # Executing and timing the query
-    start_time = time.perf_counter()
-    
     # Using the CTE to calculate average segment count by city
     query = """
     WITH city_segments AS (
@@ -381,34 +423,30 @@ def run_avg_segment_count_query():
     JOIN city_segments cs ON c.city_id = cs.city_id;
     """
     
-    with SQL_ENGINE.connect() as conn:
-        df = pd.read_sql(text(query), conn)
-        
-    end_time = time.perf_counter()
-    return df, end_time - start_time
+    df = read_query(query)
+    register_query("avg_segment_count_cte", query)
+    return df
 
-# Execute, unpack, and display the results
-df_segments, time_segments = run_avg_segment_count_query()
-print(f"CTE Query Runtime: {time_segments:.4f} seconds")
+# Execute and display the results
+df_segments = run_avg_segment_count_query()
 display(df_segments.head())
 
 # %%
 def run_window_function_ranking():
-    with SQL_ENGINE.connect() as conn:
-        # Dropping if it exists to avoid a 'Duplicate key' error
-        try:
-            conn.execute(text("DROP INDEX idx_duration_sort ON meeting_metrics"))
+    # Index DDL only applies to MySQL; the DuckDB views have no indexes
+    if ANALYTICS_BACKEND == "mysql":
+        with SQL_ENGINE.connect() as conn:
+            # Dropping if it exists to avoid a 'Duplicate key' error
+            try:
+                conn.execute(text("DROP INDEX idx_duration_sort ON meeting_metrics"))
+                conn.commit()
+            except Exception:
+                pass 
+                
+            print("Creating index on video_duration_sec for ranking optimization...")
+            conn.execute(text("CREATE INDEX idx_duration_sort ON meeting_metrics(video_duration_sec DESC)"))
             conn.commit()
-        except Exception:
-            pass 
-            
-        print("Creating index on video_duration_sec for ranking optimization...")
-        conn.execute(text("CREATE INDEX idx_duration_sort ON meeting_metrics(video_duration_sec DESC)"))
-        conn.commit()
             
-    # Executing and timing the query
-    start_time = time.perf_counter()
-    
     # Executing the Window Function for Ranking
     query = """
     SELECT 
@@ -419,35 +457,31 @@ def run_window_function_ranking():
     FROM meeting_metrics;
     """
     
-    with SQL_ENGINE.connect() as conn:
-        df = pd.read_sql(text(query), conn)
-        
-    end_time = time.perf_counter()
-    return df, end_time - start_time
+    df = read_query(query)
+    register_query("window_function_ranking", query)
+    return df
 
-# Execute, unpack, and display the results
-df_ranked, time_ranked = run_window_function_ranking()
-print(f"Window Function Runtime: {time_ranked:.4f} seconds")
+# Execute and display the results
+df_ranked = run_window_function_ranking()
 display(df_ranked.head())
 
 # %%
 def run_analytical_top_meetings():
     # Recreating the test environment: Indexing for Sort/Limit Performance
-    with SQL_ENGINE.connect() as conn:
-        # Dropping if it exists to avoid a 'Duplicate key' error
-        try:
-            conn.execute(text("DROP INDEX idx_item_count_sort ON meeting_metrics"))
+    # Index DDL only applies to MySQL; the DuckDB views have no indexes
+    if ANALYTICS_BACKEND == "mysql":
+        with SQL_ENGINE.connect() as conn:
+            # Dropping if it exists to avoid a 'Duplicate key' error
+            try:
+                conn.execute(text("DROP INDEX idx_item_count_sort ON meeting_metrics"))
+                conn.commit()
+            except Exception:
+                pass 
+                
+            print("Creating index on item_count for analytical optimization...")
+            conn.execute(text("CREATE INDEX idx_item_count_sort ON meeting_metrics(item_count DESC)"))
             conn.commit()
-        except Exception:
-            pass 
-            
-        print("Creating index on item_count for analytical optimization...")
-        conn.execute(text("CREATE INDEX idx_item_count_sort ON meeting_metrics(item_count DESC)"))
-        conn.commit()
             
-    # Executing and timing the query
-    start_time = time.perf_counter()
-    
     # Executing the Analytical Join Query
     query = """
     SELECT 
@@ -462,17 +496,34 @@ def run_analytical_top_meetings():
     LIMIT 10;
     """
     
-    with SQL_ENGINE.connect() as conn:
-        df = pd.read_sql(text(query), conn)
-        
-    end_time = time.perf_counter()
-    return df, end_time - start_time
+    df = read_query(query)
+    register_query("analytical_top_meetings", query)
+    return df
 
-# Execute, unpack, and display the results
-df_analytics, time_analytics = run_analytical_top_meetings()
-print(f"Analytical Query Runtime: {time_analytics:.4f} seconds")
+# Execute and display the results
+df_analytics = run_analytical_top_meetings()
 display(df_analytics)
 
+# %% [markdown]
+# #### Benchmark report
+
+# %%
+# p50/p95/p99 per query (server vs fetch time), compared with the previous run and appended to
+# Processed_Data/benchmarks/query_benchmark.json
+benchmark_group(["avg_segment_count_cte", "window_function_ranking", "analytical_top_meetings"])
+compare_with_previous(BENCHMARK_RESULTS, ANALYTICS_BACKEND)
+saved = save_results(BENCHMARK_RESULTS, ANALYTICS_BACKEND, settings=STEP4_BENCHMARK_SETTINGS)
+print(f"Benchmark saved at: {saved}")
+
+# %% [markdown]
+# #### Index advisor
+
+# %%
+# Composite / covering index proposals derived from the plans of the step4 and step6 queries.
+# python index_advisor.py --measure applies them in a sandbox schema and benchmarks before/after
+if ANALYTICS_BACKEND == "mysql" and STEP4_INDEX_ADVICE:
+    print_advice(advise(SQL_ENGINE))
+
 # %% [markdown]
 # # <center> ----------------------Thank you :) ----------------------
 
@@ -9,18 +9,15 @@ const q1 = db.transcripts.find(
 .limit(5)
 .toArray();
 
+// Per-city averages read the running sums that step3 keeps in city_aggregates
+// (one document per city instead of a $group over every transcript)
+
 // What is the average meeting transcript length in each city?
-const q2 = db.transcripts.aggregate([
-  {
-    $group: {
-      _id: "$city",
-      avgTranscriptLength: { $avg: "$transcript_word_count" }
-    }
-  },
+const q2 = db.city_aggregates.aggregate([
   {
     $project: {
       City: "$_id",
-      AvgTranscriptLength: { $round: ["$avgTranscriptLength", 0] },
+      AvgTranscriptLength: { $round: [{ $divide: ["$words_sum", "$words_n"] }, 0] },
       _id: 0
     }
   }
@@ -28,16 +25,16 @@ const q2 = db.transcripts.aggregate([
 
 
 // Average number of speakers per city
-const q3 = db.transcripts.aggregate([
+const q3 = db.city_aggregates.aggregate([
   {
-    $group: {
-      _id: "$city",
-      avgSpeakers: { $avg: "$speaker_count" }
+    $project: {
+      avgSpeakers: { $divide: ["$speakers_sum", "$speakers_n"] }
     }
   }
 ]).toArray();
 
 // Meetings that mention “budget” or “housing” - grouped by city
+// (text search only sees transcripts stored with MONGO_TRANSCRIPT_FORMAT=plain)
 const q4 = db.transcripts.aggregate([
   {
     $match: {
@@ -71,28 +68,17 @@ const q5 = db.transcripts.aggregate([
 ]).toArray();
 
 // Which city has more meetings overall?
-const q6 = db.transcripts.aggregate([
-  {
-    $group: {
-      _id: "$city",
-      totalMeetings: { $sum: 1 }
-    }
-  },
+const q6 = db.city_aggregates.aggregate([
+  { $project: { totalMeetings: "$meeting_count" } },
   { $sort: { totalMeetings: -1 } }
 ]).toArray();
 
 // Calculate average transcript length per city
-const q7 = db.transcripts.aggregate([
-  {
-    $group: {
-      _id: "$city",
-      avgTranscriptLength: { $avg: "$transcript_word_count" }
-    }
-  },
+const q7 = db.city_aggregates.aggregate([
   {
     $project: {
       City: "$_id",
-      AvgTranscriptLength: { $round: ["$avgTranscriptLength", 0] },
+      AvgTranscriptLength: { $round: [{ $divide: ["$words_sum", "$words_n"] }, 0] },
       _id: 0
     }
   }
@@ -11,10 +11,11 @@ from pathlib import Path
 from IPython.display import display
 from dotenv import load_dotenv
 
-from sqlalchemy import create_engine, inspect, text
+from sqlalchemy import inspect, text
 
-from pymongo import MongoClient
-import certifi
+from connections import get_sql_engine, get_mongo_collection
+from duckdb_backend import query_df
+from transcript_codec import decode_transcripts
 
 import warnings
 warnings.filterwarnings("ignore")
@@ -26,28 +27,22 @@ warnings.filterwarnings("ignore")
 # Loading variables from env file
 load_dotenv()
 
-# SQL Database connection
-SQL_URL = os.getenv("SQL_URL")
+# Analytics backend: 'mysql' (MySQL + MongoDB) or 'duckdb' (local Parquet views, no network)
+ANALYTICS_BACKEND = os.getenv("ANALYTICS_BACKEND", "mysql")
 
-SQL_ENGINE = create_engine(
-    SQL_URL,
-    connect_args={"ssl": {"fake_flag_to_enable_tls": True}},
-    pool_pre_ping=True
-)
+# SQL Database connection (shared pooled engine, pool settings in .env)
+SQL_ENGINE = get_sql_engine() if ANALYTICS_BACKEND == "mysql" else None
 
 # NOSQL MongoDB connection
-MONGO_URI = os.getenv("MONGO_URI")
-MONGO_DB_NAME = os.getenv("MONGO_DB_NAME")
-MONGO_COLLECTION_NAME = os.getenv("MONGO_COLLECTION_NAME")
-
-MONGO_CLIENT = MongoClient(MONGO_URI, tlsCAFile=certifi.where())
-MONGO_DB = MONGO_CLIENT[MONGO_DB_NAME]
-MONGO_COLLECTION = MONGO_DB[MONGO_COLLECTION_NAME]
+MONGO_COLLECTION = get_mongo_collection() if ANALYTICS_BACKEND == "mysql" else None
 
 # %%
-with SQL_ENGINE.connect() as conn:
-    # Use .connection to access the raw driver (PyMySQL)
-    df_sql = pd.read_sql("SELECT * FROM denormalized_table", conn.connection)
+if ANALYTICS_BACKEND == "duckdb":
+    df_sql = query_df("SELECT * FROM denormalized_table")
+else:
+    with SQL_ENGINE.connect() as conn:
+        # Use .connection to access the raw driver (PyMySQL)
+        df_sql = pd.read_sql("SELECT * FROM denormalized_table", conn.connection)
 
 # 3. Verify the import
 print(f"Table imported! Rows: {len(df_sql)}, Columns: {len(df_sql.columns)}")
@@ -72,18 +67,22 @@ df_sql = df_sql[cols_to_front + remaining_cols]
 df_sql.head()
 
 # %%
-# Fetch all documents from the collection
-cursor = MONGO_COLLECTION.find()
+if ANALYTICS_BACKEND == "duckdb":
+    # Same fields as the Mongo documents, read from the local transcript Parquet files
+    df_transcript_data = query_df("SELECT * FROM meeting_transcripts")
+else:
+    # Fetch all documents from the collection
+    cursor = MONGO_COLLECTION.find()
 
-# Convert the cursor to a DataFrame
-df_transcript_data = pd.DataFrame(list(cursor))
+    # Convert the cursor to a DataFrame (compressed or chunked transcripts are decoded back to text)
+    df_transcript_data = pd.DataFrame(list(decode_transcripts(cursor, MONGO_COLLECTION)))
 
 # View the first few rows
 df_transcript_data.head()
 
 # %%
 # Dropping redundant columns
-df_transcript_data.drop(columns=["_id","meeting_id","city",], inplace=True)
+df_transcript_data.drop(columns=["_id","meeting_id","city",], inplace=True, errors="ignore")
 
 # %%
 df_transcript_data.head()
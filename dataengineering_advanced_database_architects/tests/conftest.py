@@ -0,0 +1,5 @@
+# The pipeline modules live one directory up, next to the step scripts
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
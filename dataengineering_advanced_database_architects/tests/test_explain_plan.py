@@ -0,0 +1,81 @@
+# EXPLAIN ANALYZE parsing on MySQL 8 tree output
+
+from explain_plan import detect_regressions, parse_plan, plan_summary, record_plan
+
+# step4's optimized_efficient query: derived table, hash join and <temporary> scans
+DERIVED_HASH_JOIN_PLAN = """
+-> Nested loop inner join  (cost=4.75 rows=6) (actual time=1.73..1.74 rows=2 loops=1)
+    -> Table scan on c  (cost=0.45 rows=2) (actual time=0.0311..0.0352 rows=2 loops=1)
+    -> Index lookup on sub using <auto_key0> (city_id=c.city_id)  (cost=0.263..2.5 rows=2.5) (actual time=0.849..0.85 rows=1 loops=2)
+        -> Materialize  (cost=0..0 rows=0) (actual time=1.69..1.69 rows=2 loops=1)
+            -> Table scan on <temporary>  (actual time=1.68..1.68 rows=2 loops=1)
+                -> Aggregate using temporary table  (actual time=1.68..1.68 rows=2 loops=1)
+                    -> Inner hash join (mm.pk_id = m.pk_id)  (cost=2021 rows=2000) (actual time=0.468..1.32 rows=2000 loops=1)
+                        -> Table scan on mm  (cost=0.0718 rows=2000) (actual time=0.0213..0.609 rows=2000 loops=1)
+                        -> Hash
+                            -> Table scan on m  (cost=201 rows=2000) (actual time=0.0275..0.286 rows=2000 loops=1)
+"""
+
+# Derived table scanned with a cost range
+DERIVED_SCAN_PLAN = """
+-> Table scan on sub  (cost=2.5..2.5 rows=0) (actual time=0.0752..0.0757 rows=2 loops=1)
+    -> Materialize  (cost=0..0 rows=0) (actual time=0.0746..0.0746 rows=2 loops=1)
+        -> Table scan on <temporary>  (actual time=0.06..0.061 rows=2 loops=1)
+            -> Aggregate using temporary table  (actual time=0.06..0.06 rows=2 loops=1)
+                -> Covering index scan on m using idx_city  (cost=201 rows=2000) (actual time=0.019..0.031 rows=2000 loops=1)
+"""
+
+NEVER_EXECUTED_PLAN = """
+-> Nested loop inner join  (cost=0.7 rows=1) (actual time=0.02..0.02 rows=0 loops=1)
+    -> Filter: (c.city = 'Nowhere')  (cost=0.45 rows=1) (actual time=0.018..0.018 rows=0 loops=1)
+        -> Table scan on c  (cost=0.45 rows=2) (actual time=0.012..0.015 rows=2 loops=1)
+    -> Index lookup on m using city_id (city_id=c.city_id)  (cost=0.25 rows=1) (never executed)
+"""
+
+def test_derived_table_and_hash_join_tree():
+    root = parse_plan(DERIVED_HASH_JOIN_PLAN)
+
+    assert root.operation == "Nested loop inner join"
+    assert root.actual_last_ms == 1.74
+    lookup = root.children[1]
+    assert (lookup.access_type, lookup.table, lookup.estimated_cost, lookup.loops) == ("ref", "sub", 2.5, 2)
+
+    hash_join = lookup.children[0].children[0].children[0].children[0]
+    assert hash_join.operation == "Inner hash join (mm.pk_id = m.pk_id)"
+    assert [child.operation for child in hash_join.children] == ["Table scan on mm", "Hash"]
+    assert hash_join.children[1].children[0].table == "m"
+
+    summary = plan_summary(root)
+    assert summary["full_scans"] == ["c", "m", "mm"]
+    assert "sub" not in [table for table, _, _ in summary["accesses"]]
+    assert summary["rows_read"] == 4002
+
+def test_cost_range_and_derived_scan():
+    root = parse_plan(DERIVED_SCAN_PLAN)
+
+    assert (root.table, root.estimated_cost, root.estimated_rows, root.actual_rows) == ("sub", 2.5, 0.0, 2.0)
+    assert not root.is_full_scan
+    assert plan_summary(root)["full_scans"] == []
+    assert plan_summary(root)["accesses"] == [("m", "covering_index_scan", "idx_city")]
+
+def test_never_executed_node():
+    root = parse_plan(NEVER_EXECUTED_PLAN)
+    lookup = root.children[1]
+
+    assert lookup.never_executed
+    assert (lookup.estimated_rows, lookup.actual_rows, lookup.loops) == (1.0, None, None)
+    assert lookup.row_drift is None
+    assert root.children[0].children[0].is_full_scan
+
+def test_regressions_between_runs(tmp_path):
+    history = tmp_path / "plan_history.json"
+    query = "EXPLAIN ANALYZE SELECT c.city FROM cities c JOIN meetings m ON c.city_id = m.city_id"
+
+    assert record_plan(query, NEVER_EXECUTED_PLAN.replace("Table scan on c", "Covering index scan on c using idx"), history) == []
+    flags = record_plan(query.lower(), NEVER_EXECUTED_PLAN, history)
+    assert flags == ["new full table scan on c"]
+
+    drifted = parse_plan(DERIVED_HASH_JOIN_PLAN.replace("Table scan on mm  (cost=0.0718 rows=2000)",
+                                                        "Table scan on mm  (cost=0.0718 rows=20)"))
+    assert any(flag.startswith("row estimate drift on mm") for flag in
+               detect_regressions(parse_plan(DERIVED_HASH_JOIN_PLAN), drifted))
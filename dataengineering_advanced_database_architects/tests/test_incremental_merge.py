@@ -0,0 +1,78 @@
+# Incremental and full extractions keep the IDs step3 has already loaded
+
+from step1_2_extract_meetings import merge_summary, merge_transcripts, reuse_ids
+from step1_process_metadata import build_summary_frame, summarize_meeting
+from step2_process_transcripts import build_transcript_frame, extract_transcript
+
+def meeting(duration, text="Good evening."):
+    return {"VideoDuration": duration, "itemInfo": {"1": {"transcripts": [{"speaker": "A", "text": text}]}}}
+
+FIRST_RUN = {
+    "LongBeachCC_01012022": meeting(100),
+    "LongBeachCC_02012022": meeting(200),
+    "SeattleCityCouncil_03012022": meeting(300),
+}
+
+def rows(meetings):
+    summary = [summarize_meeting(meeting_id, data) for meeting_id, data in meetings.items()]
+    transcripts = [extract_transcript(meeting_id, data) for meeting_id, data in meetings.items()]
+    return summary, transcripts
+
+def ids_by_key(df_summary):
+    keys = df_summary["city"].astype(str) + "_" + df_summary["meeting_id"].astype(str)
+    return dict(zip(keys, zip(df_summary["pk_id"], df_summary["city_id"], df_summary["metric_id"])))
+
+def first_run():
+    summary, transcripts = rows(FIRST_RUN)
+    return build_summary_frame(summary), build_transcript_frame(transcripts)
+
+def test_incremental_merge_keeps_ids():
+    df_summary, df_transcripts = first_run()
+    before = ids_by_key(df_summary)
+
+    # -- One changed, one removed, one added meeting (in a new city)
+    summary, transcripts = rows({
+        "LongBeachCC_02012022": meeting(250, "Changed text."),
+        "AlamedaCC_04012022": meeting(400),
+    })
+    removed = {"LongBeachCC_01012022"}
+    merged = merge_summary(df_summary, summary, removed)
+    merged_transcripts = merge_transcripts(df_transcripts, transcripts, removed, merged)
+    after = ids_by_key(merged)
+
+    assert "LongBeachCC_01012022" not in after
+    assert after["LongBeachCC_02012022"] == before["LongBeachCC_02012022"]
+    assert after["SeattleCityCouncil_03012022"] == before["SeattleCityCouncil_03012022"]
+    assert after["AlamedaCC_04012022"] == (4, 3, 4)
+    assert merged.set_index("pk_id").loc[2, "video_duration_sec"] == 250
+
+    transcript_pk = dict(zip(merged_transcripts["city"] + "_" + merged_transcripts["meeting_id"], merged_transcripts["pk_id"]))
+    assert transcript_pk == {key: pk_id for key, (pk_id, _, _) in after.items()}
+    assert merged_transcripts.set_index("pk_id").loc[2, "full_transcript_text"] == "Changed text."
+
+def test_removal_only_run():
+    df_summary, df_transcripts = first_run()
+    removed = {"SeattleCityCouncil_03012022"}
+
+    merged = merge_summary(df_summary, [], removed)
+    assert list(merged["pk_id"]) == [1, 2]
+    assert list(merge_transcripts(df_transcripts, [], removed, merged)["pk_id"]) == [1, 2]
+
+def test_full_extraction_reuses_ids():
+    df_summary, _ = first_run()
+    before = ids_by_key(df_summary)
+
+    # -- A full run lists the cities in another order, drops one meeting and adds one
+    summary, transcripts = rows({
+        "SeattleCityCouncil_03012022": meeting(300),
+        "SeattleCityCouncil_05012022": meeting(500),
+        "LongBeachCC_02012022": meeting(200),
+    })
+    df_full, df_full_transcripts = reuse_ids(df_summary, summary, transcripts)
+    after = ids_by_key(df_full)
+
+    assert after["SeattleCityCouncil_03012022"] == before["SeattleCityCouncil_03012022"]
+    assert after["LongBeachCC_02012022"] == before["LongBeachCC_02012022"]
+    assert after["SeattleCityCouncil_05012022"] == (4, before["SeattleCityCouncil_03012022"][1], 4)
+    assert "LongBeachCC_01012022" not in after
+    assert list(df_full_transcripts["pk_id"]) == [2, 3, 4]
@@ -0,0 +1,55 @@
+# Byte-level streaming of MeetingBank JSON against json.load
+
+import json
+
+import pytest
+
+from meetingbank_stream import iter_meetings
+
+# Strings with braces, brackets, escaped quotes and backslashes, multi-byte UTF-8,
+# every scalar type and irregular whitespace, so small chunks split them anywhere
+MEETINGS = {
+    "LongBeachCC_01012022": {
+        "VideoDuration": 3600,
+        "itemInfo": {
+            "1": {"transcripts": [
+                {"speaker": "Mayor", "text": "Call to order {item 1} [agenda]"},
+                {"speaker": None, "text": "She said \"aye\" \\ then left, naïve café ✓ 会议"}
+            ]},
+            "2": {"transcripts": []}
+        }
+    },
+    "Seattle\"Odd\\Key_02": {"VideoDuration": 12.5e1, "flags": [True, False, None], "itemInfo": {}},
+    "AlamedaCC_03012022": {"VideoDuration": -0.25, "itemInfo": {"3": {"transcripts": [{"speaker": "", "text": "}]\"{["}]}}},
+    "BostonCC_04012022": {}
+}
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "MeetingBank.json"
+    text = json.dumps(MEETINGS, ensure_ascii=False, indent=2).replace('": ', '" :\n\t ')
+    path.write_bytes(text.encode("utf-8"))
+    return path
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 20])
+def test_matches_json_load(source, chunk_size):
+    with open(source, "r", encoding="utf-8") as f:
+        expected = json.load(f)
+
+    assert list(iter_meetings(source, chunk_size=chunk_size)) == list(expected.items())
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 64])
+def test_keep_filter_and_raw(source, chunk_size):
+    def keep(meeting_id):
+        return meeting_id.startswith(("LongBeachCC", "AlamedaCC"))
+
+    meetings = list(iter_meetings(source, chunk_size=chunk_size, keep=keep))
+    assert meetings == [(key, MEETINGS[key]) for key in ("LongBeachCC_01012022", "AlamedaCC_03012022")]
+
+    raw = list(iter_meetings(source, chunk_size=chunk_size, raw=True, keep=keep))
+    assert [(key, json.loads(data)) for key, data in raw] == meetings
+
+def test_empty_object(tmp_path):
+    path = tmp_path / "MeetingBank.json"
+    path.write_bytes(b" { } ")
+    assert list(iter_meetings(path, chunk_size=1)) == []
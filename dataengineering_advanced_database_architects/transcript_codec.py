@@ -0,0 +1,157 @@
+# Compressed and chunked storage of transcript text in MongoDB
+
+import hashlib
+import json
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from bson import Binary
+from pymongo import DeleteMany, UpdateOne
+
+# zstd is optional: without the 'zstandard' package the zstd format falls back to zlib
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# STORAGE FORMATS
+# -- plain:   full_transcript_text as a string (original layout, searchable with $regex)
+# -- zlib:    full_transcript_text as zlib-compressed UTF-8 binary
+# -- zstd:    full_transcript_text as zstd-compressed UTF-8 binary
+# -- chunked: text split into '<collection>_chunks' documents, for transcripts near the 16 MB limit
+FORMATS = ("plain", "zlib", "zstd", "chunked")
+
+TEXT_FIELD = "full_transcript_text"
+ENCODING_FIELD = "text_encoding"
+CHUNKS_FIELD = "text_chunks"
+# Hash of the record and its storage format: unchanged transcripts are not sent again
+HASH_FIELD = "content_hash"
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 10
+
+# Characters per chunk document (chunked format only)
+CHUNK_CHARS = 1_000_000
+
+# Parent documents whose chunks are fetched with one query while decoding
+DECODE_BATCH_SIZE = 500
+
+def resolve_format(storage_format: str) -> str:
+    """
+    Validates a storage format name; zstd degrades to zlib when zstandard is missing.
+    """
+    if storage_format not in FORMATS:
+        raise ValueError(f"Unknown transcript storage format '{storage_format}', expected one of {FORMATS}")
+    if storage_format == "zstd" and zstandard is None:
+        print("Warning: 'zstandard' is not installed, storing transcripts with zlib instead.")
+        return "zlib"
+    return storage_format
+
+def chunk_collection(collection):
+    return collection.database[f"{collection.name}_chunks"]
+
+def ensure_chunk_index(collection) -> None:
+    chunk_collection(collection).create_index(
+        [("meeting_id", 1), ("city", 1), ("seq", 1)], unique=True, name="uniq_chunk"
+    )
+
+def compress_text(text: str, storage_format: str) -> Binary:
+    data = text.encode("utf-8")
+    if storage_format == "zstd":
+        return Binary(zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data))
+    return Binary(zlib.compress(data, ZLIB_LEVEL))
+
+def decompress_text(data: bytes, storage_format: str) -> str:
+    if storage_format == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Transcripts are stored with zstd: install 'zstandard' to read them.")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    return zlib.decompress(data).decode("utf-8")
+
+def content_hash(record: Dict[str, Any], storage_format: str) -> str:
+    payload = json.dumps({"record": record, "format": storage_format}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def stored_hashes(collection, records: List[Dict[str, Any]]) -> Dict[Tuple[Any, Any], str]:
+    """
+    Content hashes already stored for these records, keyed on (meeting_id, city);
+    one indexed query per batch and no transcript text is read.
+    """
+    if not records:
+        return {}
+    keys = [{"meeting_id": record["meeting_id"], "city": record["city"]} for record in records]
+    cursor = collection.find({"$or": keys}, {"_id": 0, "meeting_id": 1, "city": 1, HASH_FIELD: 1})
+    return {(doc["meeting_id"], doc["city"]): doc.get(HASH_FIELD) for doc in cursor}
+
+def transcript_operations(record: Dict[str, Any], storage_format: str, chunk_chars: int = CHUNK_CHARS,
+                          digest: Optional[str] = None) -> Tuple[UpdateOne, List[Any]]:
+    """
+    Builds the upsert for one transcript record in the given storage format, plus the
+    write operations for its chunk documents (empty unless the format is chunked).
+    digest is the record's content_hash when the caller already computed it.
+    """
+    key = {"meeting_id": record["meeting_id"], "city": record["city"]}
+    text = record.get(TEXT_FIELD) or ""
+    document = {k: v for k, v in record.items() if k != TEXT_FIELD}
+    document[HASH_FIELD] = digest or content_hash(record, storage_format)
+    unset = {}
+    chunk_operations = []
+
+    if storage_format == "plain":
+        document[TEXT_FIELD] = text
+        unset = {ENCODING_FIELD: "", CHUNKS_FIELD: ""}
+    elif storage_format == "chunked":
+        chunks = [text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)]
+        document[ENCODING_FIELD] = "chunked"
+        document[CHUNKS_FIELD] = len(chunks)
+        unset = {TEXT_FIELD: ""}
+
+        chunk_operations = [
+            UpdateOne({**key, "seq": seq}, {"$set": {**key, "seq": seq, "text": chunk}}, upsert=True)
+            for seq, chunk in enumerate(chunks)
+        ]
+        # -- A shorter transcript than last time must not pick up stale trailing chunks
+        chunk_operations.append(DeleteMany({**key, "seq": {"$gte": len(chunks)}}))
+    else:
+        document[TEXT_FIELD] = compress_text(text, storage_format)
+        document[ENCODING_FIELD] = storage_format
+        unset = {CHUNKS_FIELD: ""}
+
+    update = {"$set": document}
+    if unset:
+        update["$unset"] = unset
+    return UpdateOne(key, update, upsert=True), chunk_operations
+
+def _decode_batch(documents: List[Dict[str, Any]], collection) -> List[Dict[str, Any]]:
+    chunked = [doc for doc in documents if doc.get(ENCODING_FIELD) == "chunked"]
+    texts: Dict[Tuple[str, str], List[str]] = {}
+
+    if chunked:
+        keys = [{"meeting_id": doc["meeting_id"], "city": doc["city"]} for doc in chunked]
+        cursor = chunk_collection(collection).find({"$or": keys}, {"_id": 0}).sort("seq", 1)
+        for chunk in cursor:
+            texts.setdefault((chunk["meeting_id"], chunk["city"]), []).append(chunk["text"])
+
+    for doc in documents:
+        storage_format = doc.pop(ENCODING_FIELD, "plain")
+        doc.pop(CHUNKS_FIELD, None)
+        doc.pop(HASH_FIELD, None)
+
+        if storage_format == "chunked":
+            doc[TEXT_FIELD] = "".join(texts.get((doc["meeting_id"], doc["city"]), []))
+        elif storage_format != "plain":
+            doc[TEXT_FIELD] = decompress_text(doc[TEXT_FIELD], storage_format)
+    return documents
+
+def decode_transcripts(documents: Iterable[Dict[str, Any]], collection) -> Iterator[Dict[str, Any]]:
+    """
+    Turns transcript documents of any storage format back into the plain layout
+    (full_transcript_text as a string), so readers never see the encoding.
+    """
+    batch = []
+    for doc in documents:
+        batch.append(doc)
+        if len(batch) >= DECODE_BATCH_SIZE:
+            yield from _decode_batch(batch, collection)
+            batch = []
+    if batch:
+        yield from _decode_batch(batch, collection)
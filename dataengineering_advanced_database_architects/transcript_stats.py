@@ -0,0 +1,58 @@
+# Columnar transcript statistics with Arrow compute kernels
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Rows per batch: bounds the size of the intermediate word-list arrays
+STATS_BATCH_SIZE = 4096
+
+def word_counts(text: pa.Array) -> pa.Array:
+    """
+    Whitespace-delimited word count per string (same result as len(s.split())).
+    """
+    # Trimming first means runs of whitespace only ever separate two words
+    text = pc.utf8_trim_whitespace(text)
+    words = pc.list_value_length(pc.utf8_split_whitespace(text))
+
+    # Splitting an empty string still yields one (empty) element
+    return pc.if_else(pc.equal(pc.utf8_length(text), 0), pa.scalar(0, words.type), words).cast(pa.int64())
+
+def distinct_counts(values: pa.Array) -> pa.Array:
+    """
+    Number of distinct non-null entries in every list of a list<string> array.
+    """
+    parents = pc.list_parent_indices(values)
+    flat = pc.list_flatten(values)
+
+    counts = np.zeros(len(values), dtype=np.int64)
+    if len(flat):
+        grouped = pa.table({"parent": parents, "value": flat}).group_by("parent").aggregate([("value", "count_distinct")])
+        counts[grouped["parent"].to_numpy()] = grouped["value_count_distinct"].to_numpy()
+    return pa.array(counts)
+
+def add_transcript_stats(table: pa.Table, text_column: str = "full_transcript_text", speaker_column: str = "speakers", char_count: bool = False) -> pa.Table:
+    """
+    Appends transcript_word_count and speaker_count (plus transcript_char_count if
+    requested) computed batch-wise with Arrow kernels, and drops the speaker lists.
+    """
+    word_chunks = []
+    char_chunks = []
+    speaker_chunks = []
+
+    for batch in table.select([text_column, speaker_column]).to_batches(max_chunksize=STATS_BATCH_SIZE):
+        text = batch.column(0)
+        word_chunks.append(word_counts(text))
+        speaker_chunks.append(distinct_counts(batch.column(1)))
+        if char_count:
+            char_chunks.append(pc.utf8_length(text).cast(pa.int64()))
+
+    def column(chunks):
+        return pa.chunked_array(chunks, type=pa.int64())
+
+    table = table.drop_columns([speaker_column])
+    table = table.append_column("transcript_word_count", column(word_chunks))
+    table = table.append_column("speaker_count", column(speaker_chunks))
+    if char_count:
+        table = table.append_column("transcript_char_count", column(char_chunks))
+    return table